@@ -0,0 +1,86 @@
+"""
+Per-user activity calendar.
+
+user_activity_days holds one row per (user, day) on which the user
+finished a quiz, with the number of quizzes and daily quizzes that day.
+It is written on every quiz submit with a single upsert that adds to the
+day's counters, so concurrent submits cannot lose a count. Reading a
+calendar is one primary-key range scan over the user's active days,
+expanded into dense per-day arrays; the UserProgress history is never
+read.
+"""
+from datetime import date, timedelta
+try:
+    from backend.models import UserActivityDay, db
+    from backend.dbutils import upsert_add
+except ModuleNotFoundError:
+    from models import UserActivityDay, db
+    from dbutils import upsert_add
+
+# 53 weeks, the span of the profile's streak graph
+DEFAULT_CALENDAR_DAYS = 371
+MAX_CALENDAR_DAYS = 731
+
+
+def record_activity(user_id, day, is_daily):
+    """Count a quiz on `day` in the current transaction"""
+    stmt = upsert_add(
+        UserActivityDay.__table__,
+        db.session.get_bind().dialect.name,
+        {'user_id': user_id, 'day': day, 'quizzes': 1, 'daily_quizzes': 1 if is_daily else 0},
+        ('quizzes', 'daily_quizzes')
+    )
+    db.session.execute(stmt)
+
+
+def calendar_query(user_id, start, end):
+    """SELECT for the user's active days in a range, served by the primary key"""
+    return (
+        db.select(UserActivityDay.day, UserActivityDay.quizzes, UserActivityDay.daily_quizzes)
+        .where(UserActivityDay.user_id == user_id)
+        .where(UserActivityDay.day.between(start, end))
+    )
+
+
+def activity_calendar(user_id, start, end):
+    """Quizzes and daily quizzes per day from `start` to `end` inclusive.
+
+    Returns {'from', 'to', 'quizzes', 'daily', 'activeDays'} where the two
+    lists hold one entry per day, starting at `start`.
+    """
+    days = (end - start).days + 1
+    quizzes, daily = [0] * days, [0] * days
+    rows = db.session.execute(calendar_query(user_id, start, end))
+    active = 0
+    for day, day_quizzes, day_daily in rows:
+        index = (day - start).days
+        quizzes[index], daily[index] = day_quizzes, day_daily
+        active += 1
+    return {
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'quizzes': quizzes,
+        'daily': daily,
+        'activeDays': active,
+    }
+
+
+def calendar_range(args, today):
+    """(start, end) from the request's from/to arguments, raising ValueError if invalid"""
+    end = _parse_day(args, 'to') or today
+    start = _parse_day(args, 'from') or end - timedelta(days=DEFAULT_CALENDAR_DAYS - 1)
+    if start > end:
+        raise ValueError('from must not be after to')
+    if (end - start).days + 1 > MAX_CALENDAR_DAYS:
+        raise ValueError(f'the range must be at most {MAX_CALENDAR_DAYS} days')
+    return start, end
+
+
+def _parse_day(args, name):
+    value = args.get(name)
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f'{name} must be a date (YYYY-MM-DD)') from None
@@ -5,13 +5,40 @@ from datetime import timedelta
 import os
 try:
     from backend.models import db
+    from backend.database import init_database
+    from backend.catalog import init_catalog
+    from backend.migrations import run_migrations
+    from backend.writebehind import init_write_behind
+    from backend.hashing import init_password_hasher
+    from backend.identity import get_identity_cache, init_identity_cache, load_user
+    from backend.json_provider import init_json_provider
+    from backend.metrics import init_metrics
+    from backend.leaderboard import init_leaderboard
 except ModuleNotFoundError:
     from models import db
+    from database import init_database
+    from catalog import init_catalog
+    from migrations import run_migrations
+    from writebehind import init_write_behind
+    from hashing import init_password_hasher
+    from identity import get_identity_cache, init_identity_cache, load_user
+    from json_provider import init_json_provider
+    from metrics import init_metrics
+    from leaderboard import init_leaderboard
 
 # Initialize JWT
 jwt = JWTManager()
 
-def create_app():
+@jwt.user_lookup_loader
+def load_jwt_user(jwt_header, jwt_data):
+    # Available to handlers as flask_jwt_extended.current_user
+    return load_user(jwt_data['sub'])
+
+@jwt.user_lookup_error_loader
+def jwt_user_not_found(jwt_header, jwt_data):
+    return jsonify({'error': 'User not found'}), 404
+
+def create_app(config=None):
     app = Flask(__name__)
     
     # Configuration
@@ -24,12 +51,77 @@ def create_app():
     app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY', 'jwt-secret-key-change-in-production')
     app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(days=7)
     
+    # Write-behind progress recording (off by default)
+    app.config['PROGRESS_WRITE_BEHIND'] = os.environ.get('PROGRESS_WRITE_BEHIND', 'false').lower() == 'true'
+    app.config['PROGRESS_JOURNAL_PATH'] = os.environ.get('PROGRESS_JOURNAL_PATH')
+    app.config['PROGRESS_FLUSH_INTERVAL'] = float(os.environ.get('PROGRESS_FLUSH_INTERVAL', '0.5'))
+    app.config['PROGRESS_FLUSH_BATCH_SIZE'] = int(os.environ.get('PROGRESS_FLUSH_BATCH_SIZE', '200'))
+    
+    # Password hashing: werkzeug method string, pool size (0 hashes inline,
+    # unset uses one worker per CPU) and how many hashes may wait before 503s
+    app.config['PASSWORD_HASH_METHOD'] = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt')
+    app.config['PASSWORD_HASH_WORKERS'] = (
+        int(os.environ['PASSWORD_HASH_WORKERS']) if os.environ.get('PASSWORD_HASH_WORKERS') else None
+    )
+    app.config['PASSWORD_HASH_QUEUE_DEPTH'] = (
+        int(os.environ['PASSWORD_HASH_QUEUE_DEPTH']) if os.environ.get('PASSWORD_HASH_QUEUE_DEPTH') else None
+    )
+    
+    # Authenticated-user cache: max entries and seconds before an entry is
+    # re-read (bounds staleness from writes made by other processes)
+    app.config['IDENTITY_CACHE_SIZE'] = int(os.environ.get('IDENTITY_CACHE_SIZE', '1024'))
+    app.config['IDENTITY_CACHE_TTL'] = float(os.environ.get('IDENTITY_CACHE_TTL', '30'))
+    
+    # Seconds between checks of the shared catalog version for topic writes
+    # made by other processes (0 disables the check)
+    app.config['CATALOG_VERSION_CHECK_INTERVAL'] = float(os.environ.get('CATALOG_VERSION_CHECK_INTERVAL', '5'))
+    
+    # Engine pool, for every pooled engine (recycle and pre-ping apply to
+    # database servers only)
+    app.config['DB_POOL_SIZE'] = int(os.environ.get('DB_POOL_SIZE', '10'))
+    app.config['DB_MAX_OVERFLOW'] = int(os.environ.get('DB_MAX_OVERFLOW', '20'))
+    app.config['DB_POOL_TIMEOUT'] = float(os.environ.get('DB_POOL_TIMEOUT', '30'))
+    app.config['DB_POOL_RECYCLE'] = int(os.environ.get('DB_POOL_RECYCLE', '1800'))
+    app.config['DB_POOL_PRE_PING'] = os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true'
+    
+    # SQLite connection pragmas (file databases only)
+    app.config['SQLITE_JOURNAL_MODE'] = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    app.config['SQLITE_SYNCHRONOUS'] = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    app.config['SQLITE_BUSY_TIMEOUT'] = int(os.environ.get('SQLITE_BUSY_TIMEOUT', '5000'))    # ms
+    app.config['SQLITE_MMAP_SIZE'] = int(os.environ.get('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))
+    
+    # Optional read replica used for the queries of GET requests
+    app.config['DATABASE_READ_URL'] = os.environ.get('DATABASE_READ_URL')
+    
+    # In-memory leaderboard: on/off, and seconds between syncs of users
+    # written by other processes (0 disables the sync)
+    app.config['LEADERBOARD_ENABLED'] = os.environ.get('LEADERBOARD_ENABLED', 'true').lower() == 'true'
+    app.config['LEADERBOARD_SYNC_INTERVAL'] = float(os.environ.get('LEADERBOARD_SYNC_INTERVAL', '30'))
+    
+    # JSON encoding: auto (orjson when installed), orjson or stdlib
+    app.config['JSON_PROVIDER'] = os.environ.get('JSON_PROVIDER', 'auto')
+    
+    # Request and SQL metrics served at /metrics, and a warning log line for
+    # requests slower than SLOW_REQUEST_MS (0 disables the log)
+    app.config['METRICS_ENABLED'] = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+    app.config['SLOW_REQUEST_MS'] = float(os.environ.get('SLOW_REQUEST_MS', '500'))
+    
+    # Explicit overrides, e.g. from tests and benchmarks
+    if config:
+        app.config.update(config)
+    
     # Initialize extensions
-    db.init_app(app)
+    init_json_provider(app)
+    init_database(app, db)
     jwt.init_app(app)
+    init_catalog(app)
+    init_password_hasher(app)
+    init_identity_cache(app)
+    if app.config['METRICS_ENABLED']:
+        init_metrics(app)
     
-    # Enable CORS for React frontend
-    CORS(app, resources={r"/api/*": {"origins": "*"}})
+    # Enable CORS for React frontend (ETag is read by apiFetch for revalidation)
+    CORS(app, resources={r"/api/*": {"origins": "*"}}, expose_headers=['ETag'])
     
     # Register blueprints (support running as package or as script)
     try:
@@ -48,15 +140,26 @@ def create_app():
     app.register_blueprint(quizzes_bp, url_prefix='/api/quizzes')
     app.register_blueprint(users_bp, url_prefix='/api/users')
     
-    # Create tables
+    # Create tables and backfill derived data (on the primary only; a read
+    # replica gets its schema from replication)
     with app.app_context():
-        db.create_all()
+        db.create_all(bind_key=None)
+        run_migrations()
+    
+    if app.config['LEADERBOARD_ENABLED']:
+        init_leaderboard(app)
+    
+    init_write_behind(app)
 
     # Root route to help debugging / show available API endpoints
     @app.route('/')
     def index():
         routes = sorted([str(r) for r in app.url_map.iter_rules() if not str(r).startswith('/static')])
-        return jsonify({'message': 'API running', 'routes': routes}), 200
+        return jsonify({
+            'message': 'API running',
+            'routes': routes,
+            'identityCache': get_identity_cache().stats()
+        }), 200
     
     return app
 
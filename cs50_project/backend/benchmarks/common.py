@@ -0,0 +1,65 @@
+"""
+Helpers shared by the benchmark scripts.
+"""
+import os
+import sys
+from datetime import date, timedelta
+from flask_jwt_extended import create_access_token
+try:
+    from backend.app import create_app
+    from backend.models import db, Topic, Question, User
+except ModuleNotFoundError:
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from app import create_app
+    from models import db, Topic, Question, User
+
+
+def build_app(workdir, **config):
+    """Create the app against a fresh SQLite database in `workdir`"""
+    return create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        'PROGRESS_JOURNAL_PATH': os.path.join(workdir, 'journal.db'),
+        **config
+    })
+
+
+def seed(app, topics=10, users=50, password_hash='unused', content_sentences=200, questions=0):
+    """Add synthetic topics and users, returning an access token per user"""
+    with app.app_context():
+        for i in range(topics):
+            db.session.add(Topic(
+                id=str(i),
+                title=f'Topic {i}',
+                description='Benchmark topic',
+                content='# Benchmark\n\n' + 'Lorem ipsum dolor sit amet. ' * content_sentences,
+                category='Benchmark',
+                difficulty='Beginner',
+                estimated_time=5,
+                created_at=date(2024, 1, 1) + timedelta(days=i)
+            ))
+            for j in range(questions):
+                db.session.add(Question(
+                    id=f'q{i}-{j}',
+                    topic_id=str(i),
+                    question=f'Benchmark question {j}?',
+                    options=['A', 'B', 'C', 'D'],
+                    correct_index=0,
+                    explanation='A is correct.'
+                ))
+        for i in range(users):
+            db.session.add(User(
+                id=f'bench-{i}',
+                email=f'bench-{i}@example.com',
+                username=f'bench{i}',
+                password_hash=password_hash
+            ))
+        db.session.commit()
+        return [create_access_token(identity=f'bench-{i}') for i in range(users)]
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
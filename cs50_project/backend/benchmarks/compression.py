@@ -0,0 +1,128 @@
+"""
+Benchmark: bytes on the wire and CPU per request for topic bodies.
+
+Seeds a fresh SQLite database with the real topics from seed_data.py and
+serves each topic repeatedly in four ways:
+
+    jsonify             serialize on every request, no compression
+    gzip_on_the_fly     serialize and gzip (level 6) on every request
+    gzip_precompressed  the stored gzip bytes from the catalog
+    br_precompressed    the stored brotli bytes (only if brotli is installed)
+
+All four go through the same unauthenticated benchmark routes, so JWT and
+test-client overhead is identical and the CPU numbers compare only the
+body work.
+
+Run from the project root:
+    python -m backend.benchmarks.compression --requests 500
+"""
+import argparse
+import contextlib
+import gzip
+import io
+import json
+import os
+import tempfile
+import time
+from flask import jsonify
+try:
+    from backend.benchmarks.common import build_app
+    from backend.catalog import get_catalog
+    from backend.http_cache import ENCODINGS, precompressed_response
+    from backend.models import db
+    from backend.seed_data import seed_database
+except ModuleNotFoundError:
+    from common import build_app
+    from catalog import get_catalog
+    from http_cache import ENCODINGS, precompressed_response
+    from models import db
+    from seed_data import seed_database
+
+
+def add_benchmark_routes(app):
+    def serialized(topic_id):
+        return jsonify({'topic': get_catalog().snapshot().get(topic_id)})
+
+    def gzip_on_the_fly(topic_id):
+        response = serialized(topic_id)
+        response.set_data(gzip.compress(response.get_data(), compresslevel=6))
+        response.headers['Content-Encoding'] = 'gzip'
+        return response
+
+    def precompressed(topic_id):
+        catalog = get_catalog().snapshot()
+        return precompressed_response(catalog.topic_body(topic_id), catalog.topic_etag(topic_id))
+
+    app.add_url_rule('/bench/jsonify/<topic_id>', 'bench_jsonify', serialized)
+    app.add_url_rule('/bench/gzip/<topic_id>', 'bench_gzip', gzip_on_the_fly)
+    app.add_url_rule('/bench/precompressed/<topic_id>', 'bench_precompressed', precompressed)
+
+
+def run(client, url, topic_ids, requests, accept_encoding):
+    headers = {'Accept-Encoding': accept_encoding} if accept_encoding else {}
+    # Warm up: loads the catalog and fills the precompressed bodies
+    for topic_id in topic_ids:
+        client.get(f'{url}/{topic_id}', headers=headers)
+
+    total_bytes = 0
+    cpu_started = time.process_time()
+    started = time.perf_counter()
+    for i in range(requests):
+        response = client.get(f'{url}/{topic_ids[i % len(topic_ids)]}', headers=headers)
+        assert response.status_code == 200
+        total_bytes += len(response.get_data())
+    cpu = time.process_time() - cpu_started
+    elapsed = time.perf_counter() - started
+
+    return {
+        'bytes_per_request': round(total_bytes / requests),
+        'cpu_us_per_request': round(cpu / requests * 1e6, 1),
+        'wall_us_per_request': round(elapsed / requests * 1e6, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # seed_database() builds its own app from DATABASE_URL
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+        with contextlib.redirect_stdout(io.StringIO()):
+            seed_database()
+
+        app = build_app(workdir)
+        add_benchmark_routes(app)
+        client = app.test_client()
+        with app.app_context():
+            topic_ids = get_catalog().snapshot().order
+
+        modes = {
+            'jsonify': ('/bench/jsonify', None),
+            'gzip_on_the_fly': ('/bench/gzip', 'gzip'),
+            'gzip_precompressed': ('/bench/precompressed', 'gzip'),
+        }
+        if 'br' in ENCODINGS:
+            modes['br_precompressed'] = ('/bench/precompressed', 'br')
+
+        results = {
+            mode: run(client, url, topic_ids, args.requests, accept_encoding)
+            for mode, (url, accept_encoding) in modes.items()
+        }
+        with app.app_context():
+            db.engine.dispose()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f'{len(topic_ids)} topics, {args.requests} requests per mode')
+    for mode, result in results.items():
+        print(f"{mode:>19}: {result['bytes_per_request']:>7} B/request  "
+              f"cpu {result['cpu_us_per_request']:>8} us/request  "
+              f"wall {result['wall_us_per_request']:>8} us/request")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+"""
+Benchmark: leaderboard reads and updates at production user counts.
+
+Builds the in-memory leaderboard from --users synthetic rows (streaks and
+answer counts drawn from skewed distributions, so there are many ties
+near zero) and times, per operation, the median over --ops random users:
+
+    rank      the caller's rank on one metric
+    top       the top --limit users on one metric
+    around    the caller's rank plus --neighbors users either side
+    update    re-ranking one user on all metrics after a submit
+
+With --sql it also loads the same users into a fresh SQLite database and
+times the naive queries the index replaces: ORDER BY ... LIMIT for the
+top-K and a COUNT(*) of the users ahead of the caller for a rank.
+
+Run from the project root:
+    python -m backend.benchmarks.leaderboard --users 1000000
+    python -m backend.benchmarks.leaderboard --users 1000000 --sql
+"""
+import argparse
+import json
+import random
+import resource
+import statistics
+import tempfile
+import time
+from sqlalchemy import func, insert, select
+try:
+    from backend.benchmarks.common import build_app
+    from backend.leaderboard import METRICS, Leaderboard
+    from backend.models import db, User
+except ModuleNotFoundError:
+    from common import build_app
+    from leaderboard import METRICS, Leaderboard
+    from models import db, User
+
+
+def synthetic_rows(users, rng):
+    for i in range(users):
+        best = int(rng.paretovariate(1.5)) - 1
+        quizzes = int(rng.lognormvariate(2.5, 1.5))
+        yield (f'user-{i}', f'user{i}', rng.randint(0, best), best,
+               int(quizzes * 5 * rng.betavariate(6, 3)), quizzes)
+
+
+def median_us(operation, arguments):
+    timings = []
+    for argument in arguments:
+        started = time.perf_counter()
+        operation(argument)
+        timings.append(time.perf_counter() - started)
+    return round(statistics.median(timings) * 1e6, 2)
+
+
+def max_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def bench_index(rows, args, rng):
+    rss_before = max_rss_mb()
+    started = time.perf_counter()
+    board = Leaderboard(rows)
+    build_seconds = time.perf_counter() - started
+
+    user_ids = [f'user-{rng.randrange(len(rows))}' for _ in range(args.ops)]
+    metric = 'dailyStreak'
+    updates = [
+        (user_id, 'renamed', rng.randint(0, 30), rng.randint(30, 60), rng.randint(0, 500), rng.randint(0, 100))
+        for user_id in user_ids
+    ]
+    return {
+        'build_seconds': round(build_seconds, 2),
+        'max_rss_growth_mb': round(max_rss_mb() - rss_before),
+        'rank_us': median_us(lambda user_id: board.rank(metric, user_id), user_ids),
+        'top_us': median_us(lambda _: board.top(metric, args.limit), user_ids),
+        'around_us': median_us(lambda user_id: board.around(metric, user_id, args.neighbors), user_ids),
+        'update_us': median_us(lambda row: board.update([row]), updates),
+    }
+
+
+def bench_sql(rows, args, rng):
+    with tempfile.TemporaryDirectory() as workdir:
+        app = build_app(workdir, LEADERBOARD_ENABLED=False)
+        with app.app_context():
+            columns = ('id', 'username', *(column.key for column in METRICS.values()))
+            for start in range(0, len(rows), 50_000):
+                db.session.execute(insert(User), [
+                    {**dict(zip(columns, row)), 'email': f'{row[0]}@example.com', 'password_hash': 'unused'}
+                    for row in rows[start:start + 50_000]
+                ])
+            db.session.commit()
+
+            column = METRICS['dailyStreak']
+            values = {row[0]: row[2] for row in rows}
+            user_ids = [f'user-{rng.randrange(len(rows))}' for _ in range(args.sql_ops)]
+            result = {
+                'top_us': median_us(
+                    lambda _: db.session.execute(
+                        select(User.username, column).order_by(column.desc(), User.id).limit(args.limit)
+                    ).all(),
+                    user_ids
+                ),
+                'rank_us': median_us(
+                    lambda user_id: db.session.scalar(
+                        select(func.count()).select_from(User).where(column > values[user_id])
+                    ),
+                    user_ids
+                ),
+            }
+            db.session.remove()
+            db.engine.dispose()
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--users', type=int, default=1_000_000)
+    parser.add_argument('--ops', type=int, default=10_000, help='timed operations per kind')
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--neighbors', type=int, default=2)
+    parser.add_argument('--sql', action='store_true', help='also time the naive SQL queries')
+    parser.add_argument('--sql-ops', type=int, default=20, help='timed SQL queries per kind')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    rows = list(synthetic_rows(args.users, rng))
+    results = {'users': args.users, 'index': bench_index(rows, args, rng)}
+    if args.sql:
+        results['sql'] = bench_sql(rows, args, rng)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    index = results['index']
+    print(f"{args.users} users: built in {index['build_seconds']} s, max RSS +{index['max_rss_growth_mb']} MB")
+    print(f"  index  rank {index['rank_us']:>10} us  top-{args.limit} {index['top_us']:>10} us  "
+          f"around {index['around_us']:>8} us  update {index['update_us']:>8} us")
+    if args.sql:
+        sql = results['sql']
+        print(f"  sql    rank {sql['rank_us']:>10} us  top-{args.limit} {sql['top_us']:>10} us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,312 @@
+"""
+Benchmark: end-to-end load test of the API with mixed traffic.
+
+Boots create_app() against a local database (a fresh SQLite file by
+default, or an empty database given with --database-url), seeds synthetic
+topics and users, mints a JWT per user and drives a weighted mix of
+requests from --concurrency threads for --duration seconds:
+
+    browse          GET  /api/topics/
+    topic           GET  /api/topics/<id>
+    daily           GET  /api/topics/daily
+    profile         GET  /api/users/profile
+    progress        GET  /api/users/progress
+    practice_submit POST /api/quizzes/practice/submit
+    daily_submit    POST /api/quizzes/daily/submit
+
+Each thread plays one user at a time, picking scenarios from a seeded RNG
+so runs with the same arguments send the same sequence. Requests carry
+If-None-Match like the frontend does, so cached routes answer 304 where
+they would in production.
+
+Reports throughput and p50/p95/p99 latency per route and overall, plus
+the mean and max number of SQL statements each request ran (counted per
+thread, so concurrent requests are not mixed up). With --json or
+--output the results, along with the commit and settings they were taken
+at, are written as JSON; --compare prints the change against such a file.
+
+Run from the project root:
+    python -m backend.benchmarks.load --concurrency 8 --duration 10
+    python -m backend.benchmarks.load --output before.json
+    python -m backend.benchmarks.load --compare before.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from sqlalchemy import event
+try:
+    from backend.benchmarks.common import build_app, percentile, seed
+    from backend.models import db
+except ModuleNotFoundError:
+    from common import build_app, percentile, seed
+    from models import db
+
+# Relative weights of each scenario in the default mix
+DEFAULT_MIX = {
+    'browse': 30,
+    'topic': 25,
+    'daily': 15,
+    'profile': 10,
+    'progress': 5,
+    'practice_submit': 10,
+    'daily_submit': 5,
+}
+
+
+def scenario_request(name, rng, topic_ids):
+    """(method, url, body) for one request of the named scenario"""
+    if name == 'browse':
+        return 'GET', '/api/topics/', None
+    if name == 'topic':
+        return 'GET', f'/api/topics/{rng.choice(topic_ids)}', None
+    if name == 'daily':
+        return 'GET', '/api/topics/daily', None
+    if name == 'profile':
+        return 'GET', '/api/users/profile', None
+    if name == 'progress':
+        return 'GET', '/api/users/progress?limit=20', None
+    if name == 'practice_submit':
+        total = 5
+        return 'POST', '/api/quizzes/practice/submit', {
+            'topicId': rng.choice(topic_ids), 'correctCount': rng.randint(0, total), 'totalQuestions': total
+        }
+    if name == 'daily_submit':
+        # Repeats on the same day answer 200 "Already completed today"
+        return 'POST', '/api/quizzes/daily/submit', {'correctCount': 4, 'totalQuestions': 5}
+    raise ValueError(f'Unknown scenario: {name}')
+
+
+def parse_mix(value):
+    """Parse "browse=30,topic=25" into a weights dict"""
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f'Unknown scenario: {name}')
+        try:
+            mix[name] = int(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f'Weight for {name} must be an integer') from None
+    if not any(mix.values()):
+        raise argparse.ArgumentTypeError('The mix needs at least one positive weight')
+    return mix
+
+
+class ThreadQueryCounter:
+    """Count SQL statements per thread while attached to an engine"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self._local = threading.local()
+
+    def take(self):
+        """Return and reset the calling thread's count"""
+        count = getattr(self._local, 'count', 0)
+        self._local.count = 0
+        return count
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._record)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(self.engine, 'before_cursor_execute', self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self._local.count = getattr(self._local, 'count', 0) + 1
+
+
+def run(app, tokens, topic_ids, mix, concurrency, duration, warmup=1.0, seed_value=0, think_time=0.0):
+    """Drive mixed traffic and return per-route and overall results"""
+    names = [name for name, weight in mix.items() if weight > 0]
+    weights = [mix[name] for name in names]
+    samples = []           # (scenario, status, seconds, queries)
+    lock = threading.Lock()
+    barrier = threading.Barrier(concurrency + 1)
+    measuring = threading.Event()
+    stop = threading.Event()
+
+    with app.app_context():
+        engine = db.engine
+
+    def worker(n):
+        rng = random.Random(seed_value * 1000 + n)
+        client = app.test_client()
+        etags = {}
+        local = []
+        request_number = 0
+        barrier.wait()
+        while not stop.is_set():
+            # Threads cycle through disjoint slices of the user pool
+            token = tokens[(n + request_number * concurrency) % len(tokens)]
+            request_number += 1
+            name = rng.choices(names, weights)[0]
+            method, url, body = scenario_request(name, rng, topic_ids)
+            headers = {'Authorization': f'Bearer {token}'}
+            if method == 'GET' and (token, url) in etags:
+                headers['If-None-Match'] = etags[token, url]
+
+            counter.take()
+            started = time.perf_counter()
+            response = client.open(url, method=method, json=body, headers=headers)
+            response.get_data()
+            elapsed = time.perf_counter() - started
+            queries = counter.take()
+
+            if response.headers.get('ETag'):
+                etags[token, url] = response.headers['ETag']
+            if measuring.is_set():
+                local.append((name, response.status_code, elapsed, queries))
+            if think_time:
+                time.sleep(think_time)
+        with lock:
+            samples.extend(local)
+
+    with ThreadQueryCounter(engine) as counter:
+        pool = [threading.Thread(target=worker, args=(n,)) for n in range(concurrency)]
+        for thread in pool:
+            thread.start()
+        barrier.wait()
+        time.sleep(warmup)
+        measuring.set()
+        started = time.perf_counter()
+        time.sleep(duration)
+        measuring.clear()
+        elapsed = time.perf_counter() - started
+        stop.set()
+        for thread in pool:
+            thread.join()
+
+    routes = {}
+    for name in names:
+        route_samples = [sample for sample in samples if sample[0] == name]
+        if route_samples:
+            routes[name] = summarize(route_samples, elapsed)
+    return {'routes': routes, 'overall': summarize(samples, elapsed)}
+
+
+def summarize(samples, elapsed):
+    latencies = sorted(sample[2] for sample in samples)
+    queries = [sample[3] for sample in samples]
+    statuses = {}
+    for sample in samples:
+        statuses[str(sample[1])] = statuses.get(str(sample[1]), 0) + 1
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for sample in samples if sample[1] >= 400),
+        'statuses': dict(sorted(statuses.items())),
+        'throughput_rps': round(len(samples) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        'queries_mean': round(sum(queries) / len(queries), 2) if queries else 0.0,
+        'queries_max': max(queries, default=0),
+    }
+
+
+def environment(app, args):
+    """Settings and revision the results were taken at, for diffing runs"""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    with app.app_context():
+        dialect = db.engine.dialect.name
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'database': dialect,
+        'json_provider': type(app.json).__name__,
+        'concurrency': args.concurrency,
+        'duration': args.duration,
+        'warmup': args.warmup,
+        'users': args.users,
+        'topics': args.topics,
+        'questions': args.questions,
+        'seed': args.seed,
+        'think_time': args.think_time,
+        'mix': args.mix,
+    }
+
+
+def print_results(results):
+    print(f"{'route':>16} {'reqs':>7} {'err':>5} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'queries':>8} {'max q':>6}")
+    for name, result in [*results['routes'].items(), ('overall', results['overall'])]:
+        print(f"{name:>16} {result['requests']:>7} {result['errors']:>5} {result['throughput_rps']:>8} "
+              f"{result['p50_ms']:>8} {result['p95_ms']:>8} {result['p99_ms']:>8} "
+              f"{result['queries_mean']:>8} {result['queries_max']:>6}")
+
+
+def print_comparison(baseline, results):
+    print(f"\nvs {baseline['environment'].get('commit') or 'baseline'}:")
+    for name, result in [*results['routes'].items(), ('overall', results['overall'])]:
+        before = baseline['routes'].get(name) if name != 'overall' else baseline['overall']
+        if not before:
+            continue
+        changes = []
+        for key in ('throughput_rps', 'p50_ms', 'p95_ms', 'p99_ms', 'queries_mean'):
+            if before[key]:
+                changes.append(f'{key} {(result[key] - before[key]) / before[key]:+.1%}')
+        print(f"{name:>16}: {'  '.join(changes)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--concurrency', type=int, default=8, help='client threads')
+    parser.add_argument('--duration', type=float, default=10.0, help='measured seconds')
+    parser.add_argument('--warmup', type=float, default=1.0, help='unmeasured seconds before measuring')
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--topics', type=int, default=50)
+    parser.add_argument('--questions', type=int, default=5, help='questions per topic')
+    parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX,
+                        help='scenario weights, e.g. "browse=30,topic=25,practice_submit=10"')
+    parser.add_argument('--think-time', type=float, default=0.0, help='seconds each thread sleeps between requests')
+    parser.add_argument('--seed', type=int, default=0, help='RNG seed for the request sequence')
+    parser.add_argument('--database-url', help='empty database to run against (default: a temporary SQLite file)')
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    parser.add_argument('--output', help='also write the JSON results to this file')
+    parser.add_argument('--compare', help='JSON results of an earlier run to compare against')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        config = {'SQLALCHEMY_DATABASE_URI': args.database_url} if args.database_url else {}
+        app = build_app(workdir, **config)
+        tokens = seed(app, topics=args.topics, users=args.users, content_sentences=200, questions=args.questions)
+        topic_ids = [str(i) for i in range(args.topics)]
+        try:
+            results = run(app, tokens, topic_ids, args.mix, args.concurrency, args.duration,
+                          warmup=args.warmup, seed_value=args.seed, think_time=args.think_time)
+            results = {'environment': environment(app, args), **results}
+        finally:
+            with app.app_context():
+                db.engine.dispose()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    else:
+        print_results(results)
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(json.load(f), results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+"""
+Benchmark: login throughput and cheap-request latency vs hashing workers.
+
+For each PASSWORD_HASH_WORKERS setting, boots the app against a fresh
+SQLite database, fires logins from several threads and, at the same time,
+polls /api/topics/ from one more thread. Reports logins per second, how
+many logins were shed with 503, and the topics latency seen while the
+burst was running (the number that shows whether hashing starves cheap
+requests).
+
+Run from the project root:
+    python -m backend.benchmarks.login --workers 0 1 2 4 --threads 16
+"""
+import argparse
+import json
+import tempfile
+import threading
+import time
+from werkzeug.security import generate_password_hash
+try:
+    from backend.benchmarks.common import build_app, percentile, seed
+    from backend.models import db
+except ModuleNotFoundError:
+    from common import build_app, percentile, seed
+    from models import db
+
+PASSWORD = 'benchmark-password'
+
+
+def run(app, users, token, threads, logins_per_thread):
+    login_latencies = []
+    topic_latencies = []
+    rejected = [0]
+    lock = threading.Lock()
+    barrier = threading.Barrier(threads + 2)
+    done = threading.Event()
+
+    def login_worker(n):
+        client = app.test_client()
+        local = []
+        barrier.wait()
+        for i in range(logins_per_thread):
+            body = {'email': f'bench-{(n + i * threads) % users}@example.com', 'password': PASSWORD}
+            started = time.perf_counter()
+            response = client.post('/api/auth/login', json=body)
+            elapsed = time.perf_counter() - started
+            if response.status_code == 503:
+                with lock:
+                    rejected[0] += 1
+                continue
+            assert response.status_code == 200, response.get_json()
+            local.append(elapsed)
+        with lock:
+            login_latencies.extend(local)
+
+    def topics_worker():
+        client = app.test_client()
+        headers = {'Authorization': f'Bearer {token}'}
+        barrier.wait()
+        while not done.is_set():
+            started = time.perf_counter()
+            response = client.get('/api/topics/', headers=headers)
+            topic_latencies.append(time.perf_counter() - started)
+            assert response.status_code == 200
+            time.sleep(0.005)
+
+    pool = [threading.Thread(target=login_worker, args=(n,)) for n in range(threads)]
+    poller = threading.Thread(target=topics_worker)
+    for thread in (*pool, poller):
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    done.set()
+    poller.join()
+
+    login_latencies.sort()
+    topic_latencies.sort()
+    return {
+        'logins': len(login_latencies),
+        'rejected_503': rejected[0],
+        'seconds': round(elapsed, 3),
+        'logins_per_second': round(len(login_latencies) / elapsed, 1),
+        'login_p50_ms': round(percentile(login_latencies, 0.50) * 1000, 2),
+        'login_p99_ms': round(percentile(login_latencies, 0.99) * 1000, 2),
+        'topics_p50_ms': round(percentile(topic_latencies, 0.50) * 1000, 2),
+        'topics_p99_ms': round(percentile(topic_latencies, 0.99) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--workers', type=int, nargs='+', default=[0, 1, 2, 4],
+                        help='PASSWORD_HASH_WORKERS values to compare (0 hashes on the request thread)')
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--logins', type=int, default=10, help='logins per thread')
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--method', default='scrypt', help='PASSWORD_HASH_METHOD')
+    parser.add_argument('--queue-depth', type=int, default=None,
+                        help='PASSWORD_HASH_QUEUE_DEPTH (default: large enough to never shed load)')
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    args = parser.parse_args()
+
+    password_hash = generate_password_hash(PASSWORD, args.method)
+    results = {}
+    for workers in args.workers:
+        with tempfile.TemporaryDirectory() as workdir:
+            app = build_app(
+                workdir,
+                PASSWORD_HASH_METHOD=args.method,
+                PASSWORD_HASH_WORKERS=workers,
+                PASSWORD_HASH_QUEUE_DEPTH=args.queue_depth or args.threads
+            )
+            tokens = seed(app, users=args.users, password_hash=password_hash)
+            hasher = app.extensions['password_hasher']
+            with app.app_context():
+                # Start the pool outside the timed section
+                hasher.verify(password_hash, PASSWORD)
+            try:
+                results[workers] = run(app, args.users, tokens[0], args.threads, args.logins)
+            finally:
+                hasher.shutdown()
+                with app.app_context():
+                    db.engine.dispose()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for workers, result in results.items():
+        print(f"workers={workers:<3} {result['logins_per_second']:>7} logins/s  "
+              f"login p99 {result['login_p99_ms']:>8} ms  "
+              f"topics p50 {result['topics_p50_ms']:>7} ms  p99 {result['topics_p99_ms']:>7} ms  "
+              f"({result['logins']} ok, {result['rejected_503']} shed)")
+
+
+if __name__ == '__main__':
+    main()
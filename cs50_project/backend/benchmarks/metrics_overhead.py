@@ -0,0 +1,113 @@
+"""
+Benchmark: per-request cost of the /metrics instrumentation.
+
+Boots the app twice against fresh SQLite databases, with METRICS_ENABLED
+on and off, and measures two things per setup:
+
+    hooks      the request lifecycle alone: before_request hooks, one
+               SELECT 1, after_request and teardown hooks, without routing
+               or a view. The difference between the setups is the cost
+               the instrumentation adds to every request.
+    requests   full requests through the test client to cheap routes
+               (a warm catalog read and a cached profile), where the fixed
+               cost is as large a share of the request as it gets
+
+Rounds alternate between the two apps so drift in the machine's speed hits
+both alike, and every figure is the median over --rounds. On a busy or
+single-CPU machine the full-request difference can be smaller than the
+round-to-round noise; the hooks figure is the stable one.
+
+Run from the project root:
+    python -m backend.benchmarks.metrics_overhead --requests 200 --rounds 30
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from flask import Response
+from sqlalchemy import text
+try:
+    from backend.benchmarks.common import build_app, seed
+    from backend.models import db
+except ModuleNotFoundError:
+    from common import build_app, seed
+    from models import db
+
+SETUPS = {'disabled': {'METRICS_ENABLED': False}, 'enabled': {'METRICS_ENABLED': True}}
+URLS = ('/api/topics/', '/api/users/profile')
+
+
+def time_hooks(app, iterations):
+    with app.test_request_context('/api/topics/'):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            app.preprocess_request()
+            db.session.execute(text('SELECT 1'))
+            app.process_response(Response())
+            app.do_teardown_request()
+        return (time.perf_counter() - started) / iterations
+
+
+def time_requests(client, url, headers, requests):
+    started = time.perf_counter()
+    for _ in range(requests):
+        response = client.get(url, headers=headers)
+        assert response.status_code == 200, response.get_data(as_text=True)
+    return (time.perf_counter() - started) / requests
+
+
+def overhead(disabled, enabled):
+    disabled, enabled = statistics.median(disabled), statistics.median(enabled)
+    return {
+        'disabled_us': round(disabled * 1e6, 1),
+        'enabled_us': round(enabled * 1e6, 1),
+        'overhead_us': round((enabled - disabled) * 1e6, 1),
+        'overhead_pct': round((enabled - disabled) / disabled * 100, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--requests', type=int, default=200, help='requests per route per round')
+    parser.add_argument('--rounds', type=int, default=30)
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        apps = {}
+        samples = {name: {key: [] for key in ('hooks',) + URLS} for name in SETUPS}
+        for name, config in SETUPS.items():
+            os.mkdir(os.path.join(workdir, name))
+            app = build_app(os.path.join(workdir, name), **config)
+            [token] = seed(app, topics=10, users=1)
+            headers = {'Authorization': f'Bearer {token}'}
+            client = app.test_client()
+            for url in URLS:
+                time_requests(client, url, headers, 50)    # warm caches
+            apps[name] = (app, client, headers)
+
+        for _ in range(args.rounds):
+            for name, (app, client, headers) in apps.items():
+                samples[name]['hooks'].append(time_hooks(app, args.requests))
+                for url in URLS:
+                    samples[name][url].append(time_requests(client, url, headers, args.requests))
+
+        for app, _, _ in apps.values():
+            with app.app_context():
+                db.engine.dispose()
+
+    results = {key: overhead(samples['disabled'][key], samples['enabled'][key]) for key in ('hooks',) + URLS}
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f'{args.requests} iterations per round, median of {args.rounds} rounds')
+    for key, result in results.items():
+        print(f"{key:<22} disabled {result['disabled_us']:>8} us  enabled {result['enabled_us']:>8} us  "
+              f"overhead {result['overhead_us']:>6} us ({result['overhead_pct']}%)")
+
+
+if __name__ == '__main__':
+    main()
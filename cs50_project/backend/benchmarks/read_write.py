@@ -0,0 +1,157 @@
+"""
+Benchmark: /api/topics/ latency while quiz submits are running.
+
+Boots the app against a fresh SQLite database once per engine setup,
+starts --writers threads posting practice submits at a fixed combined
+--write-rate (so both setups do the same write work) and --readers
+threads reading /api/topics/ and /api/users/progress, for --duration
+seconds. Compared setups:
+
+    rollback  SQLite's defaults before engine configuration: rollback
+              journal, synchronous=FULL, no mmap
+    wal       the app's defaults: WAL, synchronous=NORMAL, 256 MB mmap
+
+Reports read latency (p50/p95/p99) per route, read and write throughput
+and failed requests (e.g. "database is locked" after busy_timeout). The
+replica setting is not compared here: on one machine a replica would only
+be a second connection pool to the same file.
+
+Run from the project root:
+    python -m backend.benchmarks.read_write --writers 4 --write-rate 60 --readers 2 --duration 5
+"""
+import argparse
+import json
+import tempfile
+import threading
+import time
+try:
+    from backend.benchmarks.common import build_app, percentile, seed
+    from backend.models import db
+except ModuleNotFoundError:
+    from common import build_app, percentile, seed
+    from models import db
+
+SETUPS = {
+    'rollback': {'SQLITE_JOURNAL_MODE': 'DELETE', 'SQLITE_SYNCHRONOUS': 'FULL', 'SQLITE_MMAP_SIZE': 0},
+    'wal': {},
+}
+READ_URLS = ('/api/topics/', '/api/users/progress?limit=20')
+
+
+def run(app, tokens, writers, readers, duration, write_rate):
+    reads = {url: [] for url in READ_URLS}
+    counts = {'writes': 0, 'write_errors': 0, 'read_errors': 0}
+    lock = threading.Lock()
+    barrier = threading.Barrier(writers + readers + 1)
+    stop = threading.Event()
+
+    def writer(n):
+        client = app.test_client()
+        headers = {'Authorization': f'Bearer {tokens[n % len(tokens)]}'}
+        done = errors = 0
+        interval = writers / write_rate
+        barrier.wait()
+        next_at = time.perf_counter() + interval * n / writers
+        while not stop.is_set():
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            next_at += interval
+            response = client.post('/api/quizzes/practice/submit', headers=headers,
+                                   json={'topicId': str(done % 10), 'correctCount': 3, 'totalQuestions': 5})
+            if response.status_code == 200:
+                done += 1
+            else:
+                errors += 1
+        with lock:
+            counts['writes'] += done
+            counts['write_errors'] += errors
+
+    def reader(n):
+        client = app.test_client()
+        # Readers are other users than the writers, like real traffic
+        headers = {'Authorization': f'Bearer {tokens[-1 - n % len(tokens)]}'}
+        local = {url: [] for url in READ_URLS}
+        errors = 0
+        barrier.wait()
+        i = 0
+        while not stop.is_set():
+            url = READ_URLS[i % len(READ_URLS)]
+            i += 1
+            started = time.perf_counter()
+            response = client.get(url, headers=headers)
+            elapsed = time.perf_counter() - started
+            if response.status_code == 200:
+                local[url].append(elapsed)
+            else:
+                errors += 1
+        with lock:
+            for url, latencies in local.items():
+                reads[url].extend(latencies)
+            counts['read_errors'] += errors
+
+    pool = [threading.Thread(target=writer, args=(n,)) for n in range(writers)]
+    pool += [threading.Thread(target=reader, args=(n,)) for n in range(readers)]
+    for thread in pool:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    time.sleep(duration)
+    stop.set()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    result = {
+        'writes_per_second': round(counts['writes'] / elapsed, 1),
+        'write_errors': counts['write_errors'],
+        'read_errors': counts['read_errors'],
+        'reads_per_second': round(sum(len(latencies) for latencies in reads.values()) / elapsed, 1),
+    }
+    for url, latencies in reads.items():
+        latencies.sort()
+        result[url] = {
+            'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        }
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=2)
+    parser.add_argument('--write-rate', type=float, default=60.0, help='submits per second across all writers')
+    parser.add_argument('--duration', type=float, default=5.0, help='seconds per setup')
+    parser.add_argument('--setups', nargs='+', choices=list(SETUPS), default=list(SETUPS))
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    args = parser.parse_args()
+
+    results = {}
+    for name in args.setups:
+        with tempfile.TemporaryDirectory() as workdir:
+            app = build_app(workdir, **SETUPS[name])
+            tokens = seed(app, topics=10, users=args.writers + args.readers, questions=1)
+            try:
+                results[name] = run(app, tokens, args.writers, args.readers, args.duration, args.write_rate)
+            finally:
+                with app.app_context():
+                    db.engine.dispose()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f'{args.writers} writer threads at {args.write_rate} submits/s, {args.readers} reader threads, '
+          f'{args.duration}s per setup')
+    for name, result in results.items():
+        print(f"{name:>9}: {result['writes_per_second']:>7} writes/s  {result['reads_per_second']:>7} reads/s  "
+              f"errors {result['write_errors']}w/{result['read_errors']}r")
+        for url in READ_URLS:
+            latency = result[url]
+            print(f"{'':>11}{url:<30} p50 {latency['p50_ms']:>7} ms  p95 {latency['p95_ms']:>7} ms  "
+                  f"p99 {latency['p99_ms']:>7} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark: review queue reads as users track more topics.
+
+Creates one user per --sizes entry, with that many review items whose
+due days are spread over the past and next --spread days, and times the
+median over --ops reads of the first --limit due items:
+
+    queue     the endpoint's range scan of the (user_id, due_day) index
+    scan      reading all of the user's items by primary key and sorting
+              them in Python, which is what the queue costs without the index
+
+The queue should take about the same time at every size, while the scan
+grows with the number of items.
+
+Run from the project root:
+    python -m backend.benchmarks.review_queue
+    python -m backend.benchmarks.review_queue --sizes 10,1000,10000 --limit 20
+"""
+import argparse
+import json
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from sqlalchemy import insert
+try:
+    from backend.benchmarks.common import build_app
+    from backend.models import db, ReviewItem, Topic, User
+    from backend.reviews import review_queue, review_queue_query
+except ModuleNotFoundError:
+    from common import build_app
+    from models import db, ReviewItem, Topic, User
+    from reviews import review_queue, review_queue_query
+
+
+def load(sizes, spread, today, rng):
+    db.session.execute(insert(Topic), [
+        {'id': f't{i}', 'title': f'Topic {i}', 'description': 'Benchmark topic', 'content': '# Benchmark',
+         'category': 'Benchmark', 'difficulty': 'Beginner', 'estimated_time': 5}
+        for i in range(max(sizes))
+    ])
+    reviewed_at = datetime.combine(today, datetime.min.time())
+    for size in sizes:
+        user_id = f'bench-{size}'
+        db.session.execute(insert(User), [{'id': user_id, 'email': f'{user_id}@example.com',
+                                           'username': user_id, 'password_hash': 'unused'}])
+        db.session.execute(insert(ReviewItem), [
+            {'user_id': user_id, 'topic_id': f't{i}', 'ease': 2.5, 'interval_days': 6, 'repetitions': 2,
+             'due_day': today + timedelta(days=rng.randint(-spread, spread)), 'last_reviewed_at': reviewed_at}
+            for i in range(size)
+        ])
+    db.session.commit()
+
+
+def scan_queue(user_id, until, limit):
+    items = db.session.execute(
+        db.select(ReviewItem.topic_id, ReviewItem.due_day).where(ReviewItem.user_id == user_id)
+    ).all()
+    return sorted((item for item in items if item.due_day <= until), key=lambda item: item.due_day)[:limit]
+
+
+def median_us(operation, ops):
+    timings = []
+    for _ in range(ops):
+        started = time.perf_counter()
+        operation()
+        timings.append(time.perf_counter() - started)
+    return round(statistics.median(timings) * 1e6, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', default='10,100,1000,10000', help='comma-separated review items per user')
+    parser.add_argument('--limit', type=int, default=10, help='items per queue read')
+    parser.add_argument('--spread', type=int, default=60, help='due days are spread over +/- this many days')
+    parser.add_argument('--ops', type=int, default=500, help='timed reads per size and kind')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    today = date.today()
+    results = {'limit': args.limit, 'sizes': {}}
+    with tempfile.TemporaryDirectory() as workdir:
+        app = build_app(workdir, LEADERBOARD_ENABLED=False)
+        with app.app_context():
+            load(sizes, args.spread, today, random.Random(args.seed))
+            for size in sizes:
+                user_id = f'bench-{size}'
+                results['sizes'][size] = {
+                    'queue_us': median_us(lambda: review_queue(user_id, today, args.limit), args.ops),
+                    'scan_us': median_us(lambda: scan_queue(user_id, today, args.limit), max(1, args.ops // 10)),
+                }
+            plan = db.session.connection().exec_driver_sql(
+                f"EXPLAIN QUERY PLAN {review_queue_query('x', today, args.limit).compile(compile_kwargs={'literal_binds': True})}"
+            ).all()
+            results['plan'] = [row[-1] for row in plan]
+            db.session.remove()
+            db.engine.dispose()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"First {args.limit} due items ({'; '.join(results['plan'])})")
+    for size, timing in results['sizes'].items():
+        per_item = timing['queue_us'] / args.limit
+        print(f"  {size:>6} items   queue {timing['queue_us']:>8} us ({per_item:.1f} us/item)   "
+              f"scan {timing['scan_us']:>9} us")
+
+
+if __name__ == '__main__':
+    main()
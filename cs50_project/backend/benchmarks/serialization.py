@@ -0,0 +1,115 @@
+"""
+Benchmark: cost of turning 10k progress rows into a JSON body.
+
+Seeds a fresh SQLite database with one user and --rows UserProgress rows
+and builds the same response body two ways:
+
+    before  load UserProgress entities, call to_dict() on each and encode
+            with Flask's stdlib JSON provider
+    after   select plain column tuples, serialize them with the precompiled
+            PROGRESS_ROW serializer and encode with the orjson provider
+            (falls back to stdlib when orjson is not installed)
+
+Each run is split into fetch (query plus building the dicts) and encode,
+and every number is reported per 10,000 rows so runs with different
+--rows compare directly.
+
+Run from the project root:
+    python -m backend.benchmarks.serialization --rows 10000
+"""
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+try:
+    from backend.benchmarks.common import build_app, seed
+    from backend.json_provider import orjson
+    from backend.models import db, UserProgress
+    from backend.routes.users import PROGRESS_ROW
+except ModuleNotFoundError:
+    from common import build_app, seed
+    from json_provider import orjson
+    from models import db, UserProgress
+    from routes.users import PROGRESS_ROW
+
+
+def fetch_entities():
+    progress = UserProgress.query.filter_by(user_id='bench-0').order_by(UserProgress.id).all()
+    return [entry.to_dict() for entry in progress]
+
+
+def fetch_rows():
+    query = (
+        db.select(*PROGRESS_ROW.columns)
+        .where(UserProgress.user_id == 'bench-0')
+        .order_by(UserProgress.id)
+    )
+    return [PROGRESS_ROW(row) for row in db.session.execute(query)]
+
+
+def measure(app, fetch, rows, repeats):
+    fetch_times, encode_times = [], []
+    with app.app_context():
+        for _ in range(repeats):
+            db.session.expunge_all()
+            started = time.perf_counter()
+            payload = fetch()
+            fetched = time.perf_counter()
+            body = app.json.response({'progress': payload}).get_data()
+            fetch_times.append(fetched - started)
+            encode_times.append(time.perf_counter() - fetched)
+    assert len(payload) == rows
+    scale = 10_000 / rows * 1000
+    return {
+        'provider': type(app.json).__name__,
+        'fetch_ms_per_10k': round(statistics.median(fetch_times) * scale, 2),
+        'encode_ms_per_10k': round(statistics.median(encode_times) * scale, 2),
+        'total_ms_per_10k': round(statistics.median(
+            [f + e for f, e in zip(fetch_times, encode_times)]) * scale, 2),
+        'response_bytes': len(body),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--repeats', type=int, default=7)
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    args = parser.parse_args()
+
+    results = {}
+    for mode, fetch, provider in (('before', fetch_entities, 'stdlib'), ('after', fetch_rows, 'auto')):
+        with tempfile.TemporaryDirectory() as workdir:
+            app = build_app(workdir, JSON_PROVIDER=provider)
+            seed(app, topics=10, users=1, content_sentences=1)
+            with app.app_context():
+                started = datetime(2024, 1, 1)
+                db.session.execute(db.insert(UserProgress), [{
+                    'user_id': 'bench-0',
+                    'topic_id': str(i % 10),
+                    'completed_at': started + timedelta(minutes=i),
+                    'completion_day': (started + timedelta(minutes=i)).date(),
+                    'is_daily': False,
+                    'correct_count': i % 5,
+                    'total_questions': 5,
+                } for i in range(args.rows)])
+                db.session.commit()
+            results[mode] = measure(app, fetch, args.rows, args.repeats)
+            with app.app_context():
+                db.engine.dispose()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{args.rows} progress rows, orjson {'installed' if orjson else 'not installed'}")
+    for mode, result in results.items():
+        print(f"{mode:>6} ({result['provider']}): fetch {result['fetch_ms_per_10k']:>8} ms  "
+              f"encode {result['encode_ms_per_10k']:>8} ms  "
+              f"total {result['total_ms_per_10k']:>8} ms per 10k rows  "
+              f"body {result['response_bytes']} B")
+
+
+if __name__ == '__main__':
+    main()
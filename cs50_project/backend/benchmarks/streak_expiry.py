@@ -0,0 +1,116 @@
+"""
+Benchmark: the nightly streak-expiry job at production user counts.
+
+Loads --users synthetic users (--broken of them with a streak that broke
+days ago, the rest active today, yesterday or with no streak) and times:
+
+    first     the job on the fresh data, expiring every broken streak
+    rerun     the same day again, which only reads the finished checkpoint
+    restart   a forced full pass over data with nothing left to expire
+
+By default it uses a fresh SQLite database in a temporary directory.
+Pass --database-url to run against another database, e.g. PostgreSQL;
+the users table must be empty, and the benchmark's users are deleted
+again afterwards.
+
+Run from the project root:
+    python -m backend.benchmarks.streak_expiry --users 1000000
+    python -m backend.benchmarks.streak_expiry --users 1000000 \\
+        --database-url postgresql://localhost/system_spark_bench
+"""
+import argparse
+import json
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+from sqlalchemy import delete, insert
+try:
+    from backend.benchmarks.common import build_app
+    from backend.models import db, JobCheckpoint, User
+    from backend.streak_expiry import JOB_NAME, expire_daily_streaks
+except ModuleNotFoundError:
+    from common import build_app
+    from models import db, JobCheckpoint, User
+    from streak_expiry import JOB_NAME, expire_daily_streaks
+
+
+def synthetic_users(users, broken, today, rng):
+    for i in range(users):
+        if rng.random() < broken:
+            streak, last = rng.randint(1, 60), today - timedelta(days=rng.randint(2, 400))
+        else:
+            streak, last = rng.choice([(rng.randint(1, 60), today), (rng.randint(1, 60), today - timedelta(days=1)),
+                                       (0, None)])
+        yield {'id': f'bench-{i:07d}', 'email': f'bench-{i}@example.com', 'username': f'bench{i}',
+               'password_hash': 'unused', 'daily_streak': streak, 'best_daily_streak': streak,
+               'last_daily_completion': last}
+
+
+def run(args, app):
+    today = date.today()
+    rng = random.Random(args.seed)
+    quiet = lambda message: None
+    with app.app_context():
+        started = time.perf_counter()
+        rows = synthetic_users(args.users, args.broken, today, rng)
+        while batch := [row for _, row in zip(range(50_000), rows)]:
+            db.session.execute(insert(User), batch)
+        db.session.commit()
+        load_seconds = time.perf_counter() - started
+
+        try:
+            first = expire_daily_streaks(day=today, chunk_size=args.chunk_size, log=quiet)
+            rerun = expire_daily_streaks(day=today, chunk_size=args.chunk_size, log=quiet)
+            restart = expire_daily_streaks(day=today, chunk_size=args.chunk_size, restart=True, log=quiet)
+        finally:
+            db.session.rollback()
+            db.session.execute(delete(User).where(User.id.like('bench-%')))
+            db.session.execute(delete(JobCheckpoint).where(JobCheckpoint.name == JOB_NAME))
+            db.session.commit()
+            db.session.remove()
+            db.engine.dispose()
+
+    return {
+        'users': args.users,
+        'dialect': app.config['SQLALCHEMY_DATABASE_URI'].split(':', 1)[0],
+        'chunk_size': args.chunk_size,
+        'load_seconds': round(load_seconds, 2),
+        'expired': first['expired'],
+        'chunks': first['chunks'],
+        'first_seconds': first['seconds'],
+        'rerun_seconds': round(rerun['seconds'], 4),
+        'restart_seconds': restart['seconds'],
+        'restart_expired': restart['expired'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--users', type=int, default=1_000_000)
+    parser.add_argument('--broken', type=float, default=0.3, help='fraction of users with a broken streak')
+    parser.add_argument('--chunk-size', type=int, default=10_000)
+    parser.add_argument('--database-url', help='run against this database instead of a fresh SQLite file')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        config = {'LEADERBOARD_ENABLED': False}
+        if args.database_url:
+            config['SQLALCHEMY_DATABASE_URI'] = args.database_url
+        results = run(args, build_app(workdir, **config))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{results['users']} users on {results['dialect']}, chunks of {results['chunk_size']} "
+          f"(loaded in {results['load_seconds']} s)")
+    print(f"  first    {results['first_seconds']:>8} s  {results['expired']} streaks expired "
+          f"in {results['chunks']} chunks")
+    print(f"  rerun    {results['rerun_seconds']:>8} s")
+    print(f"  restart  {results['restart_seconds']:>8} s  {results['restart_expired']} streaks expired")
+
+
+if __name__ == '__main__':
+    main()
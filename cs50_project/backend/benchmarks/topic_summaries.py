@@ -0,0 +1,100 @@
+"""
+Benchmark: topic listing with full entities vs the summary projection.
+
+Seeds a fresh SQLite database with synthetic topics (1,000 by default,
+each with a long markdown body and a few questions) and compares:
+
+    full     what the listing used to do: load every Topic with its
+             questions and serialize to_dict(include_questions=False),
+             content included
+    summary  the catalog's load: card columns only (content is never
+             selected) plus one grouped question count
+
+For each, reports the time to load the catalog from the database and the
+size of the GET /api/topics/ response body.
+
+Run from the project root:
+    python -m backend.benchmarks.topic_summaries --topics 1000
+"""
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from sqlalchemy.orm import selectinload
+try:
+    from backend.benchmarks.common import build_app, seed
+    from backend.catalog import get_catalog
+    from backend.models import db, Topic
+except ModuleNotFoundError:
+    from common import build_app, seed
+    from catalog import get_catalog
+    from models import db, Topic
+
+
+def load_full():
+    topics = Topic.query.options(selectinload(Topic.questions)).order_by(Topic.created_at, Topic.id).all()
+    return [dict(topic.to_dict(include_questions=False), isCompleted=False) for topic in topics]
+
+
+def load_summary():
+    catalog = get_catalog()
+    catalog.invalidate()
+    return [dict(summary, isCompleted=False) for summary in catalog.snapshot().summaries]
+
+
+def measure(app, load, repeats):
+    timings = []
+    with app.app_context():
+        for _ in range(repeats):
+            db.session.expunge_all()
+            started = time.perf_counter()
+            payload = load()
+            timings.append(time.perf_counter() - started)
+        size = len(app.json.response({'topics': payload}).get_data())
+    return {
+        'load_ms_median': round(statistics.median(timings) * 1000, 2),
+        'load_ms_min': round(min(timings) * 1000, 2),
+        'response_bytes': size,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--topics', type=int, default=1000)
+    parser.add_argument('--content-sentences', type=int, default=300,
+                        help='sentences of filler markdown per topic (~28 bytes each)')
+    parser.add_argument('--questions', type=int, default=5, help='questions per topic')
+    parser.add_argument('--repeats', type=int, default=7)
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        app = build_app(workdir)
+        tokens = seed(app, topics=args.topics, users=1,
+                      content_sentences=args.content_sentences, questions=args.questions)
+
+        results = {
+            'full': measure(app, load_full, args.repeats),
+            'summary': measure(app, load_summary, args.repeats),
+        }
+
+        # Cross-check the summary size against the real endpoint
+        response = app.test_client().get('/api/topics/', headers={'Authorization': f'Bearer {tokens[0]}'})
+        assert response.status_code == 200
+        results['summary']['endpoint_bytes'] = len(response.get_data())
+
+        with app.app_context():
+            db.engine.dispose()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f'{args.topics} topics, {args.questions} questions each')
+    for mode, result in results.items():
+        print(f"{mode:>8}: load {result['load_ms_median']:>8} ms (min {result['load_ms_min']} ms)  "
+              f"response {result['response_bytes']:>10} B")
+
+
+if __name__ == '__main__':
+    main()
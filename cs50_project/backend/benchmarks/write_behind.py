@@ -0,0 +1,106 @@
+"""
+Benchmark: synchronous vs write-behind quiz submission throughput.
+
+Boots the app twice against fresh SQLite databases, hammers
+/api/quizzes/practice/submit from several threads and reports request
+throughput and latency for each mode. For write-behind the time needed
+to drain the journal afterwards is reported separately.
+
+Run from the project root:
+    python -m backend.benchmarks.write_behind --threads 8 --requests 200
+"""
+import argparse
+import json
+import tempfile
+import threading
+import time
+try:
+    from backend.benchmarks.common import build_app, percentile, seed
+    from backend.models import db, User
+except ModuleNotFoundError:
+    from common import build_app, percentile, seed
+    from models import db, User
+
+
+def run(app, tokens, threads, requests_per_thread):
+    latencies = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(n):
+        client = app.test_client()
+        headers = {'Authorization': f'Bearer {tokens[n % len(tokens)]}'}
+        local = []
+        barrier.wait()
+        for i in range(requests_per_thread):
+            started = time.perf_counter()
+            response = client.post('/api/quizzes/practice/submit',
+                                   json={'topicId': str(i % 10), 'correctCount': 3, 'totalQuestions': 5},
+                                   headers=headers)
+            local.append(time.perf_counter() - started)
+            assert response.status_code == 200, response.get_json()
+        with lock:
+            latencies.extend(local)
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for thread in pool:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'seconds': round(elapsed, 3),
+        'throughput_rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=200, help='requests per thread')
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--flush-interval', type=float, default=0.2)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    args = parser.parse_args()
+
+    results = {}
+    for mode in ('sync', 'write_behind'):
+        with tempfile.TemporaryDirectory() as workdir:
+            app = build_app(
+                workdir,
+                PROGRESS_WRITE_BEHIND=mode == 'write_behind',
+                PROGRESS_FLUSH_INTERVAL=args.flush_interval,
+                PROGRESS_FLUSH_BATCH_SIZE=args.batch_size
+            )
+            tokens = seed(app, users=args.users)
+            result = run(app, tokens, args.threads, args.requests)
+            queue = app.extensions['progress_write_behind']
+            if queue:
+                started = time.perf_counter()
+                queue.stop()
+                result['drain_seconds'] = round(time.perf_counter() - started, 3)
+            with app.app_context():
+                result['total_quizzes'] = db.session.query(db.func.sum(User.total_quizzes)).scalar()
+                db.engine.dispose()
+            results[mode] = result
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for mode, result in results.items():
+        print(f"{mode:>13}: {result['throughput_rps']:>8} req/s  p50 {result['p50_ms']:>7} ms  "
+              f"p99 {result['p99_ms']:>7} ms  ({result['requests']} requests, "
+              f"{result['total_quizzes']} recorded)"
+              + (f"  drain {result['drain_seconds']} s" if 'drain_seconds' in result else ''))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,226 @@
+"""
+In-process cache of the topic catalog.
+
+The catalog only changes when topics or questions are written (normally by
+seed_data.py), so the topics blueprint serves pre-serialized payloads from
+memory instead of querying and rebuilding Topic.to_dict() on every request.
+Any commit that touches a Topic or Question invalidates the cache and bumps
+its version counter; the next read rebuilds it.
+
+A rebuild only selects the card columns of every topic plus its question
+count, as plain rows (content is never selected and no ORM objects are
+built), which is all the library listing needs.
+Full topics, with content and questions, are loaded one at a time the
+first time they are requested and kept for the rest of the version.
+
+Snapshots also carry content digests (per topic and for the summary list)
+that the topics routes use as ETags. Unlike the version counter, digests
+agree across processes and restarts.
+
+Writes from other processes (content pack loads, generators) are picked up
+through the catalog_version row, which every catalog write bumps in the
+same transaction. Each process compares it with the version its snapshot
+was built from at most every CATALOG_VERSION_CHECK_INTERVAL seconds.
+"""
+import threading
+import time
+from datetime import datetime
+from flask import current_app, has_app_context
+from sqlalchemy import event, func, select, update
+from sqlalchemy.orm import Session, joinedload
+try:
+    from backend.models import CatalogVersion, Topic, Question, db
+    from backend.dbutils import insert_ignore
+    from backend.http_cache import PrecompressedBody, content_etag
+    from backend.serializers import RowSerializer, isoformat
+except ModuleNotFoundError:
+    from models import CatalogVersion, Topic, Question, db
+    from dbutils import insert_ignore
+    from http_cache import PrecompressedBody, content_etag
+    from serializers import RowSerializer, isoformat
+
+_DIRTY_KEY = 'topic_catalog_dirty'
+
+# Card fields of a topic: Topic.to_dict() without content and questions,
+# plus the number of questions (counted by the join in TopicCatalog._load)
+SUMMARY = RowSerializer([
+    ('id', Topic.id, None),
+    ('title', Topic.title, None),
+    ('description', Topic.description, None),
+    ('imageUrl', Topic.image_url, None),
+    ('category', Topic.category, None),
+    ('difficulty', Topic.difficulty, None),
+    ('estimatedTime', Topic.estimated_time, None),
+    ('createdAt', Topic.created_at, isoformat),
+    ('questionCount', func.count(Question.id), None),
+])
+
+
+class CatalogSnapshot:
+    """Immutable view of the catalog at one version.
+
+    Payload dicts are shared between requests; callers must copy them
+    before adding per-user fields.
+    """
+
+    def __init__(self, version, content_version, summaries):
+        self.version = version
+        self.content_version = content_version    # catalog_version row it was built from
+        self.summaries = summaries    # SUMMARY rows ordered by created_at
+        self.order = [summary['id'] for summary in summaries]
+        self.etag = content_etag(summaries)
+        self._ids = set(self.order)
+        self._lock = threading.Lock()
+        self._topics = {}             # topic id -> to_dict() with questions
+        self._etags = {}              # topic id -> digest of its payload
+        self._bodies = {}             # topic id -> PrecompressedBody of {'topic': ...}
+
+    def __contains__(self, topic_id):
+        return topic_id in self._ids
+
+    def get(self, topic_id):
+        """Full payload with content and questions, or None for unknown ids"""
+        if topic_id not in self._ids:
+            return None
+        topic = self._topics.get(topic_id)
+        if topic is None:
+            with self._lock:
+                topic = self._topics.get(topic_id)
+                if topic is None:
+                    topic = self._load_topic(topic_id)
+        return topic
+
+    def topic_etag(self, topic_id):
+        self.get(topic_id)
+        return self._etags.get(topic_id)
+
+    def topic_body(self, topic_id):
+        """The serialized {'topic': ...} response for a topic, built on first use"""
+        body = self._bodies.get(topic_id)
+        if body is None:
+            topic = self.get(topic_id)
+            with self._lock:
+                body = self._bodies.get(topic_id)
+                if body is None:
+                    # Exactly the bytes jsonify() would produce
+                    data = current_app.json.response({'topic': topic}).get_data()
+                    body = self._bodies[topic_id] = PrecompressedBody(data)
+        return body
+
+    def _load_topic(self, topic_id):
+        # One query: a single topic joins its questions in
+        topic = db.session.get(Topic, topic_id, options=[joinedload(Topic.questions)])
+        if topic is None:
+            return None
+        payload = self._topics[topic_id] = topic.to_dict()
+        self._etags[topic_id] = content_etag(payload)
+        return payload
+
+
+class TopicCatalog:
+    """Versioned cache of every topic and its questions.
+
+    With a check_interval (seconds), the shared catalog version is re-read
+    at most that often and a snapshot built from an older one is dropped.
+    """
+
+    def __init__(self, check_interval=None, clock=time.monotonic):
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._check_interval = check_interval
+        self._clock = clock
+        self._next_check = 0.0
+        self.version = 1
+
+    def snapshot(self):
+        """Return the current snapshot, loading it from the database if needed"""
+        snapshot = self._snapshot
+        if snapshot is not None and self._check_interval is not None and self._clock() >= self._next_check:
+            self._next_check = self._clock() + self._check_interval
+            if read_catalog_version() != snapshot.content_version:
+                self.invalidate()
+                snapshot = None
+        if snapshot is None:
+            # Loading under the lock means an invalidate() that races with a
+            # rebuild always wins: it waits for the load and then discards it.
+            with self._lock:
+                snapshot = self._snapshot
+                if snapshot is None:
+                    snapshot = self._snapshot = self._load(self.version)
+        return snapshot
+
+    def invalidate(self):
+        """Drop the cached snapshot and bump the catalog version"""
+        with self._lock:
+            self.version += 1
+            self._snapshot = None
+
+    def _load(self, version):
+        content_version = read_catalog_version()
+        if self._check_interval is not None:
+            self._next_check = self._clock() + self._check_interval
+        rows = db.session.execute(
+            select(*SUMMARY.columns)
+            .outerjoin(Question, Question.topic_id == Topic.id)
+            .group_by(Topic.id)
+            .order_by(Topic.created_at, Topic.id)
+        )
+        return CatalogSnapshot(version, content_version, [SUMMARY(row) for row in rows])
+
+
+def init_catalog(app):
+    """Attach a fresh catalog to the app and hook up commit invalidation"""
+    interval = app.config['CATALOG_VERSION_CHECK_INTERVAL']
+    app.extensions['topic_catalog'] = TopicCatalog(check_interval=interval if interval > 0 else None)
+    if not event.contains(Session, 'after_flush', _track_catalog_writes):
+        event.listen(Session, 'after_flush', _track_catalog_writes)
+        event.listen(Session, 'after_commit', _invalidate_after_commit)
+        event.listen(Session, 'after_rollback', _forget_catalog_writes)
+
+
+def get_catalog():
+    """Return the catalog for the current app"""
+    return current_app.extensions['topic_catalog']
+
+
+def read_catalog_version():
+    """The shared catalog version, 0 before the first catalog write"""
+    return db.session.scalar(select(CatalogVersion.version).where(CatalogVersion.id == 1)) or 0
+
+
+def bump_catalog_version(session=None):
+    """Bump the shared catalog version inside the session's transaction.
+
+    ORM writes to topics and questions do this automatically; callers that
+    change them with Core statements must call it themselves. The local
+    catalog is dropped when the transaction commits.
+    """
+    session = session or db.session
+    if session.info.get(_DIRTY_KEY):
+        return
+    session.info[_DIRTY_KEY] = True
+    table = CatalogVersion.__table__
+    connection = session.connection()
+    now = datetime.utcnow()
+    connection.execute(insert_ignore(table, connection.dialect.name).values(id=1, version=0, updated_at=now))
+    connection.execute(
+        update(table).where(table.c.id == 1).values(version=table.c.version + 1, updated_at=now)
+    )
+
+
+def _track_catalog_writes(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, (Topic, Question)):
+            bump_catalog_version(session)
+            return
+
+
+def _invalidate_after_commit(session):
+    if session.info.pop(_DIRTY_KEY, False) and has_app_context():
+        catalog = current_app.extensions.get('topic_catalog')
+        if catalog is not None:
+            catalog.invalidate()
+
+
+def _forget_catalog_writes(session):
+    session.info.pop(_DIRTY_KEY, None)
@@ -0,0 +1,57 @@
+"""
+Per-user topic completion index.
+
+user_topic_completion holds one row per (user, topic) pair the user has
+ever completed. It is written on every quiz submit, so "which topics has
+this user completed" and "has this user completed X" no longer scan the
+user's whole UserProgress history.
+"""
+from datetime import datetime
+try:
+    from backend.models import UserProgress, UserTopicCompletion, db
+    from backend.dbutils import insert_ignore
+except ModuleNotFoundError:
+    from models import UserProgress, UserTopicCompletion, db
+    from dbutils import insert_ignore
+
+
+def completed_topic_ids(user_id, among=None):
+    """Return the set of topic ids the user has completed, optionally limited to `among`"""
+    query = db.select(UserTopicCompletion.topic_id).filter_by(user_id=user_id)
+    if among is not None:
+        query = query.where(UserTopicCompletion.topic_id.in_(among))
+    return set(db.session.execute(query).scalars())
+
+
+def has_completed(user_id, topic_id):
+    """Return True if the user has completed the topic at least once"""
+    return db.session.get(UserTopicCompletion, (user_id, topic_id)) is not None
+
+
+def daily_completion_query(user_id, day):
+    """SELECT for the user's daily attempt on `day`, served by ix_user_progress_daily_lookup"""
+    return (
+        db.select(UserProgress.id)
+        .where(UserProgress.user_id == user_id)
+        .where(UserProgress.is_daily == db.true())
+        .where(UserProgress.completion_day == day)
+        .limit(1)
+    )
+
+
+def has_completed_daily(user_id, day):
+    """Return True if the user completed a daily quiz on `day`"""
+    return db.session.execute(daily_completion_query(user_id, day)).first() is not None
+
+
+def record_completion(user_id, topic_id, completed_at=None):
+    """Add the topic to the user's index in the current transaction.
+
+    Returns True if this is the user's first completion of the topic.
+    """
+    stmt = insert_ignore(UserTopicCompletion.__table__, db.session.get_bind().dialect.name).values(
+        user_id=user_id,
+        topic_id=topic_id,
+        first_completed_at=completed_at or datetime.utcnow()
+    )
+    return db.session.execute(stmt).rowcount == 1
@@ -0,0 +1,83 @@
+"""
+Shared pytest fixtures: a throwaway SQLite database seeded with a few
+topics and one user per test.
+"""
+import pytest
+from datetime import date
+from flask_jwt_extended import create_access_token
+try:
+    from backend.app import create_app
+    from backend.models import db, Topic, Question, User
+    from backend.dbutils import query_budget as engine_query_budget
+except ModuleNotFoundError:
+    from app import create_app
+    from models import db, Topic, Question, User
+    from dbutils import query_budget as engine_query_budget
+
+TOPIC_COUNT = 3
+
+
+def seed_test_data(app):
+    with app.app_context():
+        for i in range(1, TOPIC_COUNT + 1):
+            db.session.add(Topic(
+                id=str(i),
+                title=f'Topic {i}',
+                description=f'Description {i}',
+                content=f'# Topic {i}',
+                category='Scalability',
+                difficulty='Beginner',
+                estimated_time=10,
+                created_at=date(2024, 1, i)
+            ))
+            db.session.add(Question(
+                id=f'q{i}-1',
+                topic_id=str(i),
+                question='Which option is correct?',
+                options=['A', 'B', 'C', 'D'],
+                correct_index=0,
+                explanation='A is correct.'
+            ))
+        user = User(id='user-1', email='user@example.com', username='TestUser')
+        user.set_password('user123')
+        db.session.add(user)
+        db.session.commit()
+
+
+@pytest.fixture
+def database_url(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'test.db'}"
+    monkeypatch.setenv('DATABASE_URL', url)
+    return url
+
+
+@pytest.fixture
+def app(database_url):
+    app = create_app({'TESTING': True})
+    seed_test_data(app)
+
+    yield app
+
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth_headers(app):
+    with app.app_context():
+        token = create_access_token(identity='user-1')
+    return {'Authorization': f'Bearer {token}'}
+
+
+@pytest.fixture
+def query_budget(app):
+    """query_budget(n) is a context manager failing if the block runs more than n queries"""
+    with app.app_context():
+        engine = db.engine
+    return lambda limit: engine_query_budget(engine, limit)
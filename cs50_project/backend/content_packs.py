@@ -0,0 +1,334 @@
+"""
+Content packs: topics and questions kept as data files.
+
+A pack is a JSON file (or YAML, when PyYAML is installed) holding a list
+of topics, each with its questions, using the same field names as the API:
+
+    {
+      "pack": "core",
+      "topics": [
+        {"id": "1", "title": "...", "description": "...", "content": "# Markdown",
+         "imageUrl": null, "category": "...", "difficulty": "Beginner",
+         "estimatedTime": 15, "createdAt": "2024-01-01",
+         "questions": [{"id": "q1-1", "question": "...", "options": ["A", "B"],
+                        "correctIndex": 0, "explanation": "..."}]}
+      ]
+    }
+
+A pack owns the full question list of each of its topics, so questions
+removed from a topic in the pack are deleted. Topics missing from every
+pack are only deleted with prune=True.
+
+apply_packs() diffs the packs against the database by content hash and
+writes only what changed, in one transaction. It reads the ids and stored
+hashes of all topics and questions (one query each), then bulk inserts,
+updates and deletes. Any change bumps the shared catalog version, so
+every process reloads its topic catalog.
+
+Run from the project root:
+    python -m backend.content_packs                          # every pack in backend/content
+    python -m backend.content_packs my_pack.yaml --dry-run
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+from datetime import date
+from sqlalchemy import delete, insert, select, update
+try:
+    import yaml
+    PARSE_ERRORS = (ValueError, yaml.YAMLError)
+except ImportError:  # optional: YAML packs need PyYAML, JSON packs do not
+    yaml = None
+    PARSE_ERRORS = (ValueError,)
+try:
+    from backend.app import create_app
+    from backend.catalog import bump_catalog_version, read_catalog_version
+    from backend.models import db, DailySchedule, Question, Topic, UserProgress
+    from backend.schedule import purge_upcoming_schedule
+except ModuleNotFoundError:
+    from app import create_app
+    from catalog import bump_catalog_version, read_catalog_version
+    from models import db, DailySchedule, Question, Topic, UserProgress
+    from schedule import purge_upcoming_schedule
+
+DEFAULT_PACK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'content')
+PACK_EXTENSIONS = ('.json', '.yaml', '.yml')
+DIFFICULTIES = ('Beginner', 'Intermediate', 'Advanced')
+TYPE_NAMES = {str: 'a string', int: 'an integer', list: 'a list', (str, int): 'a string'}
+
+
+class ContentPackError(ValueError):
+    """A pack is malformed, conflicts with another pack or cannot be applied"""
+
+
+class ChangeReport:
+    """Ids of the topics and questions a pack load added, updated and deleted"""
+
+    def __init__(self):
+        self.topics = {'added': [], 'updated': [], 'deleted': []}
+        self.questions = {'added': [], 'updated': [], 'deleted': []}
+        self.catalog_version = None
+
+    @property
+    def changed(self):
+        return any(self.topics.values()) or any(self.questions.values())
+
+    def to_dict(self):
+        return {'topics': self.topics, 'questions': self.questions, 'catalogVersion': self.catalog_version}
+
+    def summary(self):
+        lines = []
+        for kind, changes in (('topic', self.topics), ('question', self.questions)):
+            for action, marker in (('added', '+'), ('updated', '~'), ('deleted', '-')):
+                lines.extend(f'{marker} {kind} {item_id}' for item_id in changes[action])
+        counts = '; '.join(
+            f"{kind}: {len(changes['added'])} added, {len(changes['updated'])} updated, "
+            f"{len(changes['deleted'])} deleted"
+            for kind, changes in (('topics', self.topics), ('questions', self.questions))
+        )
+        lines.append(counts if self.changed else 'No changes')
+        if self.catalog_version is not None:
+            lines.append(f'Catalog version {self.catalog_version}')
+        return '\n'.join(lines)
+
+
+def load_pack(path):
+    """Read and validate one pack file, returning its topic and question rows"""
+    if path.endswith(('.yaml', '.yml')):
+        if yaml is None:
+            raise ContentPackError(f'{path}: PyYAML is required for YAML packs (pip install pyyaml)')
+        parse = yaml.safe_load
+    else:
+        parse = json.load
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = parse(f)
+    except (OSError, *PARSE_ERRORS) as e:
+        raise ContentPackError(f'{path}: {e}') from e
+
+    if not isinstance(data, dict) or not isinstance(data.get('topics'), list):
+        raise ContentPackError(f'{path}: expected an object with a "topics" list')
+    topics, questions = [], []
+    for index, topic in enumerate(data['topics']):
+        where = f'{path}: topics[{index}]'
+        row = _topic_row(topic, where)
+        topics.append(row)
+        for q_index, question in enumerate(topic.get('questions') or []):
+            questions.append(_question_row(question, row['id'], f"{where} ({row['id']}): questions[{q_index}]"))
+    return topics, questions
+
+
+def pack_paths(paths):
+    """Expand directories into the pack files they contain, in name order"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(
+                os.path.join(path, name) for name in sorted(os.listdir(path))
+                if name.endswith(PACK_EXTENSIONS)
+            )
+        else:
+            files.append(path)
+    return files
+
+
+def apply_packs(paths, prune=False, dry_run=False):
+    """Bring topics and questions in line with the packs at `paths` (files or directories).
+
+    Everything is written in one transaction, or nothing is if a pack is
+    invalid or a pruned topic still has quiz history. Returns a
+    ChangeReport; with dry_run=True nothing is written.
+    """
+    topics, questions = _read_packs(pack_paths(paths))
+    session = db.session
+    try:
+        stored_topics = dict(session.execute(select(Topic.id, Topic.content_hash)).all())
+        stored_questions = {
+            question_id: (topic_id, content_hash)
+            for question_id, topic_id, content_hash in session.execute(
+                select(Question.id, Question.topic_id, Question.content_hash)
+            )
+        }
+
+        report = ChangeReport()
+        new_topics, changed_topics = _diff(topics, stored_topics, report.topics)
+        deleted_topics = sorted(set(stored_topics) - set(topics)) if prune else []
+        report.topics['deleted'] = deleted_topics
+
+        stored_question_hashes = {question_id: stored[1] for question_id, stored in stored_questions.items()}
+        new_questions, changed_questions = _diff(questions, stored_question_hashes, report.questions)
+        # Packs own the question lists of their topics
+        owned = set(topics) | set(deleted_topics)
+        report.questions['deleted'] = sorted(
+            question_id for question_id, (topic_id, _) in stored_questions.items()
+            if topic_id in owned and question_id not in questions
+        )
+
+        if deleted_topics:
+            with_history = session.scalars(
+                select(UserProgress.topic_id).where(UserProgress.topic_id.in_(deleted_topics)).distinct()
+            ).all()
+            if with_history:
+                raise ContentPackError(
+                    f"Cannot delete topics with quiz history: {', '.join(sorted(with_history))}"
+                )
+
+        if dry_run or not report.changed:
+            session.rollback()
+            return report
+
+        if new_topics:
+            session.execute(insert(Topic), new_topics)
+        if changed_topics:
+            session.execute(update(Topic), changed_topics)
+        if new_questions:
+            session.execute(insert(Question), new_questions)
+        if changed_questions:
+            session.execute(update(Question), changed_questions)
+        if report.questions['deleted']:
+            session.execute(delete(Question).where(Question.id.in_(report.questions['deleted'])))
+        if deleted_topics:
+            session.execute(delete(DailySchedule).where(DailySchedule.topic_id.in_(deleted_topics)))
+            session.execute(delete(Topic).where(Topic.id.in_(deleted_topics)))
+
+        # Bulk statements bypass the ORM flush hooks, so do their work here
+        bump_catalog_version(session)
+        if any(report.topics.values()):
+            purge_upcoming_schedule(session.connection())
+        session.commit()
+        report.catalog_version = read_catalog_version()
+        return report
+    except Exception:
+        session.rollback()
+        raise
+
+
+def _read_packs(files):
+    if not files:
+        raise ContentPackError('No content packs found')
+    topics, questions, sources = {}, {}, {}
+    for path in files:
+        pack_topics, pack_questions = load_pack(path)
+        for kind, rows, seen in (('topic', pack_topics, topics), ('question', pack_questions, questions)):
+            for row in rows:
+                key = (kind, row['id'])
+                if key in sources:
+                    raise ContentPackError(f"{path}: {kind} {row['id']} is already defined in {sources[key]}")
+                sources[key] = path
+                seen[row['id']] = row
+    return topics, questions
+
+
+def _diff(rows, stored_hashes, changes):
+    """Split pack rows into inserts and updates, recording their ids in `changes`"""
+    inserts, updates = [], []
+    for row_id, row in rows.items():
+        if row_id not in stored_hashes:
+            inserts.append(row)
+            changes['added'].append(row_id)
+        elif stored_hashes[row_id] != row['content_hash']:
+            updates.append(row)
+            changes['updated'].append(row_id)
+    changes['added'].sort()
+    changes['updated'].sort()
+    return inserts, updates
+
+
+def _content_hash(row):
+    encoded = json.dumps(row, sort_keys=True, default=str, ensure_ascii=False).encode()
+    return hashlib.sha1(encoded).hexdigest()
+
+
+def _require(data, key, kind, where):
+    value = data.get(key)
+    # bool is an int subclass, but True is never a valid count or index
+    if not isinstance(value, kind) or isinstance(value, bool):
+        raise ContentPackError(f'{where}: "{key}" is required and must be {TYPE_NAMES[kind]}')
+    if isinstance(value, str) and not value.strip():
+        raise ContentPackError(f'{where}: "{key}" must not be empty')
+    return value
+
+
+def _topic_row(data, where):
+    if not isinstance(data, dict):
+        raise ContentPackError(f'{where}: expected an object')
+    difficulty = _require(data, 'difficulty', str, where)
+    if difficulty not in DIFFICULTIES:
+        raise ContentPackError(f"{where}: difficulty must be one of {', '.join(DIFFICULTIES)}")
+    created_at = data.get('createdAt')
+    if isinstance(created_at, str):
+        try:
+            created_at = date.fromisoformat(created_at)
+        except ValueError:
+            raise ContentPackError(f'{where}: createdAt must be an ISO date') from None
+    if not isinstance(created_at, date):    # YAML parses bare dates itself
+        raise ContentPackError(f'{where}: "createdAt" is required and must be an ISO date')
+    image_url = data.get('imageUrl')
+    if image_url is not None and not isinstance(image_url, str):
+        raise ContentPackError(f'{where}: imageUrl must be a string or null')
+    if not isinstance(data.get('questions', []), list):
+        raise ContentPackError(f'{where}: questions must be a list')
+
+    row = {
+        'id': str(_require(data, 'id', (str, int), where)),
+        'title': _require(data, 'title', str, where),
+        'description': _require(data, 'description', str, where),
+        'content': _require(data, 'content', str, where),
+        'image_url': image_url,
+        'category': _require(data, 'category', str, where),
+        'difficulty': difficulty,
+        'estimated_time': _require(data, 'estimatedTime', int, where),
+        'created_at': created_at,
+    }
+    row['content_hash'] = _content_hash(row)
+    return row
+
+
+def _question_row(data, topic_id, where):
+    if not isinstance(data, dict):
+        raise ContentPackError(f'{where}: expected an object')
+    options = _require(data, 'options', list, where)
+    if len(options) < 2 or not all(isinstance(option, str) for option in options):
+        raise ContentPackError(f'{where}: options must be a list of at least two strings')
+    correct_index = _require(data, 'correctIndex', int, where)
+    if not 0 <= correct_index < len(options):
+        raise ContentPackError(f'{where}: correctIndex must point at one of the options')
+
+    row = {
+        'id': str(_require(data, 'id', (str, int), where)),
+        'topic_id': topic_id,
+        'question': _require(data, 'question', str, where),
+        'options': options,
+        'correct_index': correct_index,
+        'explanation': _require(data, 'explanation', str, where),
+    }
+    row['content_hash'] = _content_hash(row)
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('paths', nargs='*', default=[DEFAULT_PACK_DIR],
+                        help='pack files or directories (default: backend/content)')
+    parser.add_argument('--prune', action='store_true', help='delete topics that are in no pack')
+    parser.add_argument('--dry-run', action='store_true', help='report the changes without writing them')
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        try:
+            report = apply_packs(args.paths, prune=args.prune, dry_run=args.dry_run)
+        except ContentPackError as e:
+            print(f'Error: {e}', file=sys.stderr)
+            sys.exit(1)
+    if args.json:
+        print(json.dumps(report.to_dict(), indent=2))
+    else:
+        print(report.summary() + (' (dry run)' if args.dry_run else ''))
+
+
+if __name__ == '__main__':
+    main()
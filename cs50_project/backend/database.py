@@ -0,0 +1,128 @@
+"""
+Database engine configuration and read-replica routing.
+
+init_database() replaces a bare db.init_app(app). It builds the engine
+options from config before the engines are created:
+
+- connection pool size, overflow and timeout for every pooled engine,
+  plus recycle and pre-ping for database servers, whose connections can
+  be dropped under us
+- SQLite pragmas applied to every new connection: WAL journaling (readers
+  no longer block on a writer, and a writer no longer waits on readers),
+  synchronous, busy_timeout and mmap_size
+- an optional read replica (DATABASE_READ_URL), registered as the
+  'replica' bind
+
+Sessions are RoutingSessions. During GET and HEAD requests they send
+SELECTs to the replica, until the session writes anything; from then on,
+and for flushes and all DML, they use the primary so a request always
+reads its own writes. Code that must read something another connection
+just committed to the primary wraps the read in use_primary().
+"""
+from contextlib import contextmanager
+from flask import g, has_app_context, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+REPLICA_BIND = 'replica'
+READ_ONLY_METHODS = ('GET', 'HEAD')
+_WROTE_KEY = 'routing_session_wrote'
+
+
+class RoutingSession(Session):
+    """Session that sends the reads of GET requests to the read replica"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._db is not None and has_app_context():
+            replica = self._db.engines.get(REPLICA_BIND)
+            if replica is not None:
+                if self._flushing or clause is None or not getattr(clause, 'is_select', False):
+                    self.info[_WROTE_KEY] = True
+                elif not self.info.get(_WROTE_KEY) and _reads_from_replica():
+                    return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _reads_from_replica():
+    return (
+        has_request_context()
+        and request.method in READ_ONLY_METHODS
+        and not g.get('_db_use_primary', False)
+    )
+
+
+@contextmanager
+def use_primary():
+    """Send every statement in the block to the primary, e.g. reading back a fresh write"""
+    previous = g.get('_db_use_primary', False) if has_app_context() else False
+    if has_app_context():
+        g._db_use_primary = True
+    try:
+        yield
+    finally:
+        if has_app_context():
+            g._db_use_primary = previous
+
+
+def init_database(app, db):
+    """Configure engine options and pragmas from app.config, then initialize `db`"""
+    config = app.config
+    options = dict(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    options.update(_engine_options(config['SQLALCHEMY_DATABASE_URI'], config))
+    config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+    read_url = config.get('DATABASE_READ_URL')
+    if read_url:
+        binds = dict(config.get('SQLALCHEMY_BINDS') or {})
+        binds[REPLICA_BIND] = {'url': read_url, **_engine_options(read_url, config)}
+        config['SQLALCHEMY_BINDS'] = binds
+
+    db.init_app(app)
+
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == 'sqlite' and not _is_memory(engine.url):
+                event.listen(engine, 'connect', _sqlite_pragmas(config))
+
+
+def _engine_options(url, config):
+    url = make_url(url)
+    if url.get_backend_name() == 'sqlite':
+        if _is_memory(url):
+            return {}    # a single StaticPool connection; nothing to tune
+        return {
+            'pool_size': config['DB_POOL_SIZE'],
+            'max_overflow': config['DB_MAX_OVERFLOW'],
+            'pool_timeout': config['DB_POOL_TIMEOUT'],
+        }
+    return {
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+    }
+
+
+def _is_memory(url):
+    return url.database in (None, '', ':memory:')
+
+
+def _sqlite_pragmas(config):
+    pragmas = [
+        f"PRAGMA journal_mode={config['SQLITE_JOURNAL_MODE']}",
+        f"PRAGMA synchronous={config['SQLITE_SYNCHRONOUS']}",
+        f"PRAGMA busy_timeout={int(config['SQLITE_BUSY_TIMEOUT'])}",
+        f"PRAGMA mmap_size={int(config['SQLITE_MMAP_SIZE'])}",
+    ]
+
+    def apply(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+    return apply
@@ -0,0 +1,81 @@
+"""
+Small SQL helpers shared by the write paths, plus a statement counter for
+query-budget tests.
+"""
+from contextlib import contextmanager
+from sqlalchemy import Date, event, func, insert, literal
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+
+def insert_ignore(table, dialect_name):
+    """Build an INSERT that silently skips rows violating a unique constraint"""
+    if dialect_name == 'postgresql':
+        return pg_insert(table).on_conflict_do_nothing()
+    if dialect_name == 'sqlite':
+        return sqlite_insert(table).on_conflict_do_nothing()
+    return insert(table).prefix_with('IGNORE')
+
+
+def upsert(table, dialect_name, values, set_):
+    """Build an INSERT that updates the existing row on a primary key conflict.
+
+    `set_` is called with the proposed row's columns (excluded/inserted)
+    and returns the new values, which may refer to the existing row's
+    columns through `table.c`.
+    """
+    if dialect_name in ('postgresql', 'sqlite'):
+        stmt = (pg_insert if dialect_name == 'postgresql' else sqlite_insert)(table).values(**values)
+        return stmt.on_conflict_do_update(
+            index_elements=[column.name for column in table.primary_key],
+            set_=set_(stmt.excluded)
+        )
+    stmt = mysql_insert(table).values(**values)
+    return stmt.on_duplicate_key_update(set_(stmt.inserted))
+
+
+def upsert_add(table, dialect_name, values, counters):
+    """Build an INSERT that adds the `counters` columns to the existing row on a key conflict"""
+    return upsert(table, dialect_name, values, lambda new: {name: table.c[name] + new[name] for name in counters})
+
+
+def add_days(day, days, dialect_name):
+    """SQL expression for the date `days` (an integer expression) after the Python date `day`"""
+    if dialect_name == 'sqlite':
+        return func.date(literal(day, Date), func.printf('+%d days', days), type_=Date)
+    if dialect_name == 'postgresql':
+        return literal(day, Date) + days
+    return func.adddate(literal(day, Date), days, type_=Date)
+
+
+class QueryCounter:
+    """Record every SQL statement an engine executes inside a with block"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._record)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(self.engine, 'before_cursor_execute', self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+
+@contextmanager
+def query_budget(engine, limit):
+    """Fail with the offending statements if the block runs more than `limit` queries"""
+    with QueryCounter(engine) as counter:
+        yield counter
+    if counter.count > limit:
+        listing = '\n'.join(f'  {i}. {statement}' for i, statement in enumerate(counter.statements, 1))
+        raise AssertionError(f'Expected at most {limit} queries, got {counter.count}:\n{listing}')
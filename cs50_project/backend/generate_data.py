@@ -0,0 +1,427 @@
+"""
+Synthetic data generator for load and query-plan testing.
+
+Adds configurable volumes of topics (with questions), users and quiz
+history to the database configured by DATABASE_URL, e.g. 1k topics, 200k
+users and 20M UserProgress rows. Histories follow realistic shapes:
+
+- activity per user is heavy-tailed (log-normal, scaled by account age),
+  so a few users have thousands of attempts and most have a handful
+- daily quizzes come in streaks of consecutive days separated by gaps,
+  one per day at most, on that day's scheduled topic
+- practice topics are Zipf-distributed, so some topics are far more
+  popular than others
+- scores are binomial around a per-user skill level
+
+User counters, streaks, the user_topic_completion index, the
+user_activity_days calendar, user_topic_stats and the review_items
+schedule are derived from the generated history, so they are exactly
+what replaying every attempt through the submit endpoints, oldest first,
+would produce.
+
+Rows are written with Core INSERT executemany in large batches (no ORM
+units of work or per-row flushes), one transaction per chunk of users.
+The non-unique secondary indexes on user_progress are dropped for the
+load and rebuilt once at the end (--keep-indexes to skip this); the
+unique one-daily-per-day index stays in place so the load cannot break
+it. On SQLite the connection runs with synchronous=OFF while loading.
+
+Run from the project root:
+    python -m backend.generate_data --topics 1000 --users 200000 --progress 20000000
+"""
+import argparse
+import bisect
+import math
+import random
+import time
+from datetime import date, datetime, timedelta
+from flask import current_app
+from sqlalchemy import func, insert, select
+from werkzeug.security import generate_password_hash
+try:
+    from backend.app import create_app
+    from backend.catalog import bump_catalog_version
+    from backend.models import (
+        db, Question, ReviewItem, Topic, User, UserActivityDay, UserProgress, UserTopicCompletion, UserTopicStats
+    )
+    from backend.schedule import purge_upcoming_schedule, topic_index_for_day
+    from backend.reviews import INITIAL_EASE, grade, next_review
+    from backend.topic_stats import attempt_score, next_rolling_score
+except ModuleNotFoundError:
+    from app import create_app
+    from catalog import bump_catalog_version
+    from models import (
+        db, Question, ReviewItem, Topic, User, UserActivityDay, UserProgress, UserTopicCompletion, UserTopicStats
+    )
+    from schedule import purge_upcoming_schedule, topic_index_for_day
+    from reviews import INITIAL_EASE, grade, next_review
+    from topic_stats import attempt_score, next_rolling_score
+
+# Upper bound on attempts per day of account age, so heavy users stay plausible
+MAX_ATTEMPTS_PER_DAY = 8
+CATEGORIES = ('Scalability', 'Databases', 'Caching', 'Networking', 'Reliability', 'Messaging')
+DIFFICULTIES = ('Beginner', 'Intermediate', 'Advanced')
+SQLITE_BULK_PRAGMAS = ('PRAGMA synchronous=OFF', 'PRAGMA temp_store=MEMORY')
+
+
+def generate(topics=100, questions=5, users=10_000, progress=1_000_000, days=365, seed=0,
+             prefix='gen', batch_size=10_000, user_chunk=1_000, defer_indexes=True,
+             password='password123', today=None, log=print):
+    """Insert synthetic data into the current app's database and return the row counts.
+
+    Ids are prefixed with `prefix`, so several runs with different prefixes
+    can add to the same database. Raises ValueError if data with the prefix
+    already exists or there are no topics to attempt.
+    """
+    rng = random.Random(seed)
+    today = today or date.today()
+    engine = db.engine
+    if db.session.get(User, f'{prefix}-u0') or db.session.get(Topic, f'{prefix}-t0'):
+        raise ValueError(f"Data with prefix '{prefix}' already exists")
+
+    counts = {'topics': 0, 'questions': 0, 'users': 0, 'progress': 0, 'completions': 0, 'activity_days': 0,
+              'topic_stats': 0, 'review_items': 0}
+    started = time.perf_counter()
+
+    if topics:
+        topic_rows, question_rows = _topics(rng, prefix, topics, questions, today)
+        conn = db.session.connection()
+        _insert(conn, Topic.__table__, topic_rows, batch_size)
+        _insert(conn, Question.__table__, question_rows, batch_size)
+        # Core inserts skip the ORM hooks that reset the upcoming schedule
+        # and tell running servers to reload their catalogs
+        purge_upcoming_schedule(conn)
+        bump_catalog_version()
+        db.session.commit()
+        counts['topics'], counts['questions'] = len(topic_rows), len(question_rows)
+        log(f'Inserted {len(topic_rows)} topics and {len(question_rows)} questions')
+
+    catalog = db.session.execute(
+        select(Topic.id, func.count(Question.id))
+        .outerjoin(Question, Question.topic_id == Topic.id)
+        .group_by(Topic.id)
+        .order_by(Topic.created_at, Topic.id)
+    ).all()
+    db.session.commit()
+    if not catalog and users and progress:
+        raise ValueError('No topics to generate progress for')
+
+    password_hash = generate_password_hash(password, current_app.config['PASSWORD_HASH_METHOD'])
+    signups, attempts = _allocate(rng, users, progress, days)
+    history = _HistoryBuilder(rng, catalog, today)
+
+    indexes = [index for index in UserProgress.__table__.indexes if not index.unique] if defer_indexes else []
+    with engine.begin() as conn:
+        for index in indexes:
+            index.drop(conn, checkfirst=True)
+    try:
+        for first in range(0, users, user_chunk):
+            user_rows, progress_rows, completion_rows, activity_rows, stats_rows, review_rows = [], [], [], [], [], []
+            for i in range(first, min(first + user_chunk, users)):
+                user, rows, completions, activity, topic_stats, reviews = history.build(
+                    f'{prefix}-u{i}', signups[i], attempts[i], password_hash
+                )
+                user_rows.append(user)
+                progress_rows.extend(rows)
+                completion_rows.extend(completions)
+                activity_rows.extend(activity)
+                stats_rows.extend(topic_stats)
+                review_rows.extend(reviews)
+            with engine.begin() as conn:
+                if conn.dialect.name == 'sqlite':
+                    for pragma in SQLITE_BULK_PRAGMAS:
+                        conn.exec_driver_sql(pragma)
+                _insert(conn, User.__table__, user_rows, batch_size)
+                _insert(conn, UserProgress.__table__, progress_rows, batch_size)
+                _insert(conn, UserTopicCompletion.__table__, completion_rows, batch_size)
+                _insert(conn, UserActivityDay.__table__, activity_rows, batch_size)
+                _insert(conn, UserTopicStats.__table__, stats_rows, batch_size)
+                _insert(conn, ReviewItem.__table__, review_rows, batch_size)
+            counts['users'] += len(user_rows)
+            counts['progress'] += len(progress_rows)
+            counts['completions'] += len(completion_rows)
+            counts['activity_days'] += len(activity_rows)
+            counts['topic_stats'] += len(stats_rows)
+            counts['review_items'] += len(review_rows)
+            elapsed = time.perf_counter() - started
+            log(f"Users {counts['users']}/{users}, {counts['progress']} progress rows "
+                f"({counts['progress'] / elapsed:,.0f} rows/s)")
+    finally:
+        if indexes:
+            log('Rebuilding user_progress indexes...')
+            with engine.begin() as conn:
+                for index in indexes:
+                    index.create(conn, checkfirst=True)
+
+    log(f'Done in {time.perf_counter() - started:.1f}s')
+    return counts
+
+
+def _topics(rng, prefix, count, questions, today):
+    topic_rows, question_rows = [], []
+    first_day = today - timedelta(days=count)
+    for i in range(count):
+        topic_id = f'{prefix}-t{i}'
+        topic_rows.append({
+            'id': topic_id,
+            'title': f'Generated topic {i}',
+            'description': f'Synthetic topic {i} for load testing.',
+            'content': f'# Generated topic {i}\n\n' + 'Lorem ipsum dolor sit amet. ' * rng.randint(50, 400),
+            'image_url': None,
+            'category': rng.choice(CATEGORIES),
+            'difficulty': rng.choice(DIFFICULTIES),
+            'estimated_time': rng.choice((5, 10, 15, 20)),
+            'created_at': first_day + timedelta(days=i),
+        })
+        for j in range(questions):
+            question_rows.append({
+                'id': f'{topic_id}-q{j}',
+                'topic_id': topic_id,
+                'question': f'Generated question {j} about topic {i}?',
+                'options': ['A', 'B', 'C', 'D'],
+                'correct_index': rng.randrange(4),
+                'explanation': 'Generated explanation.',
+            })
+    return topic_rows, question_rows
+
+
+def _allocate(rng, users, progress, days):
+    """Pick each user's signup offset (days before today) and number of attempts"""
+    signups = [rng.randrange(days) for _ in range(users)]
+    weights = [rng.lognormvariate(0, 1.0) * (signup + 1) for signup in signups]
+    caps = [(signup + 1) * MAX_ATTEMPTS_PER_DAY for signup in signups]
+
+    # Proportional shares; whatever capped users cannot take goes to the rest
+    shares = [0.0] * users
+    remaining, open_users = progress, list(range(users))
+    for _ in range(3):
+        total_weight = sum(weights[i] for i in open_users)
+        if not open_users or remaining <= 0 or total_weight <= 0:
+            break
+        still_open = []
+        for i in open_users:
+            share = min(caps[i] - shares[i], remaining * weights[i] / total_weight)
+            shares[i] += share
+            if shares[i] < caps[i]:
+                still_open.append(i)
+        remaining = progress - sum(shares)
+        open_users = still_open
+
+    attempts = [int(share) + (rng.random() < share - int(share)) for share in shares]
+    return signups, attempts
+
+
+class _HistoryBuilder:
+    """Build one user's row, progress history, completion index, activity calendar, topic statistics and review schedule"""
+
+    def __init__(self, rng, catalog, today):
+        self.rng = rng
+        self.today = today
+        # Attempts made today must not be in the future
+        now = datetime.now()
+        if today == now.date():
+            self.seconds_today = max(1, int((now - datetime.combine(today, datetime.min.time())).total_seconds()))
+        else:
+            self.seconds_today = 86400
+        self.topic_ids = [topic_id for topic_id, _ in catalog]
+        self.question_counts = dict(catalog)
+        # Zipf popularity for practice topics
+        self.cum_weights = list(_accumulate(1 / (rank + 1) ** 1.1 for rank in range(len(catalog))))
+        self.popularity = self.topic_ids[:]
+        rng.shuffle(self.popularity)
+        self._score_tables = {}
+
+    def build(self, user_id, signup, attempts, password_hash):
+        rng = self.rng
+        first_day = self.today - timedelta(days=signup)
+        span = signup + 1
+        skill = round(rng.betavariate(5, 2), 1)
+
+        daily_count = min(round(attempts * rng.uniform(0.2, 0.8)), span)
+        daily_days, streak, best_streak = _streaks(rng, first_day, span, daily_count)
+        practice_count = attempts - daily_count
+
+        rows = []
+        for day in daily_days:
+            topic_id = self.topic_ids[topic_index_for_day(day, len(self.topic_ids))]
+            rows.append(self._row(user_id, topic_id, day, True, skill))
+        practice_topics = rng.choices(self.popularity, cum_weights=self.cum_weights, k=practice_count)
+        last_practice = None
+        for topic_id in practice_topics:
+            day = first_day + timedelta(days=rng.randrange(span))
+            rows.append(self._row(user_id, topic_id, day, False, skill))
+            if last_practice is None or day > last_practice:
+                last_practice = day
+
+        first_completions = {}
+        days = {}
+        for row in rows:
+            seen = first_completions.get(row['topic_id'])
+            if seen is None or row['completed_at'] < seen:
+                first_completions[row['topic_id']] = row['completed_at']
+            counters = days.setdefault(row['completion_day'], [0, 0])
+            counters[0] += 1
+            counters[1] += row['is_daily']
+
+        created_at = datetime.combine(first_day, datetime.min.time())
+        user = {
+            'id': user_id,
+            'email': f'{user_id}@example.com',
+            'username': f'User {user_id}',
+            'password_hash': password_hash,
+            'role': 'user',
+            'daily_streak': streak,
+            'practice_streak': practice_count,    # practice streaks count every practice quiz
+            'best_daily_streak': best_streak,
+            'best_practice_streak': practice_count,
+            'topics_completed': len(first_completions),
+            'total_quizzes': len(rows),
+            'correct_answers': sum(row['correct_count'] for row in rows),
+            'last_daily_completion': daily_days[-1] if daily_days else None,
+            'last_practice_completion': last_practice,
+            'created_at': created_at,
+            'updated_at': max((row['completed_at'] for row in rows), default=created_at),
+        }
+        completions = [
+            {'user_id': user_id, 'topic_id': topic_id, 'first_completed_at': completed_at}
+            for topic_id, completed_at in first_completions.items()
+        ]
+        activity = [
+            {'user_id': user_id, 'day': day, 'quizzes': quizzes, 'daily_quizzes': daily}
+            for day, (quizzes, daily) in days.items()
+        ]
+        topic_stats, reviews = self._per_topic(user_id, rows)
+        return user, rows, completions, activity, topic_stats, reviews
+
+    def _per_topic(self, user_id, rows):
+        """Replay the attempts oldest first into topic statistics and review items"""
+        stats, reviews = {}, {}
+        for row in sorted(rows, key=lambda row: row['completed_at']):
+            score = attempt_score(row['correct_count'], row['total_questions'])
+            topic = stats.get(row['topic_id'])
+            if topic is None:
+                topic = stats[row['topic_id']] = {
+                    'user_id': user_id, 'topic_id': row['topic_id'], 'attempts': 0, 'questions_answered': 0,
+                    'correct_answers': 0, 'best_score': score, 'rolling_score': None,
+                }
+            topic['attempts'] += 1
+            topic['questions_answered'] += row['total_questions']
+            topic['correct_answers'] += row['correct_count']
+            topic['best_score'] = max(topic['best_score'], score)
+            topic['rolling_score'] = next_rolling_score(topic['rolling_score'], score)
+            topic['last_attempt_at'] = row['completed_at']
+
+            review = reviews.get(row['topic_id'])
+            if review is None:
+                review = reviews[row['topic_id']] = {
+                    'user_id': user_id, 'topic_id': row['topic_id'], 'ease': INITIAL_EASE, 'interval_days': 0,
+                    'repetitions': 0,
+                }
+            review['ease'], review['interval_days'], review['repetitions'] = next_review(
+                review['ease'], review['interval_days'], review['repetitions'],
+                grade(row['correct_count'], row['total_questions'])
+            )
+            review['due_day'] = row['completion_day'] + timedelta(days=review['interval_days'])
+            review['last_reviewed_at'] = row['completed_at']
+        return list(stats.values()), list(reviews.values())
+
+    def _row(self, user_id, topic_id, day, is_daily, skill):
+        rng = self.rng
+        total = self.question_counts[topic_id]
+        seconds = rng.randrange(self.seconds_today if day == self.today else 86400)
+        return {
+            'user_id': user_id,
+            'topic_id': topic_id,
+            'completed_at': datetime.combine(day, datetime.min.time()) + timedelta(seconds=seconds),
+            'completion_day': day,
+            'is_daily': is_daily,
+            'correct_count': bisect.bisect(self._score_table(skill, total), rng.random()),
+            'total_questions': total,
+        }
+
+    def _score_table(self, skill, total):
+        """Cumulative Binomial(total, skill) probabilities, minus the final 1.0"""
+        table = self._score_tables.get((skill, total))
+        if table is None:
+            pmf = [math.comb(total, k) * skill ** k * (1 - skill) ** (total - k) for k in range(total + 1)]
+            table = self._score_tables[skill, total] = list(_accumulate(pmf))[:-1]
+        return table
+
+
+def _streaks(rng, first_day, span, count):
+    """Lay out `count` distinct days in a `span`-day window as runs of consecutive days.
+
+    Returns the days in order, the length of the last run (the current
+    daily streak) and the longest run.
+    """
+    if count == 0:
+        return [], 0, 0
+    free = span - count
+    runs = max(1, min(round(count / (1 + rng.expovariate(1 / 4))), count, free + 1))
+    lengths = _split(rng, count, runs, 1)
+    # Leading and trailing gaps may be empty; gaps between runs are at least a day
+    gaps = _split(rng, free - (runs - 1), runs + 1, 0)
+    days = []
+    day = first_day + timedelta(days=gaps[0])
+    for i, length in enumerate(lengths):
+        for _ in range(length):
+            days.append(day)
+            day += timedelta(days=1)
+        day += timedelta(days=1 + gaps[i + 1])
+    return days, lengths[-1], max(lengths)
+
+
+def _split(rng, total, parts, minimum):
+    """Random composition of `total` into `parts` integers of at least `minimum`"""
+    spare = total - parts * minimum
+    slots = spare + parts - 1
+    # Stars and bars: parts - 1 bars among the slots
+    bars = sorted(rng.sample(range(slots), parts - 1))
+    values, previous = [], -1
+    for bar in (*bars, slots):
+        values.append(bar - previous - 1 + minimum)
+        previous = bar
+    return values
+
+
+def _accumulate(values):
+    total = 0.0
+    for value in values:
+        total += value
+        yield total
+
+
+def _insert(conn, table, rows, batch_size):
+    for start in range(0, len(rows), batch_size):
+        conn.execute(insert(table), rows[start:start + batch_size])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--topics', type=int, default=100, help='topics to add (0 uses the existing ones)')
+    parser.add_argument('--questions', type=int, default=5, help='questions per added topic')
+    parser.add_argument('--users', type=int, default=10_000)
+    parser.add_argument('--progress', type=int, default=1_000_000, help='approximate UserProgress rows')
+    parser.add_argument('--days', type=int, default=365, help='how far back histories go')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--prefix', default='gen', help='id prefix for the generated rows')
+    parser.add_argument('--batch-size', type=int, default=10_000, help='rows per INSERT executemany')
+    parser.add_argument('--user-chunk', type=int, default=1_000, help='users per transaction')
+    parser.add_argument('--keep-indexes', action='store_true',
+                        help='keep user_progress indexes in place during the load')
+    parser.add_argument('--password', default='password123', help='password for every generated user')
+    args = parser.parse_args()
+
+    # The leaderboard would load every existing user for nothing
+    app = create_app({'LEADERBOARD_ENABLED': False})
+    with app.app_context():
+        counts = generate(
+            topics=args.topics, questions=args.questions, users=args.users, progress=args.progress,
+            days=args.days, seed=args.seed, prefix=args.prefix, batch_size=args.batch_size,
+            user_chunk=args.user_chunk, defer_indexes=not args.keep_indexes, password=args.password
+        )
+    print(', '.join(f'{count} {name}' for name, count in counts.items()))
+
+
+if __name__ == '__main__':
+    main()
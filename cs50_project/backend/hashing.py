@@ -0,0 +1,90 @@
+"""
+Password hashing off the request thread.
+
+Hashing is deliberately CPU-heavy, so a burst of logins would otherwise
+pin every worker and starve cheap requests. Hashes are computed in a
+bounded process pool instead. PASSWORD_HASH_QUEUE_DEPTH bounds the hashes
+in flight, running in the pool plus queued for it; once that many are in
+flight, HasherBusy is raised so the route can answer 503 straight away
+rather than queueing without limit. Size it at least the number of
+workers, or the pool never runs full.
+
+The hash method and cost come from PASSWORD_HASH_METHOD (any method
+string werkzeug accepts, e.g. "scrypt:32768:8:1" or
+"pbkdf2:sha256:600000"). Stored hashes made with other parameters are
+upgraded on the next successful login.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class HasherBusy(Exception):
+    """Raised when the hashing queue is full"""
+
+
+class PasswordHasher:
+    """Bounded process pool for generating and checking password hashes"""
+
+    def __init__(self, method, workers, queue_depth):
+        self.method = method
+        self.workers = workers
+        self._slots = threading.BoundedSemaphore(queue_depth)
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        # Hash prefix ("method:params") that current hashes carry
+        self._prefix = generate_password_hash('', method).split('$', 1)[0]
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """True if the hash was made with a different method or cost"""
+        return password_hash.split('$', 1)[0] != self._prefix
+
+    def shutdown(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy('Too many password checks in progress')
+        try:
+            if not self.workers:
+                return fn(*args)
+            return self._get_pool().submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def _get_pool(self):
+        # Started lazily, and with spawn, so workers never inherit the
+        # parent's threads or open database connections
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._pool
+
+
+def init_password_hasher(app):
+    workers = app.config['PASSWORD_HASH_WORKERS']
+    if workers is None:
+        workers = os.cpu_count() or 1
+    queue_depth = app.config['PASSWORD_HASH_QUEUE_DEPTH'] or max(workers, 1) * 4
+    app.extensions['password_hasher'] = PasswordHasher(
+        app.config['PASSWORD_HASH_METHOD'], workers, queue_depth
+    )
+
+
+def get_password_hasher():
+    return current_app.extensions['password_hasher']
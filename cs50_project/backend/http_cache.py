@@ -0,0 +1,112 @@
+"""
+Conditional GET and precompressed response helpers.
+
+Routes compute a strong ETag from cheap version data (catalog digests,
+per-user completion state) and call not_modified() before building the
+body, so a client revalidating an unchanged resource costs neither
+serialization nor bandwidth.
+
+Bodies that are identical for every user (a topic's full payload) are
+wrapped in PrecompressedBody, which serializes once and keeps gzip and,
+when the optional brotli package is installed, br encodings. The catalog
+holds one per topic per version, so requests only negotiate an encoding
+and copy stored bytes.
+"""
+import gzip
+import hashlib
+import json
+import threading
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip is offered
+    brotli = None
+
+# Preference order when the client accepts several encodings equally
+ENCODINGS = ('br', 'gzip') if brotli else ('gzip',)
+
+
+def make_etag(*parts):
+    """Strong ETag value (unquoted) for the given version components"""
+    raw = '\x1f'.join(str(part) for part in parts)
+    return hashlib.sha1(raw.encode()).hexdigest()[:20]
+
+
+def content_etag(payload):
+    """ETag value for a JSON-serializable payload"""
+    return make_etag(json.dumps(payload, sort_keys=True, default=str))
+
+
+def not_modified(etag):
+    """A 304 response if the request's If-None-Match matches etag, else None"""
+    if etag in request.if_none_match:
+        return with_etag(Response(status=304), etag)
+    return None
+
+
+def with_etag(response, etag):
+    # Responses are per user (completion flags, Authorization), and must be
+    # revalidated on every use so catalog edits show up straight away
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.vary.add('Authorization')
+    return response
+
+
+class PrecompressedBody:
+    """A JSON response body serialized once, with its compressed encodings"""
+
+    def __init__(self, data):
+        self._encoded = {'identity': data}
+        self._lock = threading.Lock()
+
+    def encoded(self, encoding):
+        """The body in `encoding`, compressing it on first use"""
+        body = self._encoded.get(encoding)
+        if body is None:
+            with self._lock:
+                body = self._encoded.get(encoding)
+                if body is None:
+                    body = self._encoded[encoding] = compress(self._encoded['identity'], encoding)
+        return body
+
+
+def compress(data, encoding):
+    # Paid once per catalog version, so use the strongest settings. mtime=0
+    # keeps gzip output identical across processes.
+    if encoding == 'gzip':
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    if encoding == 'br':
+        return brotli.compress(data, quality=11)
+    raise ValueError(f'Unsupported encoding: {encoding}')
+
+
+def negotiate_encoding():
+    """The best encoding in ENCODINGS the client accepts, or 'identity'"""
+    accepted = request.accept_encodings
+    best, best_quality = 'identity', 0
+    for encoding in ENCODINGS:
+        quality = accepted[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def precompressed_response(body, etag):
+    """Serve a PrecompressedBody, or a 304, in the negotiated encoding.
+
+    Each encoding is a different representation, so it gets its own
+    strong ETag.
+    """
+    encoding = negotiate_encoding()
+    if encoding != 'identity':
+        etag = f'{etag}-{encoding}'
+
+    response = not_modified(etag)
+    if response is None:
+        response = with_etag(Response(body.encoded(encoding), mimetype='application/json'), etag)
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
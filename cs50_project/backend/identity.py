@@ -0,0 +1,154 @@
+"""
+Cache of the authenticated user for JWT-protected routes.
+
+app.py registers load_user() as the JWTManager user_lookup_loader, so
+every @jwt_required() request resolves its user exactly once and handlers
+read it from flask_jwt_extended.current_user. Resolved users are kept in
+a bounded LRU with a short TTL, so hot users skip the database entirely.
+
+Entries are the user's to_dict() payload rather than ORM objects, which
+would be detached once the request's session ends. Payloads are shared
+between requests; callers must copy them before adding fields.
+
+Writes invalidate the affected users when their transaction commits: ORM
+changes to User rows are picked up automatically, and the Core UPDATEs in
+submissions.py call mark_user_changed(). The TTL bounds how stale a user
+can be when another process wrote it.
+"""
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+try:
+    from backend.models import User, db
+    from backend.database import use_primary
+except ModuleNotFoundError:
+    from models import User, db
+    from database import use_primary
+
+_DIRTY_KEY = 'identity_cache_dirty'
+
+
+class IdentityCache:
+    """Bounded LRU of user payloads with a per-entry TTL"""
+
+    def __init__(self, maxsize, ttl, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # user id -> (expires_at, payload)
+        # Bumped by every invalidation, so a load that raced with a write
+        # is returned to its caller but never stored
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, user_id, load):
+        """Return the cached payload for user_id, calling load(user_id) on a miss"""
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self._generation
+
+        payload = load(user_id)
+        if payload is None or self.maxsize <= 0:
+            return payload
+
+        with self._lock:
+            if generation == self._generation:
+                self._entries[user_id] = (now + self.ttl, payload)
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return payload
+
+    def invalidate(self, user_ids):
+        with self._lock:
+            self._generation += 1
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hitRate': round(self.hits / lookups, 4) if lookups else None
+            }
+
+
+def init_identity_cache(app):
+    """Attach a fresh identity cache to the app and hook up commit invalidation"""
+    app.extensions['identity_cache'] = IdentityCache(
+        app.config['IDENTITY_CACHE_SIZE'], app.config['IDENTITY_CACHE_TTL']
+    )
+    if not event.contains(Session, 'after_flush', _track_user_writes):
+        event.listen(Session, 'after_flush', _track_user_writes)
+        event.listen(Session, 'after_commit', _invalidate_after_commit)
+        event.listen(Session, 'after_rollback', _forget_user_writes)
+
+
+def get_identity_cache():
+    """Return the identity cache for the current app"""
+    return current_app.extensions['identity_cache']
+
+
+def load_user(user_id):
+    """The user's to_dict() payload, or None if the user does not exist.
+
+    Call this again after committing a write: the commit invalidates the
+    cache entry, whereas current_user keeps the value resolved when the
+    request started.
+    """
+    return get_identity_cache().get(user_id, _load_from_db)
+
+
+def mark_user_changed(user_id, session=None):
+    """Invalidate the user's cache entry when the current transaction commits"""
+    session = session or db.session
+    session.info.setdefault(_DIRTY_KEY, set()).add(user_id)
+
+
+def _load_from_db(user_id):
+    # Cached for the TTL, so never fill it from a lagging replica
+    with use_primary():
+        user = db.session.get(User, user_id)
+    return user.to_dict() if user else None
+
+
+def _track_user_writes(session, flush_context):
+    for obj in (*session.dirty, *session.deleted):
+        if isinstance(obj, User):
+            mark_user_changed(obj.id, session)
+
+
+def _invalidate_after_commit(session):
+    user_ids = session.info.pop(_DIRTY_KEY, None)
+    if user_ids and has_app_context():
+        cache = current_app.extensions.get('identity_cache')
+        if cache is not None:
+            cache.invalidate(user_ids)
+
+
+def _forget_user_writes(session):
+    session.info.pop(_DIRTY_KEY, None)
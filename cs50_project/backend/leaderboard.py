@@ -0,0 +1,261 @@
+"""
+In-memory ranked index of users for the leaderboard.
+
+A full ORDER BY ... LIMIT plus a COUNT(*) of everyone ahead of the caller
+gets slow as the users table grows. Instead every process keeps one
+sorted list per metric, built from the users table at startup. Top-K
+and neighbour reads, rank lookups and updates are all O(log n).
+
+Each sorted list holds one int per user: the metric value, negated so
+the best comes first, times SLOT_SPACE plus the user's slot number. That
+costs one small int per user per metric instead of a tuple. Users with
+the same value share a rank (1, 2, 2, 4) and are listed in slot order.
+
+The index is kept current in three ways:
+- Writes made through this process update it when their transaction
+  commits. ORM changes to User rows are picked up automatically, and the
+  Core UPDATEs in submissions.py call mark_leaderboard_changed(). The
+  changed rows are read back once, just before the commit.
+- Writes made by other processes are picked up every
+  LEADERBOARD_SYNC_INTERVAL seconds by re-reading the users whose
+  updated_at is newer than the last sync.
+- Users deleted elsewhere stay listed until the next restart.
+"""
+import threading
+import time
+from datetime import timedelta
+from flask import current_app, has_app_context
+from sortedcontainers import SortedList
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+try:
+    from backend.models import User, db
+    from backend.database import use_primary
+except ModuleNotFoundError:
+    from models import User, db
+    from database import use_primary
+
+# API name -> User column
+METRICS = {
+    'dailyStreak': User.daily_streak,
+    'bestDailyStreak': User.best_daily_streak,
+    'correctAnswers': User.correct_answers,
+    'totalQuizzes': User.total_quizzes,
+}
+ROW_COLUMNS = (User.id, User.username, *METRICS.values())
+SLOT_SPACE = 1 << 32
+# Re-read rows stamped this long before the last sync too, so a transaction
+# that commits after a newer row was seen is not missed
+SYNC_OVERLAP = timedelta(seconds=60)
+
+_DIRTY_KEY = 'leaderboard_dirty'
+_PENDING_KEY = 'leaderboard_pending'
+
+
+class Leaderboard:
+    """Users ranked by each metric, with O(log n) updates and rank lookups"""
+
+    def __init__(self, rows=(), sync_interval=None, clock=time.monotonic):
+        """`rows` are (user_id, username, *metric values) in METRICS order"""
+        self._lock = threading.Lock()
+        self._sync_interval = sync_interval
+        self._clock = clock
+        self._next_sync = clock() + sync_interval if sync_interval is not None else None
+        self.synced_until = None    # newest updated_at seen by a sync
+        self._slots = {}            # user id -> slot
+        self._ids = []              # slot -> user id, None once freed
+        self._names = []            # slot -> username
+        self._values = [[] for _ in METRICS]    # per metric: slot -> value
+        self._free = []
+        for row in rows:
+            self._slots[row[0]] = len(self._ids)
+            self._ids.append(row[0])
+            self._names.append(row[1])
+            for values, value in zip(self._values, row[2:]):
+                values.append(value or 0)
+        # One sort per metric rather than n inserts
+        self._ranked = [
+            SortedList(-value * SLOT_SPACE + slot for slot, value in enumerate(values))
+            for values in self._values
+        ]
+
+    def __len__(self):
+        return len(self._slots)
+
+    def update(self, rows):
+        """Insert or update users from (user_id, username, *metric values) rows"""
+        with self._lock:
+            for row in rows:
+                self._update_locked(row)
+
+    def remove(self, user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                slot = self._slots.pop(user_id, None)
+                if slot is None:
+                    continue
+                for ranked, values in zip(self._ranked, self._values):
+                    ranked.remove(-values[slot] * SLOT_SPACE + slot)
+                self._ids[slot] = self._names[slot] = None
+                self._free.append(slot)
+
+    def add_missing(self, row):
+        """Insert a user not indexed yet; a user already indexed is left alone"""
+        with self._lock:
+            if row[0] not in self._slots:
+                self._update_locked(row)
+
+    def top(self, metric, limit):
+        """The first `limit` users by `metric` as {rank, username, value} dicts"""
+        index = _metric_index(metric)
+        with self._lock:
+            return self._entries_locked(index, 0, limit)
+
+    def around(self, metric, user_id, radius):
+        """The user's rank and value, and up to `radius` users either side.
+
+        Returns (me, neighbours), or (None, []) if the user is not indexed.
+        """
+        index = _metric_index(metric)
+        with self._lock:
+            slot = self._slots.get(user_id)
+            if slot is None:
+                return None, []
+            ranked = self._ranked[index]
+            position = ranked.index(-self._values[index][slot] * SLOT_SPACE + slot)
+            start = max(position - radius, 0)
+            neighbours = self._entries_locked(index, start, position + radius + 1 - start)
+            me = neighbours[position - start]
+            return {'rank': me['rank'], 'value': me['value']}, neighbours
+
+    def rank(self, metric, user_id):
+        """1-based rank of the user by `metric`, or None if not indexed"""
+        index = _metric_index(metric)
+        with self._lock:
+            slot = self._slots.get(user_id)
+            if slot is None:
+                return None
+            return self._ranked[index].bisect_left(-self._values[index][slot] * SLOT_SPACE) + 1
+
+    def sync_if_due(self):
+        """Apply writes made by other processes if the sync interval has passed"""
+        if self._next_sync is None or self._clock() < self._next_sync:
+            return False
+        self._next_sync = self._clock() + self._sync_interval
+        query = select(*ROW_COLUMNS, User.updated_at)
+        if self.synced_until is not None:
+            query = query.where(User.updated_at >= self.synced_until - SYNC_OVERLAP)
+        with use_primary():
+            rows = db.session.execute(query).all()
+        self.update(row[:-1] for row in rows)
+        newest = max((row.updated_at for row in rows if row.updated_at is not None), default=None)
+        if newest is not None and (self.synced_until is None or newest > self.synced_until):
+            self.synced_until = newest
+        return True
+
+    def _update_locked(self, row):
+        user_id, username, metric_values = row[0], row[1], row[2:]
+        slot = self._slots.get(user_id)
+        if slot is None:
+            slot = self._free.pop() if self._free else len(self._ids)
+            if slot == len(self._ids):
+                self._ids.append(None)
+                self._names.append(None)
+                for values in self._values:
+                    values.append(0)
+            self._slots[user_id] = slot
+            self._ids[slot] = user_id
+            for ranked, values in zip(self._ranked, self._values):
+                values[slot] = 0
+                ranked.add(slot)
+        self._names[slot] = username
+        for ranked, values, value in zip(self._ranked, self._values, metric_values):
+            value = value or 0
+            if values[slot] != value:
+                ranked.remove(-values[slot] * SLOT_SPACE + slot)
+                ranked.add(-value * SLOT_SPACE + slot)
+                values[slot] = value
+
+    def _entries_locked(self, index, start, count):
+        ranked, values = self._ranked[index], self._values[index]
+        entries = []
+        rank = previous = None
+        for position, key in enumerate(ranked.islice(start, start + count), start):
+            slot = key % SLOT_SPACE
+            value = values[slot]
+            if value != previous:
+                # Ties share the rank of the first user with that value
+                rank = position + 1 if rank is not None else ranked.bisect_left(-value * SLOT_SPACE) + 1
+                previous = value
+            entries.append({'rank': rank, 'username': self._names[slot], 'value': value, 'userId': self._ids[slot]})
+        return entries
+
+
+def _metric_index(metric):
+    try:
+        return list(METRICS).index(metric)
+    except ValueError:
+        raise ValueError(f"metric must be one of: {', '.join(METRICS)}") from None
+
+
+def init_leaderboard(app):
+    """Build the leaderboard from the users table and hook up commit updates"""
+    interval = app.config['LEADERBOARD_SYNC_INTERVAL']
+    with app.app_context():
+        with use_primary():
+            rows = db.session.execute(
+                select(*ROW_COLUMNS).execution_options(yield_per=10_000)
+            )
+            leaderboard = Leaderboard(rows, sync_interval=interval if interval > 0 else None)
+            leaderboard.synced_until = db.session.scalar(select(db.func.max(User.updated_at)))
+        db.session.remove()
+    app.extensions['leaderboard'] = leaderboard
+    if not event.contains(Session, 'after_flush', _track_user_writes):
+        event.listen(Session, 'after_flush', _track_user_writes)
+        event.listen(Session, 'before_commit', _read_changed_users)
+        event.listen(Session, 'after_commit', _update_after_commit)
+        event.listen(Session, 'after_rollback', _forget_user_writes)
+
+
+def get_leaderboard():
+    """Return the leaderboard for the current app, or None when disabled"""
+    return current_app.extensions.get('leaderboard')
+
+
+def mark_leaderboard_changed(user_id, session=None):
+    """Re-rank the user when the current transaction commits"""
+    session = session or db.session
+    session.info.setdefault(_DIRTY_KEY, set()).add(user_id)
+
+
+def _track_user_writes(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, User):
+            mark_leaderboard_changed(obj.id, session)
+
+
+def _read_changed_users(session):
+    if not has_app_context() or current_app.extensions.get('leaderboard') is None:
+        return
+    # Flush first: commit only flushes after before_commit listeners ran
+    session.flush()
+    user_ids = session.info.pop(_DIRTY_KEY, None)
+    if user_ids:
+        rows = session.connection().execute(select(*ROW_COLUMNS).where(User.id.in_(user_ids))).all()
+        session.info[_PENDING_KEY] = (user_ids, rows)
+
+
+def _update_after_commit(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    session.info.pop(_DIRTY_KEY, None)
+    if pending and has_app_context():
+        leaderboard = current_app.extensions.get('leaderboard')
+        if leaderboard is not None:
+            user_ids, rows = pending
+            leaderboard.update(rows)
+            leaderboard.remove(user_ids - {row[0] for row in rows})
+
+
+def _forget_user_writes(session):
+    session.info.pop(_DIRTY_KEY, None)
+    session.info.pop(_PENDING_KEY, None)
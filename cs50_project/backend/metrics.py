@@ -0,0 +1,240 @@
+"""
+Request and SQL metrics, exposed in Prometheus text format at /metrics.
+
+init_metrics() hooks every request and every database engine of the app:
+
+- http_request_duration_seconds  latency histogram per blueprint, endpoint
+  and method (time until the response is returned to the server;
+  streamed bodies are not included)
+- http_requests_total            responses per blueprint, endpoint, method
+  and status
+- http_requests_in_flight        requests currently being handled
+- http_request_sql_queries_total and http_request_sql_duration_seconds_total,
+  statements run on behalf of each endpoint and the time spent in them,
+  from SQLAlchemy cursor events
+- identity_cache_*               the authenticated-user cache counters
+
+Requests slower than SLOW_REQUEST_MS are also logged as one warning line
+with their status, latency and SQL count and time.
+
+Metrics live in process memory, so each worker process reports its own.
+Recording costs a few microseconds per request; see
+benchmarks/metrics_overhead.py.
+"""
+import bisect
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from flask import Response, current_app, request
+from sqlalchemy import event
+try:
+    from backend.models import db
+except ModuleNotFoundError:
+    from models import db
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds (Prometheus client defaults)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+
+class Metrics:
+    """Thread-safe in-process registry of request and SQL metrics"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._latency = {}      # (blueprint, endpoint, method) -> [bucket counts..., sum, count]
+        self._responses = {}    # (blueprint, endpoint, method, status) -> count
+        self._sql = {}          # (blueprint, endpoint, method) -> [queries, seconds]
+        self.in_flight = 0
+
+    def request_started(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def request_finished(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def observe(self, blueprint, endpoint, method, status, seconds, queries, sql_seconds):
+        """Record one response"""
+        key = (blueprint, endpoint, method)
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            latency = self._latency.get(key)
+            if latency is None:
+                latency = self._latency[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            latency[index] += 1
+            latency[-2] += seconds
+            latency[-1] += 1
+            status_key = key + (status,)
+            self._responses[status_key] = self._responses.get(status_key, 0) + 1
+            if queries:
+                sql = self._sql.get(key)
+                if sql is None:
+                    sql = self._sql[key] = [0, 0.0]
+                sql[0] += queries
+                sql[1] += sql_seconds
+
+    def render(self, extra=()):
+        """The registry in Prometheus text exposition format.
+
+        `extra` holds (name, type, help, value) tuples for unlabelled samples.
+        """
+        with self._lock:
+            latency = {key: list(values) for key, values in self._latency.items()}
+            responses = dict(self._responses)
+            sql = {key: list(values) for key, values in self._sql.items()}
+            in_flight = self.in_flight
+
+        lines = [
+            '# HELP http_request_duration_seconds Time to handle a request, by endpoint',
+            '# TYPE http_request_duration_seconds histogram',
+        ]
+        bounds = [_format_value(bound) for bound in self.buckets] + ['+Inf']
+        for key, values in sorted(latency.items()):
+            labels = _labels(*key)
+            cumulative = 0
+            for bound, count in zip(bounds, values):
+                cumulative += count
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'http_request_duration_seconds_sum{{{labels}}} {_format_value(values[-2])}')
+            lines.append(f'http_request_duration_seconds_count{{{labels}}} {values[-1]}')
+
+        lines += [
+            '# HELP http_requests_total Responses by endpoint, method and status',
+            '# TYPE http_requests_total counter',
+        ]
+        for (*key, status), count in sorted(responses.items()):
+            lines.append(f'http_requests_total{{{_labels(*key)},status="{status}"}} {count}')
+
+        lines += [
+            '# HELP http_requests_in_flight Requests currently being handled',
+            '# TYPE http_requests_in_flight gauge',
+            f'http_requests_in_flight {in_flight}',
+            '# HELP http_request_sql_queries_total SQL statements run by requests, by endpoint',
+            '# TYPE http_request_sql_queries_total counter',
+        ]
+        for key, (queries, _) in sorted(sql.items()):
+            lines.append(f'http_request_sql_queries_total{{{_labels(*key)}}} {queries}')
+        lines += [
+            '# HELP http_request_sql_duration_seconds_total Time requests spent in SQL, by endpoint',
+            '# TYPE http_request_sql_duration_seconds_total counter',
+        ]
+        for key, (_, seconds) in sorted(sql.items()):
+            lines.append(f'http_request_sql_duration_seconds_total{{{_labels(*key)}}} {_format_value(seconds)}')
+
+        for name, kind, help_text, value in extra:
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}', f'{name} {_format_value(value)}']
+        return '\n'.join(lines) + '\n'
+
+
+def init_metrics(app):
+    """Record metrics for every request and query of the app and serve them at /metrics"""
+    metrics = app.extensions['metrics'] = Metrics()
+
+    with app.app_context():
+        for engine in db.engines.values():
+            if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+                event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+                event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+    @app.before_request
+    def start_timer():
+        timer = _RequestTimer()
+        timer.token = _current_timer.set(timer)
+        metrics.request_started()
+
+    @app.after_request
+    def record_response(response):
+        timer = _current_timer.get()
+        if timer is not None and not timer.recorded:
+            timer.recorded = True
+            elapsed = time.perf_counter() - timer.started
+            req = request._get_current_object()
+            metrics.observe(req.blueprint or '', req.endpoint or 'unmatched', req.method, response.status_code,
+                            elapsed, timer.queries, timer.sql_seconds)
+            slow_ms = app.config['SLOW_REQUEST_MS']
+            if slow_ms > 0 and elapsed * 1000 >= slow_ms:
+                logger.warning(
+                    'Slow request: %s %s -> %s in %.1f ms (%d queries, %.1f ms SQL)',
+                    req.method, req.full_path.rstrip('?'), response.status_code,
+                    elapsed * 1000, timer.queries, timer.sql_seconds * 1000
+                )
+        return response
+
+    @app.teardown_request
+    def finish_request(exc):
+        timer = _current_timer.get()
+        if timer is not None:
+            _current_timer.reset(timer.token)
+            metrics.request_finished()
+
+    @app.route('/metrics')
+    def metrics_endpoint():
+        return Response(metrics.render(_identity_cache_samples(app)),
+                        mimetype='text/plain; version=0.0.4')
+
+    return metrics
+
+
+def get_metrics():
+    """Return the metrics registry for the current app"""
+    return current_app.extensions['metrics']
+
+
+class _RequestTimer:
+    """Start time and SQL totals of the request being handled"""
+    __slots__ = ('started', 'queries', 'sql_seconds', 'recorded', 'token')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.recorded = False
+        self.token = None
+
+
+# A context variable rather than flask.g: cursor events fire for every
+# statement and g costs a proxy lookup per access
+_current_timer = ContextVar('metrics_request_timer', default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current_timer.get() is not None:
+        context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timer = _current_timer.get()
+    started = getattr(context, '_metrics_started', None)
+    if timer is not None and started is not None:
+        timer.queries += 1
+        timer.sql_seconds += time.perf_counter() - started
+
+
+def _identity_cache_samples(app):
+    cache = app.extensions.get('identity_cache')
+    if cache is None:
+        return ()
+    stats = cache.stats()
+    return (
+        ('identity_cache_hits_total', 'counter', 'Identity cache lookups served from memory', stats['hits']),
+        ('identity_cache_misses_total', 'counter', 'Identity cache lookups that read the database', stats['misses']),
+        ('identity_cache_evictions_total', 'counter', 'Identity cache entries evicted by size', stats['evictions']),
+        ('identity_cache_size', 'gauge', 'Users currently in the identity cache', stats['size']),
+    )
+
+
+def _labels(blueprint, endpoint, method):
+    return f'blueprint="{_escape(blueprint)}",endpoint="{_escape(endpoint)}",method="{method}"'
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
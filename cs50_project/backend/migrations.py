@@ -0,0 +1,195 @@
+"""
+Idempotent data migrations run at startup after db.create_all().
+
+create_all() only creates missing tables, so anything derived from
+existing rows is backfilled here. Every step checks whether it still has
+work to do and is cheap when it does not.
+"""
+from sqlalchemy import Date, Float, Integer, case, cast, func, insert, inspect, select, text, update
+try:
+    from backend.models import ReviewItem, User, UserActivityDay, UserProgress, UserTopicCompletion, UserTopicStats, db
+except ModuleNotFoundError:
+    from models import ReviewItem, User, UserActivityDay, UserProgress, UserTopicCompletion, UserTopicStats, db
+
+
+def run_migrations():
+    add_content_hash_columns()
+    add_progress_completion_day()
+    create_missing_indexes()
+    backfill_topic_completions()
+    backfill_activity_days()
+    backfill_topic_stats()
+    backfill_review_items()
+    db.session.commit()
+
+
+def add_content_hash_columns():
+    """Add topics.content_hash and questions.content_hash.
+
+    Existing rows keep a NULL hash, which the next content pack load
+    treats as changed and rewrites once.
+    """
+    inspector = inspect(db.engine)
+    for table in ('topics', 'questions'):
+        columns = {column['name'] for column in inspector.get_columns(table)}
+        if 'content_hash' not in columns:
+            db.session.execute(text(f'ALTER TABLE {table} ADD COLUMN content_hash VARCHAR(40)'))
+
+
+def add_progress_completion_day():
+    """Add and backfill user_progress.completion_day and its indexes"""
+    progress = UserProgress.__table__
+    inspector = inspect(db.engine)
+    columns = {column['name'] for column in inspector.get_columns('user_progress')}
+    indexes = {index['name'] for index in inspector.get_indexes('user_progress')}
+    dialect = db.engine.dialect.name
+
+    if 'completion_day' not in columns:
+        db.session.execute(text('ALTER TABLE user_progress ADD COLUMN completion_day DATE'))
+        # SQLite has no DATE type, so CAST would yield a number there
+        day = func.date(progress.c.completed_at) if dialect == 'sqlite' else cast(progress.c.completed_at, Date)
+        db.session.execute(
+            update(progress)
+            .where(progress.c.completion_day.is_(None))
+            .values(completion_day=day)
+        )
+
+    if 'uq_user_progress_daily_per_day' not in indexes:
+        # Older databases may hold duplicate daily rows from before the
+        # constraint existed; keep the first per day and count the rest as practice
+        first_daily = (
+            select(func.min(progress.c.id))
+            .where(progress.c.is_daily.is_(True))
+            .group_by(progress.c.user_id, progress.c.completion_day)
+        )
+        db.session.execute(
+            update(progress)
+            .where(progress.c.is_daily.is_(True))
+            .where(progress.c.id.not_in(first_daily))
+            .values(is_daily=False)
+        )
+        if dialect == 'postgresql':
+            db.session.execute(text(
+                'ALTER TABLE user_progress DROP CONSTRAINT IF EXISTS unique_user_topic_daily'
+            ))
+
+
+def create_missing_indexes():
+    """Create indexes declared on models that existing tables lack"""
+    inspector = inspect(db.engine)
+    connection = db.session.connection()
+    for table in db.metadata.sorted_tables:
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(connection)
+
+
+def backfill_topic_completions():
+    """Build user_topic_completion from UserProgress history"""
+    if db.session.query(UserTopicCompletion.user_id).first() is not None:
+        return
+    if db.session.query(UserProgress.id).first() is None:
+        return
+
+    completion = UserTopicCompletion.__table__
+    history = (
+        select(UserProgress.user_id, UserProgress.topic_id, func.min(UserProgress.completed_at))
+        .group_by(UserProgress.user_id, UserProgress.topic_id)
+    )
+    db.session.execute(
+        insert(completion).from_select(['user_id', 'topic_id', 'first_completed_at'], history)
+    )
+
+    # Resync the denormalized counter with the index
+    completed = (
+        select(func.count())
+        .where(completion.c.user_id == User.id)
+        .scalar_subquery()
+    )
+    db.session.execute(update(User).values(topics_completed=completed))
+
+
+def backfill_activity_days():
+    """Build user_activity_days from UserProgress history"""
+    if db.session.query(UserActivityDay.user_id).first() is not None:
+        return
+    if db.session.query(UserProgress.id).first() is None:
+        return
+
+    history = (
+        select(
+            UserProgress.user_id,
+            UserProgress.completion_day,
+            func.count(),
+            func.sum(case((UserProgress.is_daily.is_(True), 1), else_=0)).cast(Integer)
+        )
+        .where(UserProgress.completion_day.is_not(None))
+        .group_by(UserProgress.user_id, UserProgress.completion_day)
+    )
+    db.session.execute(
+        insert(UserActivityDay.__table__).from_select(['user_id', 'day', 'quizzes', 'daily_quizzes'], history)
+    )
+
+
+def backfill_topic_stats():
+    """Build user_topic_stats from UserProgress history in one GROUP BY pass.
+
+    The order of past attempts is not replayed, so the rolling score
+    starts as the plain average of each topic's attempts.
+    """
+    if db.session.query(UserTopicStats.user_id).first() is not None:
+        return
+    if db.session.query(UserProgress.id).first() is None:
+        return
+
+    score = case(
+        (UserProgress.total_questions > 0, cast(UserProgress.correct_count, Float) / UserProgress.total_questions),
+        else_=0.0
+    )
+    history = (
+        select(
+            UserProgress.user_id,
+            UserProgress.topic_id,
+            func.count(),
+            func.sum(UserProgress.total_questions).cast(Integer),
+            func.sum(UserProgress.correct_count).cast(Integer),
+            func.max(score),
+            func.avg(score),
+            func.max(UserProgress.completed_at)
+        )
+        .group_by(UserProgress.user_id, UserProgress.topic_id)
+    )
+    db.session.execute(
+        insert(UserTopicStats.__table__).from_select(
+            ['user_id', 'topic_id', 'attempts', 'questions_answered', 'correct_answers',
+             'best_score', 'rolling_score', 'last_attempt_at'],
+            history
+        )
+    )
+
+
+def backfill_review_items():
+    """Schedule a review of every topic in the UserProgress history.
+
+    Past attempts are not replayed through the scheduler, so each topic
+    starts with the initial SM-2 state, due on the day it was last quizzed.
+    """
+    if db.session.query(ReviewItem.user_id).first() is not None:
+        return
+    if db.session.query(UserProgress.id).first() is None:
+        return
+
+    history = (
+        select(
+            UserProgress.user_id,
+            UserProgress.topic_id,
+            func.max(UserProgress.completion_day),
+            func.max(UserProgress.completed_at)
+        )
+        .where(UserProgress.completion_day.is_not(None))
+        .group_by(UserProgress.user_id, UserProgress.topic_id)
+    )
+    db.session.execute(
+        insert(ReviewItem.__table__).from_select(['user_id', 'topic_id', 'due_day', 'last_reviewed_at'], history)
+    )
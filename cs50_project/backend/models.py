@@ -1,9 +1,13 @@
 from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime, date
+try:
+    from backend.database import RoutingSession
+except ModuleNotFoundError:
+    from database import RoutingSession
 
-# db will be initialized in app.py
-db = SQLAlchemy()
+# db will be initialized in app.py (see database.init_database)
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -31,7 +35,8 @@ class User(db.Model):
     
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Indexed for the leaderboard's sync of rows written by other processes
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     
     # Relationships
     progress = db.relationship('UserProgress', backref='user', lazy=True, cascade='all, delete-orphan')
@@ -71,9 +76,12 @@ class Topic(db.Model):
     difficulty = db.Column(db.String(20), nullable=False)  # Beginner, Intermediate, Advanced
     estimated_time = db.Column(db.Integer, nullable=False)  # minutes
     created_at = db.Column(db.Date, default=date.today)
+    # Digest of the fields above as last written by a content pack
+    content_hash = db.Column(db.String(40), nullable=True)
     
-    # Relationships
-    questions = db.relationship('Question', backref='topic', lazy=True, cascade='all, delete-orphan')
+    # Relationships (selectin: loading many topics fetches all their
+    # questions in one extra query instead of one per topic)
+    questions = db.relationship('Question', backref='topic', lazy='selectin', cascade='all, delete-orphan')
     
     def to_dict(self, include_questions=True):
         data = {
@@ -100,6 +108,8 @@ class Question(db.Model):
     options = db.Column(db.JSON, nullable=False)  # List of strings
     correct_index = db.Column(db.Integer, nullable=False)
     explanation = db.Column(db.Text, nullable=False)
+    # Digest of the fields above as last written by a content pack
+    content_hash = db.Column(db.String(40), nullable=True)
     
     def to_dict(self):
         return {
@@ -111,6 +121,89 @@ class Question(db.Model):
             'explanation': self.explanation
         }
 
+class CatalogVersion(db.Model):
+    __tablename__ = 'catalog_version'
+    
+    # Single row bumped whenever content packs change topics or questions,
+    # so every process can tell its cached catalog is stale
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class JobCheckpoint(db.Model):
+    __tablename__ = 'job_checkpoints'
+    
+    # Progress of a chunked batch job, so an interrupted run resumes where
+    # it stopped; written in the same transaction as each chunk
+    name = db.Column(db.String(50), primary_key=True)
+    run_day = db.Column(db.Date, nullable=False)
+    cursor = db.Column(db.String(50), nullable=True)    # last key processed, None once finished
+    rows_touched = db.Column(db.Integer, nullable=False, default=0)
+    started_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+class DailySchedule(db.Model):
+    __tablename__ = 'daily_schedule'
+    
+    # One row per calendar day, materialized ahead of time by schedule.py
+    day = db.Column(db.Date, primary_key=True)
+    topic_id = db.Column(db.String(50), db.ForeignKey('topics.id', ondelete='CASCADE'), nullable=False)
+
+class UserTopicCompletion(db.Model):
+    __tablename__ = 'user_topic_completion'
+    
+    # One row per topic a user has ever completed, maintained on submit
+    user_id = db.Column(db.String(50), db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    topic_id = db.Column(db.String(50), db.ForeignKey('topics.id', ondelete='CASCADE'), primary_key=True)
+    first_completed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class UserActivityDay(db.Model):
+    __tablename__ = 'user_activity_days'
+    
+    # Quizzes per user per calendar day, maintained on submit for the streak graph
+    user_id = db.Column(db.String(50), db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    quizzes = db.Column(db.Integer, default=0, nullable=False)
+    daily_quizzes = db.Column(db.Integer, default=0, nullable=False)
+
+class UserTopicStats(db.Model):
+    __tablename__ = 'user_topic_stats'
+    
+    # Per-user per-topic quiz aggregates, upserted on submit
+    user_id = db.Column(db.String(50), db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    topic_id = db.Column(db.String(50), db.ForeignKey('topics.id', ondelete='CASCADE'), primary_key=True)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    questions_answered = db.Column(db.Integer, default=0, nullable=False)
+    correct_answers = db.Column(db.Integer, default=0, nullable=False)
+    best_score = db.Column(db.Float, default=0, nullable=False)       # fraction of questions correct
+    rolling_score = db.Column(db.Float, default=0, nullable=False)    # exponentially weighted, newest attempts count most
+    last_attempt_at = db.Column(db.DateTime, nullable=False)
+
+class ReviewItem(db.Model):
+    __tablename__ = 'review_items'
+    
+    # SM-2 spaced-repetition state per user per topic, updated on submit
+    user_id = db.Column(db.String(50), db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    topic_id = db.Column(db.String(50), db.ForeignKey('topics.id', ondelete='CASCADE'), primary_key=True)
+    ease = db.Column(db.Float, default=2.5, nullable=False)
+    interval_days = db.Column(db.Integer, default=0, nullable=False)
+    repetitions = db.Column(db.Integer, default=0, nullable=False)    # successful reviews in a row
+    due_day = db.Column(db.Date, nullable=False)
+    last_reviewed_at = db.Column(db.DateTime, nullable=False)
+    
+    __table_args__ = (
+        # The review queue is a range scan of one user's items by due day
+        db.Index('ix_review_items_user_due', 'user_id', 'due_day'),
+    )
+
+class SubmissionReceipt(db.Model):
+    __tablename__ = 'submission_receipts'
+    
+    # Client-supplied idempotency keys, so replayed submissions apply once
+    user_id = db.Column(db.String(50), db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    idempotency_key = db.Column(db.String(100), primary_key=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
 class UserProgress(db.Model):
     __tablename__ = 'user_progress'
     
@@ -118,12 +211,24 @@ class UserProgress(db.Model):
     user_id = db.Column(db.String(50), db.ForeignKey('users.id'), nullable=False, index=True)
     topic_id = db.Column(db.String(50), db.ForeignKey('topics.id'), nullable=False, index=True)
     completed_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Calendar day the attempt counts towards, stored so lookups by day can use an index
+    completion_day = db.Column(db.Date, default=date.today)
     is_daily = db.Column(db.Boolean, default=False)
     correct_count = db.Column(db.Integer, default=0)
     total_questions = db.Column(db.Integer, default=0)
     
-    # Unique constraint: user can only complete a topic once per day for daily
-    __table_args__ = (db.UniqueConstraint('user_id', 'topic_id', 'completed_at', name='unique_user_topic_daily'),)
+    __table_args__ = (
+        # Keyset pagination of a user's history by (completed_at, id)
+        db.Index('ix_user_progress_user_history', 'user_id', 'completed_at', 'id'),
+        db.Index('ix_user_progress_daily_lookup', 'user_id', 'is_daily', 'completion_day'),
+        # A user can only complete one daily quiz per day
+        db.Index(
+            'uq_user_progress_daily_per_day', 'user_id', 'completion_day',
+            unique=True,
+            sqlite_where=db.text('is_daily'),
+            postgresql_where=db.text('is_daily')
+        ),
+    )
     
     def to_dict(self):
         return {
@@ -0,0 +1,133 @@
+"""
+Spaced-repetition review scheduling.
+
+Every quiz on a topic counts as a review of it. review_items keeps the
+SM-2 state of each (user, topic): ease factor, interval in days, number
+of successful reviews in a row and the day the next review is due. The
+quiz score is graded 0-5; a grade of 3 or more moves the topic to the
+next interval (1 day, then 6, then the previous interval times the
+ease, at most MAX_INTERVAL_DAYS), anything lower starts it over at 1 day.
+The ease drifts up after easy reviews and down after hard ones, never
+below MIN_EASE.
+
+Each submit upserts the item with a single statement computed from the
+row's current state, like the other submit-time aggregates. The queue is
+one range scan of the (user_id, due_day) index that stops after the
+requested number of items, so its cost does not depend on how many
+topics the user has reviewed.
+"""
+from datetime import timedelta
+from sqlalchemy import Integer, case, cast, func
+try:
+    from backend.models import ReviewItem, db
+    from backend.dbutils import add_days, upsert
+    from backend.serializers import RowSerializer, isoformat
+except ModuleNotFoundError:
+    from models import ReviewItem, db
+    from dbutils import add_days, upsert
+    from serializers import RowSerializer, isoformat
+
+INITIAL_EASE = 2.5
+MIN_EASE = 1.3
+# Quizzing a topic again before it is due still counts as a review, so
+# without a cap repeated practice would grow the interval without bound
+MAX_INTERVAL_DAYS = 365
+PASSING_GRADE = 3
+DEFAULT_QUEUE_LIMIT = 10
+MAX_QUEUE_LIMIT = 100
+MAX_QUEUE_DAYS_AHEAD = 365
+
+items = ReviewItem.__table__
+
+QUEUE_ROW = RowSerializer([
+    ('topicId', items.c.topic_id, None),
+    ('dueDay', items.c.due_day, isoformat),
+    ('intervalDays', items.c.interval_days, None),
+    ('repetitions', items.c.repetitions, None),
+    ('ease', items.c.ease, None),
+    ('lastReviewedAt', items.c.last_reviewed_at, isoformat),
+])
+
+
+def grade(correct_count, total_questions):
+    """SM-2 quality of a quiz, 0-5, from the fraction answered correctly"""
+    if not total_questions:
+        return 0
+    return min(5, max(0, int(correct_count / total_questions * 5 + 0.5)))
+
+
+def ease_change(quality):
+    return 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)
+
+
+def next_review(ease, interval_days, repetitions, quality):
+    """Python mirror of the update applied by record_review(): (ease, interval_days, repetitions)"""
+    if quality >= PASSING_GRADE:
+        if repetitions == 0:
+            interval_days = 1
+        elif repetitions == 1:
+            interval_days = 6
+        else:
+            interval_days = min(MAX_INTERVAL_DAYS, int(interval_days * ease + 0.5))
+        repetitions += 1
+    else:
+        interval_days, repetitions = 1, 0
+    return max(MIN_EASE, ease + ease_change(quality)), interval_days, repetitions
+
+
+def record_review(user_id, topic_id, correct_count, total_questions, day, completed_at):
+    """Reschedule the user's review of a topic quizzed on `day`, in the current transaction"""
+    quality = grade(correct_count, total_questions)
+    ease, interval_days, repetitions = next_review(INITIAL_EASE, 0, 0, quality)
+    dialect_name = db.session.get_bind().dialect.name
+
+    if quality >= PASSING_GRADE:
+        # Uses the ease from before this review, as next_review() does
+        scaled = items.c.interval_days * items.c.ease
+        new_interval = case(
+            (items.c.repetitions == 0, 1),
+            (items.c.repetitions == 1, 6),
+            (scaled >= MAX_INTERVAL_DAYS, MAX_INTERVAL_DAYS),
+            else_=cast(func.round(scaled), Integer)
+        )
+        new_repetitions = items.c.repetitions + 1
+    else:
+        new_interval, new_repetitions = 1, 0
+    new_ease = items.c.ease + ease_change(quality)
+
+    stmt = upsert(
+        items,
+        dialect_name,
+        {
+            'user_id': user_id,
+            'topic_id': topic_id,
+            'ease': ease,
+            'interval_days': interval_days,
+            'repetitions': repetitions,
+            'due_day': day + timedelta(days=interval_days),
+            'last_reviewed_at': completed_at,
+        },
+        lambda new: {
+            'ease': case((new_ease < MIN_EASE, MIN_EASE), else_=new_ease),
+            'interval_days': new_interval,
+            'repetitions': new_repetitions,
+            'due_day': add_days(day, new_interval, dialect_name),
+            'last_reviewed_at': new.last_reviewed_at,
+        }
+    )
+    db.session.execute(stmt)
+
+
+def review_queue_query(user_id, until, limit):
+    """SELECT for the user's first `limit` items due on or before `until`, earliest first"""
+    return (
+        db.select(*QUEUE_ROW.columns)
+        .where(items.c.user_id == user_id)
+        .where(items.c.due_day <= until)
+        .order_by(items.c.due_day)
+        .limit(limit)
+    )
+
+
+def review_queue(user_id, until, limit):
+    return [QUEUE_ROW(row) for row in db.session.execute(review_queue_query(user_id, until, limit))]
@@ -1,14 +1,24 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import create_access_token, jwt_required
+from flask_jwt_extended import get_current_user as get_jwt_user
 from datetime import datetime
 import uuid
 try:
     from backend.models import User, db
+    from backend.hashing import HasherBusy, get_password_hasher
 except ModuleNotFoundError:
     from models import User, db
+    from hashing import HasherBusy, get_password_hasher
 
 auth_bp = Blueprint('auth', __name__)
 
+@auth_bp.errorhandler(HasherBusy)
+def hasher_busy(e):
+    # Shed load quickly instead of queueing behind a login burst
+    response = jsonify({'error': 'Server busy, please retry'})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
 @auth_bp.route('/signup', methods=['POST'])
 def signup():
     try:
@@ -32,7 +42,7 @@ def signup():
             username=username,
             role='user'
         )
-        user.set_password(password)
+        user.password_hash = get_password_hasher().hash(password)
         
         db.session.add(user)
         db.session.commit()
@@ -45,6 +55,8 @@ def signup():
             'token': access_token
         }), 201
         
+    except HasherBusy:
+        raise
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -60,10 +72,20 @@ def login():
             return jsonify({'error': 'Email and password are required'}), 400
         
         user = User.query.filter_by(email=email).first()
+        hasher = get_password_hasher()
         
-        if not user or not user.check_password(password):
+        if not user or not hasher.verify(user.password_hash, password):
             return jsonify({'error': 'Invalid email or password'}), 401
         
+        # Upgrade hashes made with outdated parameters while we have the password
+        if hasher.needs_rehash(user.password_hash):
+            try:
+                user.password_hash = hasher.hash(password)
+                db.session.commit()
+            except HasherBusy:
+                # The password checked out; a later login will rehash
+                pass
+        
         # Create access token
         access_token = create_access_token(identity=user.id)
         
@@ -72,6 +94,8 @@ def login():
             'token': access_token
         }), 200
         
+    except HasherBusy:
+        raise
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -79,13 +103,8 @@ def login():
 @jwt_required()
 def get_current_user():
     try:
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
-        
-        return jsonify({'user': user.to_dict()}), 200
+        # Resolved once per request by the JWT user loader (see identity.py)
+        return jsonify({'user': get_jwt_user()}), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
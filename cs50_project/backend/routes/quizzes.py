@@ -1,61 +1,87 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from datetime import date, datetime, timedelta
+from datetime import date, datetime, timedelta, timezone
 try:
-    from backend.models import User, UserProgress, Topic, db
+    from backend.models import db
+    from backend.identity import load_user
+    from backend.catalog import get_catalog
+    from backend.reviews import DEFAULT_QUEUE_LIMIT, MAX_QUEUE_DAYS_AHEAD, MAX_QUEUE_LIMIT, review_queue
+    from backend.schedule import get_daily_topic_id
+    from backend.submissions import apply_daily_submission, apply_practice_submission, claim_receipt
+    from backend.writebehind import get_write_behind
 except ModuleNotFoundError:
-    from models import User, UserProgress, Topic, db
+    from models import db
+    from identity import load_user
+    from catalog import get_catalog
+    from reviews import DEFAULT_QUEUE_LIMIT, MAX_QUEUE_DAYS_AHEAD, MAX_QUEUE_LIMIT, review_queue
+    from schedule import get_daily_topic_id
+    from submissions import apply_daily_submission, apply_practice_submission, claim_receipt
+    from writebehind import get_write_behind
 
 quizzes_bp = Blueprint('quizzes', __name__)
 
-def get_daily_topic():
-    """Helper function to get today's daily topic"""
-    topics = Topic.query.order_by(Topic.created_at).all()
-    if not topics:
-        return None
+MAX_BATCH_SIZE = 100
+MAX_BACKDATE_DAYS = 30
+MAX_CLOCK_SKEW = timedelta(minutes=5)
+
+def parse_attempt(attempt, now):
+    """Validate one queued attempt, returning its fields or raising ValueError"""
+    if not isinstance(attempt, dict):
+        raise ValueError('Attempt must be an object')
+    
+    kind = attempt.get('type')
+    if kind not in ('daily', 'practice'):
+        raise ValueError("type must be 'daily' or 'practice'")
     
-    today = date.today()
-    start_of_year = date(today.year, 1, 1)
-    day_of_year = (today - start_of_year).days + 1
-    index = (day_of_year - 1) % len(topics)
+    key = attempt.get('idempotencyKey')
+    if not isinstance(key, str) or not 0 < len(key) <= 100:
+        raise ValueError('idempotencyKey is required')
     
-    return topics[index]
+    if kind == 'practice' and not attempt.get('topicId'):
+        raise ValueError('Topic ID is required')
+    
+    try:
+        completed_at = datetime.fromisoformat(attempt.get('completedAt', ''))
+    except (TypeError, ValueError):
+        raise ValueError('completedAt must be an ISO 8601 timestamp')
+    if completed_at.tzinfo is None:
+        completed_at = completed_at.replace(tzinfo=timezone.utc)
+    if completed_at > now + MAX_CLOCK_SKEW:
+        raise ValueError('completedAt is in the future')
+    if completed_at < now - timedelta(days=MAX_BACKDATE_DAYS):
+        raise ValueError(f'completedAt is more than {MAX_BACKDATE_DAYS} days old')
+    
+    return {
+        'type': kind,
+        'key': key,
+        'topic_id': attempt.get('topicId'),
+        'correct_count': attempt.get('correctCount', 0),
+        'total_questions': attempt.get('totalQuestions', 0),
+        # Stored timestamps are naive UTC; the streak day is the server's local date
+        'completed_at': completed_at.astimezone(timezone.utc).replace(tzinfo=None),
+        'day': completed_at.astimezone().date()
+    }
 
-def update_streak(user, is_daily=True):
-    """Update user streak based on completion"""
-    today = date.today()
-    yesterday = today - timedelta(days=1)
+def submit_daily_write_behind(write_behind, user_id, topic_id, correct_count, total_questions, today):
+    """Journal a daily submission and answer with the projected streak"""
+    # The queue checks for a pending or committed daily under its lock
+    projected = write_behind.submit(user_id, 'daily', topic_id, correct_count, total_questions, today)
+    if projected:
+        return jsonify({
+            'newStreak': projected['dailyStreak'],
+            'streakIncreased': True,
+            'user': projected
+        }), 200
     
-    if is_daily:
-        last_completion = user.last_daily_completion
-        
-        if last_completion == today:
-            # Already completed today, don't update streak
-            return user.daily_streak
-        
-        if last_completion == yesterday:
-            # Consecutive day
-            new_streak = user.daily_streak + 1
-        elif last_completion is None:
-            # First completion
-            new_streak = 1
-        else:
-            # Streak broken
-            new_streak = 1
-        
-        user.daily_streak = new_streak
-        user.best_daily_streak = max(new_streak, user.best_daily_streak)
-        user.last_daily_completion = today
-        
-        return new_streak
-    else:
-        # Practice streak (simplified - just increment)
-        new_streak = user.practice_streak + 1
-        user.practice_streak = new_streak
-        user.best_practice_streak = max(new_streak, user.best_practice_streak)
-        user.last_practice_completion = today
-        
-        return new_streak
+    user_data = write_behind.project_user(user_id)
+    if not user_data:
+        return jsonify({'error': 'User not found'}), 404
+    
+    return jsonify({
+        'message': 'Already completed today',
+        'newStreak': user_data['dailyStreak'],
+        'streakIncreased': False
+    }), 200
 
 @quizzes_bp.route('/daily/submit', methods=['POST'])
 @jwt_required()
@@ -67,58 +93,39 @@ def submit_daily_quiz():
         correct_count = data.get('correctCount', 0)
         total_questions = data.get('totalQuestions', 0)
         
-        user = User.query.get(user_id)
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
-        
-        # Check if already completed today
         today = date.today()
-        daily_topic = get_daily_topic()
+        daily_topic_id = get_daily_topic_id(today)
+        if not daily_topic_id:
+            return jsonify({'error': 'No topics available'}), 404
         
-        existing_progress = UserProgress.query.filter_by(
-            user_id=user_id,
-            topic_id=daily_topic.id,
-            is_daily=True
-        ).filter(
-            db.func.date(UserProgress.completed_at) == today
-        ).first()
+        write_behind = get_write_behind()
+        if write_behind:
+            return submit_daily_write_behind(write_behind, user_id, daily_topic_id, correct_count, total_questions, today)
         
-        if existing_progress:
+        # Streak, counters and progress are written atomically; the update
+        # is skipped if the user already completed today's quiz
+        applied = apply_daily_submission(user_id, daily_topic_id, correct_count, total_questions, today)
+        if applied:
+            db.session.commit()
+        else:
+            db.session.rollback()
+        
+        # Committing dropped the cached user, so this reads the new streak
+        user = load_user(user_id)
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        if not applied:
             return jsonify({
                 'message': 'Already completed today',
-                'newStreak': user.daily_streak,
+                'newStreak': user['dailyStreak'],
                 'streakIncreased': False
             }), 200
         
-        # Update streak
-        new_streak = update_streak(user, is_daily=True)
-        streak_increased = new_streak > (user.daily_streak - 1) if user.daily_streak > 0 else True
-        
-        # Update user stats
-        user.topics_completed = len(set(
-            progress.topic_id 
-            for progress in UserProgress.query.filter_by(user_id=user_id).all()
-        )) + 1
-        user.total_quizzes += 1
-        user.correct_answers += correct_count
-        
-        # Create progress record
-        progress = UserProgress(
-            user_id=user_id,
-            topic_id=daily_topic.id,
-            is_daily=True,
-            correct_count=correct_count,
-            total_questions=total_questions,
-            completed_at=datetime.utcnow()
-        )
-        
-        db.session.add(progress)
-        db.session.commit()
-        
         return jsonify({
-            'newStreak': new_streak,
-            'streakIncreased': streak_increased,
-            'user': user.to_dict()
+            'newStreak': user['dailyStreak'],
+            'streakIncreased': True,
+            'user': user
         }), 200
         
     except Exception as e:
@@ -139,53 +146,115 @@ def submit_practice_quiz():
         if not topic_id:
             return jsonify({'error': 'Topic ID is required'}), 400
         
-        user = User.query.get(user_id)
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
-        
-        topic = Topic.query.get(topic_id)
-        if not topic:
+        if topic_id not in get_catalog().snapshot():
             return jsonify({'error': 'Topic not found'}), 404
         
-        # Update practice streak
-        new_streak = update_streak(user, is_daily=False)
-        
-        # Update user stats
-        user.total_quizzes += 1
-        user.correct_answers += correct_count
-        
-        # Check if topic already completed (for topics_completed count)
-        existing_progress = UserProgress.query.filter_by(
-            user_id=user_id,
-            topic_id=topic_id
-        ).first()
-        
-        if not existing_progress:
-            user.topics_completed = len(set(
-                progress.topic_id 
-                for progress in UserProgress.query.filter_by(user_id=user_id).all()
-            )) + 1
-        
-        # Create progress record
-        progress = UserProgress(
-            user_id=user_id,
-            topic_id=topic_id,
-            is_daily=False,
-            correct_count=correct_count,
-            total_questions=total_questions,
-            completed_at=datetime.utcnow()
-        )
-        
-        db.session.add(progress)
+        write_behind = get_write_behind()
+        if write_behind:
+            user_data = write_behind.submit(user_id, 'practice', topic_id, correct_count, total_questions)
+            return jsonify({
+                'newStreak': user_data['practiceStreak'],
+                'user': user_data
+            }), 200
+        
+        if not apply_practice_submission(user_id, topic_id, correct_count, total_questions):
+            db.session.rollback()
+            return jsonify({'error': 'User not found'}), 404
         db.session.commit()
         
+        user = load_user(user_id)
+        
         return jsonify({
-            'newStreak': new_streak,
-            'user': user.to_dict()
+            'newStreak': user['practiceStreak'],
+            'user': user
         }), 200
         
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@quizzes_bp.route('/submit-batch', methods=['POST'])
+@jwt_required()
+def submit_quiz_batch():
+    try:
+        user_id = get_jwt_identity()
+        data = request.get_json()
+        
+        attempts = data.get('attempts')
+        if not isinstance(attempts, list) or not attempts:
+            return jsonify({'error': 'attempts must be a non-empty list'}), 400
+        if len(attempts) > MAX_BATCH_SIZE:
+            return jsonify({'error': f'At most {MAX_BATCH_SIZE} attempts per batch'}), 400
+        
+        now = datetime.now(timezone.utc)
+        catalog = get_catalog().snapshot()
+        results = [None] * len(attempts)
+        valid = []
+        for index, attempt in enumerate(attempts):
+            try:
+                parsed = parse_attempt(attempt, now)
+            except ValueError as e:
+                key = attempt.get('idempotencyKey') if isinstance(attempt, dict) else None
+                results[index] = {'idempotencyKey': key, 'status': 'rejected', 'error': str(e)}
+                continue
+            
+            # Resolve topics before the first write: the schedule may need
+            # materializing for past days, which runs on its own connection
+            if parsed['type'] == 'daily':
+                parsed['topic_id'] = get_daily_topic_id(parsed['day'])
+            elif parsed['topic_id'] not in catalog:
+                parsed['topic_id'] = None
+            if not parsed['topic_id']:
+                results[index] = {'idempotencyKey': parsed['key'], 'status': 'rejected', 'error': 'Topic not found'}
+                continue
+            
+            valid.append((index, parsed))
+        
+        # Apply in the order the attempts happened so streaks build up correctly
+        valid.sort(key=lambda item: item[1]['completed_at'])
+        
+        for index, attempt in valid:
+            result = results[index] = {'idempotencyKey': attempt['key']}
+            
+            if not claim_receipt(user_id, attempt['key']):
+                result['status'] = 'duplicate'
+                continue
+            
+            apply = apply_daily_submission if attempt['type'] == 'daily' else apply_practice_submission
+            applied = apply(
+                user_id,
+                attempt['topic_id'],
+                attempt['correct_count'],
+                attempt['total_questions'],
+                attempt['day'],
+                attempt['completed_at']
+            )
+            result['status'] = 'applied' if applied else 'already_completed'
+        
+        db.session.commit()
+        
+        return jsonify({
+            'results': results,
+            'user': load_user(user_id)
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
 
+@quizzes_bp.route('/review-queue', methods=['GET'])
+@jwt_required()
+def get_review_queue():
+    try:
+        limit = request.args.get('limit', DEFAULT_QUEUE_LIMIT, type=int)
+        days_ahead = request.args.get('daysAhead', 0, type=int)
+        if not 1 <= limit <= MAX_QUEUE_LIMIT:
+            return jsonify({'error': f'limit must be between 1 and {MAX_QUEUE_LIMIT}'}), 400
+        if not 0 <= days_ahead <= MAX_QUEUE_DAYS_AHEAD:
+            return jsonify({'error': f'daysAhead must be between 0 and {MAX_QUEUE_DAYS_AHEAD}'}), 400
+        
+        until = date.today() + timedelta(days=days_ahead)
+        return jsonify({'reviews': review_queue(get_jwt_identity(), until, limit)}), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -1,46 +1,75 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import date, datetime
 try:
-    from backend.models import Topic, UserProgress, db
+    from backend.catalog import get_catalog
+    from backend.schedule import get_daily_topic_id
+    from backend.completions import completed_topic_ids, has_completed, has_completed_daily
+    from backend.http_cache import make_etag, not_modified, precompressed_response, with_etag
 except ModuleNotFoundError:
-    from models import Topic, UserProgress, db
+    from catalog import get_catalog
+    from schedule import get_daily_topic_id
+    from completions import completed_topic_ids, has_completed, has_completed_daily
+    from http_cache import make_etag, not_modified, precompressed_response, with_etag
 
 topics_bp = Blueprint('topics', __name__)
 
-def get_daily_topic_index():
-    """Calculate which topic is the daily topic based on date"""
-    today = date.today()
-    start_of_year = date(today.year, 1, 1)
-    day_of_year = (today - start_of_year).days + 1
-    
-    # Get total number of topics
-    total_topics = Topic.query.count()
-    if total_topics == 0:
-        return 0
-    
-    return (day_of_year - 1) % total_topics
+# Fields that can be requested with ?fields=a,b,c. The list only carries
+# card fields; single topics also have content and questions.
+SUMMARY_FIELDS = frozenset({
+    'id', 'title', 'description', 'imageUrl', 'category', 'difficulty',
+    'estimatedTime', 'createdAt', 'questionCount', 'isCompleted'
+})
+TOPIC_FIELDS = frozenset({
+    'id', 'title', 'description', 'content', 'imageUrl', 'category', 'difficulty',
+    'estimatedTime', 'createdAt', 'questions', 'hasCompleted'
+})
+
+def parse_fields(allowed):
+    """Sorted fields from ?fields=, or None for all; ValueError on unknown names"""
+    raw = request.args.get('fields')
+    if not raw:
+        return None
+    fields = {field.strip() for field in raw.split(',') if field.strip()}
+    unknown = fields - allowed
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return sorted(fields)
+
+def select_fields(payload, fields):
+    if fields is None:
+        return payload
+    return {field: payload[field] for field in fields if field in payload}
 
 @topics_bp.route('/', methods=['GET'])
 @jwt_required()
 def get_all_topics():
     try:
         user_id = get_jwt_identity()
-        topics = Topic.query.order_by(Topic.created_at).all()
+        try:
+            fields = parse_fields(SUMMARY_FIELDS)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # Card fields only: the catalog never loads content for the listing
+        catalog = get_catalog().snapshot()
         
-        # Get user's completed topics
-        completed_topic_ids = {
-            progress.topic_id 
-            for progress in UserProgress.query.filter_by(user_id=user_id).all()
-        }
+        # Get user's completed topics from the completion index
+        completed_ids = completed_topic_ids(user_id)
+        
+        # Answer revalidations before copying and serializing the catalog
+        etag = make_etag(catalog.etag, user_id, fields, *sorted(completed_ids))
+        cached = not_modified(etag)
+        if cached:
+            return cached
         
         topics_data = []
-        for topic in topics:
-            topic_dict = topic.to_dict(include_questions=False)
-            topic_dict['isCompleted'] = topic.id in completed_topic_ids
-            topics_data.append(topic_dict)
+        for summary in catalog.summaries:
+            topic_dict = dict(summary)
+            topic_dict['isCompleted'] = summary['id'] in completed_ids
+            topics_data.append(select_fields(topic_dict, fields))
         
-        return jsonify({'topics': topics_data}), 200
+        return with_etag(jsonify({'topics': topics_data}), etag), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -49,12 +78,28 @@ def get_all_topics():
 @jwt_required()
 def get_topic_by_id(topic_id):
     try:
-        topic = Topic.query.get(topic_id)
+        try:
+            fields = parse_fields(TOPIC_FIELDS)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        catalog = get_catalog().snapshot()
+        topic = catalog.get(topic_id)
         
         if not topic:
             return jsonify({'error': 'Topic not found'}), 404
         
-        return jsonify({'topic': topic.to_dict()}), 200
+        if fields is None:
+            # Same bytes for every user: serialized and compressed once per
+            # catalog version, then served as stored
+            return precompressed_response(catalog.topic_body(topic_id), catalog.topic_etag(topic_id))
+        
+        etag = make_etag(catalog.topic_etag(topic_id), fields)
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        
+        return with_etag(jsonify({'topic': select_fields(topic, fields)}), etag), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -64,31 +109,33 @@ def get_topic_by_id(topic_id):
 def get_daily_topic():
     try:
         user_id = get_jwt_identity()
+        try:
+            fields = parse_fields(TOPIC_FIELDS)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        # Get all topics ordered by creation date
-        topics = Topic.query.order_by(Topic.created_at).all()
+        catalog = get_catalog().snapshot()
         
-        if not topics:
-            return jsonify({'error': 'No topics available'}), 404
+        # Resolve today's topic from the precomputed schedule
+        daily_topic_id = get_daily_topic_id()
+        daily_topic = catalog.get(daily_topic_id)
         
-        # Calculate daily topic index
-        index = get_daily_topic_index()
-        daily_topic = topics[index]
+        if not daily_topic:
+            return jsonify({'error': 'No topics available'}), 404
         
         # Check if user has completed today's daily topic
         today = date.today()
-        has_completed = UserProgress.query.filter_by(
-            user_id=user_id,
-            topic_id=daily_topic.id,
-            is_daily=True
-        ).filter(
-            db.func.date(UserProgress.completed_at) == today
-        ).first() is not None
-        
-        topic_dict = daily_topic.to_dict()
+        has_completed = has_completed_daily(user_id, today)
+        
+        etag = make_etag(catalog.topic_etag(daily_topic_id), user_id, has_completed, fields)
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        
+        topic_dict = dict(daily_topic)
         topic_dict['hasCompleted'] = has_completed
         
-        return jsonify({'topic': topic_dict}), 200
+        return with_etag(jsonify({'topic': select_fields(topic_dict, fields)}), etag), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -99,10 +146,7 @@ def check_topic_completed(topic_id):
     try:
         user_id = get_jwt_identity()
         
-        completed = UserProgress.query.filter_by(
-            user_id=user_id,
-            topic_id=topic_id
-        ).first() is not None
+        completed = has_completed(user_id, topic_id)
         
         return jsonify({'completed': completed}), 200
         
@@ -1,30 +1,104 @@
-from flask import Blueprint, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
+from flask_jwt_extended import get_current_user, jwt_required, get_jwt_identity
+from datetime import date, datetime, timedelta
+import base64
 try:
-    from backend.models import User, UserProgress, db
+    from backend.activity import activity_calendar, calendar_range
+    from backend.leaderboard import METRICS, get_leaderboard
+    from backend.models import UserProgress, db
+    from backend.serializers import RowSerializer, isoformat
+    from backend.topic_stats import accuracy, question_totals, user_topic_stats
 except ModuleNotFoundError:
-    from models import User, UserProgress, db
+    from activity import activity_calendar, calendar_range
+    from leaderboard import METRICS, get_leaderboard
+    from models import UserProgress, db
+    from serializers import RowSerializer, isoformat
+    from topic_stats import accuracy, question_totals, user_topic_stats
 
 users_bp = Blueprint('users', __name__)
 
+DEFAULT_PROGRESS_LIMIT = 100
+MAX_PROGRESS_LIMIT = 1000
+STREAM_BATCH_SIZE = 500
+DEFAULT_LEADERBOARD_LIMIT = 10
+MAX_LEADERBOARD_LIMIT = 100
+DEFAULT_LEADERBOARD_NEIGHBORS = 2
+MAX_LEADERBOARD_NEIGHBORS = 10
+
+# UserProgress.to_dict() built straight from selected rows
+PROGRESS_ROW = RowSerializer([
+    ('id', UserProgress.id, None),
+    ('userId', UserProgress.user_id, None),
+    ('topicId', UserProgress.topic_id, None),
+    ('completedAt', UserProgress.completed_at, isoformat),
+    ('isDaily', UserProgress.is_daily, None),
+    ('correctCount', UserProgress.correct_count, None),
+    ('totalQuestions', UserProgress.total_questions, None),
+])
+
+def encode_cursor(completed_at, progress_id):
+    raw = f'{completed_at.isoformat()}|{progress_id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor):
+    """Return (completed_at, id) from a cursor, raising ValueError if malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        completed_at, progress_id = raw.split('|')
+        return datetime.fromisoformat(completed_at), int(progress_id)
+    except (UnicodeError, ValueError, TypeError) as e:
+        raise ValueError('Invalid cursor') from e
+
+def build_progress_query(user_id, args):
+    """Newest-first history query for the user with the request's filters applied"""
+    query = (
+        db.select(*PROGRESS_ROW.columns)
+        .where(UserProgress.user_id == user_id)
+        .order_by(UserProgress.completed_at.desc(), UserProgress.id.desc())
+    )
+    
+    cursor = args.get('cursor')
+    if cursor:
+        completed_at, progress_id = decode_cursor(cursor)
+        query = query.where(
+            db.tuple_(UserProgress.completed_at, UserProgress.id) < (completed_at, progress_id)
+        )
+    
+    # Date range is inclusive on both ends
+    try:
+        start = date.fromisoformat(args['from']) if args.get('from') else None
+        end = date.fromisoformat(args['to']) + timedelta(days=1) if args.get('to') else None
+    except ValueError:
+        raise ValueError('from and to must be YYYY-MM-DD') from None
+    if start:
+        query = query.where(UserProgress.completed_at >= datetime.combine(start, datetime.min.time()))
+    if end:
+        query = query.where(UserProgress.completed_at < datetime.combine(end, datetime.min.time()))
+    
+    is_daily = args.get('isDaily')
+    if is_daily is not None:
+        if is_daily not in ('true', 'false'):
+            raise ValueError('isDaily must be true or false')
+        query = query.where(UserProgress.is_daily == (is_daily == 'true'))
+    
+    return query
+
+def wants_ndjson():
+    if request.args.get('format') == 'ndjson':
+        return True
+    return request.accept_mimetypes.best == 'application/x-ndjson'
+
 @users_bp.route('/profile', methods=['GET'])
 @jwt_required()
 def get_profile():
     try:
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
+        # The cached payload is shared, so copy before adding fields
+        profile_data = dict(get_current_user())
         
-        # Calculate accuracy
-        total_questions_answered = user.total_quizzes * 5  # Assuming 5 questions per quiz average
-        accuracy = 0
-        if total_questions_answered > 0:
-            accuracy = round((user.correct_answers / total_questions_answered) * 100)
-        
-        profile_data = user.to_dict()
-        profile_data['accuracy'] = accuracy
+        # Accuracy over every question answered, from the per-topic statistics
+        questions, correct = question_totals(profile_data['id'])
+        profile_data['questionsAnswered'] = questions
+        profile_data['accuracy'] = accuracy(correct, questions)
         
         return jsonify({'user': profile_data}), 200
         
@@ -37,14 +111,104 @@ def get_progress():
     try:
         user_id = get_jwt_identity()
         
-        # Get all progress records
-        progress_records = UserProgress.query.filter_by(user_id=user_id).all()
+        try:
+            query = build_progress_query(user_id, request.args)
+            limit = request.args.get('limit', type=int)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        if limit is not None and not 1 <= limit <= MAX_PROGRESS_LIMIT:
+            return jsonify({'error': f'limit must be between 1 and {MAX_PROGRESS_LIMIT}'}), 400
+        
+        if wants_ndjson():
+            # Stream rows from a server-side cursor in constant memory
+            if limit is not None:
+                query = query.limit(limit)
+
+            def generate():
+                dumps = current_app.json.dumps
+                rows = db.session.execute(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+                for row in rows:
+                    yield dumps(PROGRESS_ROW(row)) + '\n'
+            
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+        
+        # Fetch one extra row to know whether another page exists
+        limit = limit or DEFAULT_PROGRESS_LIMIT
+        rows = db.session.execute(query.limit(limit + 1)).all()
         
-        progress_data = [progress.to_dict() for progress in progress_records]
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].completed_at, rows[-1].id)
         
-        return jsonify({'progress': progress_data}), 200
+        progress_data = [PROGRESS_ROW(row) for row in rows]
+        
+        return jsonify({'progress': progress_data, 'nextCursor': next_cursor}), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@users_bp.route('/leaderboard', methods=['GET'])
+@jwt_required()
+def get_leaderboard_route():
+    try:
+        leaderboard = get_leaderboard()
+        if leaderboard is None:
+            return jsonify({'error': 'Leaderboard is disabled'}), 404
+        
+        metrics = request.args.get('metric', ','.join(METRICS)).split(',')
+        limit = request.args.get('limit', DEFAULT_LEADERBOARD_LIMIT, type=int)
+        neighbors = request.args.get('neighbors', DEFAULT_LEADERBOARD_NEIGHBORS, type=int)
+        unknown = [metric for metric in metrics if metric not in METRICS]
+        if unknown:
+            return jsonify({'error': f"metric must be one of: {', '.join(METRICS)}"}), 400
+        if not 1 <= limit <= MAX_LEADERBOARD_LIMIT:
+            return jsonify({'error': f'limit must be between 1 and {MAX_LEADERBOARD_LIMIT}'}), 400
+        if not 0 <= neighbors <= MAX_LEADERBOARD_NEIGHBORS:
+            return jsonify({'error': f'neighbors must be between 0 and {MAX_LEADERBOARD_NEIGHBORS}'}), 400
+        
+        leaderboard.sync_if_due()
+        # A user created by another process since the last sync ranks from
+        # their (possibly cached) row rather than not at all
+        user = get_current_user()
+        leaderboard.add_missing(
+            (user['id'], user['username'], *(user[metric] for metric in METRICS))
+        )
+        
+        boards = {}
+        for metric in metrics:
+            me, around = leaderboard.around(metric, user['id'], neighbors)
+            boards[metric] = {
+                'top': leaderboard.top(metric, limit),
+                'me': me,
+                'neighbors': around
+            }
+        
+        return jsonify({'leaderboards': boards, 'totalUsers': len(leaderboard)}), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@users_bp.route('/activity', methods=['GET'])
+@jwt_required()
+def get_activity():
+    try:
+        try:
+            start, end = calendar_range(request.args, date.today())
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return jsonify({'activity': activity_calendar(get_jwt_identity(), start, end)}), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
+@users_bp.route('/stats', methods=['GET'])
+@jwt_required()
+def get_stats():
+    try:
+        return jsonify(user_topic_stats(get_jwt_identity())), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
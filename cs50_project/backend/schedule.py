@@ -0,0 +1,84 @@
+"""
+Daily topic schedule.
+
+The topic for each calendar day is materialized into the daily_schedule
+table ahead of time, so resolving today's topic is a single primary key
+lookup instead of loading and indexing the whole topic list. Both the
+topics and the quizzes blueprints resolve the daily topic through
+get_daily_topic_id(), so they always agree.
+"""
+from datetime import date, timedelta
+from sqlalchemy import delete, event
+from sqlalchemy.orm import Session
+try:
+    from backend.models import DailySchedule, Topic, db
+    from backend.dbutils import insert_ignore
+    from backend.database import use_primary
+except ModuleNotFoundError:
+    from models import DailySchedule, Topic, db
+    from dbutils import insert_ignore
+    from database import use_primary
+
+# How many days are materialized each time the schedule runs out
+SCHEDULE_HORIZON_DAYS = 60
+
+
+def topic_index_for_day(day, total_topics):
+    """Index into the created_at-ordered topic list for the given day"""
+    day_of_year = day.timetuple().tm_yday
+    return (day_of_year - 1) % total_topics
+
+
+def get_daily_topic_id(day=None):
+    """Return the id of the daily topic for `day` (default today), or None"""
+    day = day or date.today()
+    entry = db.session.get(DailySchedule, day)
+    if entry is None:
+        materialize_schedule(day)
+        # Just committed on the primary; a replica may not have it yet
+        with use_primary():
+            entry = db.session.get(DailySchedule, day)
+    return entry.topic_id if entry else None
+
+
+def materialize_schedule(start, days=SCHEDULE_HORIZON_DAYS):
+    """Write schedule rows for `days` days starting at `start`.
+
+    Rows that already exist are left alone, so concurrent workers can
+    materialize the same range without conflicting.
+    """
+    topic_ids = db.session.execute(
+        db.select(Topic.id).order_by(Topic.created_at, Topic.id)
+    ).scalars().all()
+    if not topic_ids:
+        return 0
+
+    rows = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        index = topic_index_for_day(day, len(topic_ids))
+        rows.append({'day': day, 'topic_id': topic_ids[index]})
+
+    with db.engine.begin() as conn:
+        stmt = insert_ignore(DailySchedule.__table__, conn.dialect.name)
+        conn.execute(stmt, rows)
+    return len(rows)
+
+
+def purge_upcoming_schedule(connection):
+    """Delete schedule rows from today on; they are rebuilt on the next lookup"""
+    connection.execute(delete(DailySchedule).where(DailySchedule.day >= date.today()))
+
+
+@event.listens_for(Session, 'after_flush')
+def _purge_future_schedule(session, flush_context):
+    """Drop upcoming schedule rows when the set or order of topics changes"""
+    changed = any(isinstance(obj, Topic) for obj in (*session.new, *session.deleted))
+    if not changed:
+        changed = any(
+            isinstance(obj, Topic) and db.inspect(obj).attrs.created_at.history.has_changes()
+            for obj in session.dirty
+        )
+    if changed:
+        purge_upcoming_schedule(session.connection())
+
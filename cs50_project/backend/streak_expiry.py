@@ -0,0 +1,140 @@
+"""
+Nightly job that expires broken daily streaks.
+
+A daily streak only moves when its user submits, so users who stopped
+playing keep their old streak in the users table, and on profiles and
+the leaderboard, until they come back. This job resets every streak
+whose last daily completion is older than yesterday.
+
+The users table is walked in primary-key chunks of --chunk-size rows.
+Each chunk is one set-based UPDATE, committed together with a checkpoint
+row in job_checkpoints, so:
+
+- the job is idempotent: the UPDATE only matches broken streaks, so a
+  second run touches nothing
+- an interrupted run resumes after the last committed chunk when it is
+  started again for the same day
+- a user who submits while the job runs is never reset, because the
+  condition is checked on the row's current values
+
+The UPDATE also bumps updated_at, so running servers pick the new values
+up through their leaderboard sync and identity cache TTL.
+
+Schedule it shortly after midnight, e.g. from cron:
+    5 0 * * * cd /srv/system-spark && python -m backend.streak_expiry
+"""
+import argparse
+import json
+import time
+from datetime import date, datetime, timedelta
+from flask import current_app
+from sqlalchemy import or_, select, update
+try:
+    from backend.app import create_app
+    from backend.models import db, JobCheckpoint, User
+except ModuleNotFoundError:
+    from app import create_app
+    from models import db, JobCheckpoint, User
+
+JOB_NAME = 'expire_daily_streaks'
+DEFAULT_CHUNK_SIZE = 10_000
+
+users = User.__table__
+
+
+def expire_daily_streaks(day=None, chunk_size=DEFAULT_CHUNK_SIZE, restart=False, log=print):
+    """Reset daily streaks broken before `day` (default today) and return a report.
+
+    Continues an unfinished run for the same day unless `restart` is set;
+    a finished run for the day is not repeated.
+    """
+    day = day or date.today()
+    started = time.perf_counter()
+    checkpoint = db.session.get(JobCheckpoint, JOB_NAME)
+    report = {'day': day.isoformat(), 'expired': 0, 'chunks': 0, 'resumed': False, 'already_finished': False}
+
+    if checkpoint is None:
+        checkpoint = JobCheckpoint(name=JOB_NAME)
+        db.session.add(checkpoint)
+    if restart or checkpoint.run_day != day:
+        checkpoint.run_day = day
+        checkpoint.cursor = ''
+        checkpoint.rows_touched = 0
+        checkpoint.started_at = datetime.utcnow()
+        checkpoint.finished_at = None
+        db.session.commit()
+    elif checkpoint.finished_at is not None:
+        report.update(already_finished=True, total_expired=checkpoint.rows_touched, seconds=0.0)
+        log(f'Streak expiry for {day} already finished ({checkpoint.rows_touched} streaks expired)')
+        return report
+    else:
+        report['resumed'] = True
+        log(f'Resuming streak expiry for {day} after user {checkpoint.cursor!r}')
+
+    broken = or_(users.c.last_daily_completion.is_(None), users.c.last_daily_completion < day - timedelta(days=1))
+    cursor = checkpoint.cursor
+    while True:
+        # Last id of this chunk, None when fewer than chunk_size users remain
+        upper = db.session.scalar(
+            select(users.c.id).where(users.c.id > cursor).order_by(users.c.id).offset(chunk_size - 1).limit(1)
+        )
+        stmt = (
+            update(users)
+            .where(users.c.id > cursor)
+            .where(users.c.daily_streak != 0)
+            .where(broken)
+            .values(daily_streak=0, updated_at=datetime.utcnow())
+        )
+        if upper is not None:
+            stmt = stmt.where(users.c.id <= upper)
+        expired = db.session.execute(stmt).rowcount
+
+        checkpoint.cursor = upper
+        checkpoint.rows_touched += expired
+        if upper is None:
+            checkpoint.finished_at = datetime.utcnow()
+        db.session.commit()
+
+        report['expired'] += expired
+        report['chunks'] += 1
+        if upper is None:
+            break
+        cursor = upper
+        if report['chunks'] % 10 == 0:
+            log(f"{report['chunks']} chunks, {report['expired']} streaks expired")
+
+    if report['expired']:
+        # This process's cached users are stale now; other processes catch
+        # up within their identity cache TTL
+        cache = current_app.extensions.get('identity_cache')
+        if cache is not None:
+            cache.clear()
+
+    report['total_expired'] = checkpoint.rows_touched
+    report['seconds'] = round(time.perf_counter() - started, 2)
+    log(f"Expired {report['expired']} daily streaks in {report['chunks']} chunks ({report['seconds']}s)")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--day', type=date.fromisoformat, help='run as of this day, YYYY-MM-DD (default today)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='users per UPDATE')
+    parser.add_argument('--restart', action='store_true', help="start over instead of resuming today's run")
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    args = parser.parse_args()
+
+    # The leaderboard would load every user for nothing, and the running
+    # server holds the write-behind journal
+    app = create_app({'LEADERBOARD_ENABLED': False, 'PROGRESS_WRITE_BEHIND': False})
+    with app.app_context():
+        report = expire_daily_streaks(
+            day=args.day, chunk_size=args.chunk_size, restart=args.restart,
+            log=(lambda message: None) if args.json else print
+        )
+    if args.json:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+"""
+Quiz submission write path.
+
+Each submission is applied with a fixed number of statements inside the
+caller's transaction: the UserProgress insert, one UPDATE on the user row,
+the activity calendar, topic statistics and review schedule upserts and
+the completion index insert (plus a counter bump on a first completion).
+Streaks and counters are computed by the database from the row's current
+values rather than read into Python first, so concurrent submits from
+double-clicks or parallel tabs cannot lose updates. A rejected
+submission writes nothing, so several can share one transaction.
+Callers commit; the user's identity cache entry is dropped and their
+leaderboard position updated on commit.
+"""
+from datetime import date, datetime, timedelta
+from sqlalchemy import and_, case, exists, literal, or_, select, update
+try:
+    from backend.models import SubmissionReceipt, User, UserProgress, db
+    from backend.activity import record_activity
+    from backend.completions import record_completion
+    from backend.dbutils import insert_ignore
+    from backend.identity import mark_user_changed
+    from backend.leaderboard import mark_leaderboard_changed
+    from backend.reviews import record_review
+    from backend.topic_stats import record_topic_stats
+except ModuleNotFoundError:
+    from models import SubmissionReceipt, User, UserProgress, db
+    from activity import record_activity
+    from completions import record_completion
+    from dbutils import insert_ignore
+    from identity import mark_user_changed
+    from leaderboard import mark_leaderboard_changed
+    from reviews import record_review
+    from topic_stats import record_topic_stats
+
+users = User.__table__
+
+
+def apply_daily_submission(user_id, topic_id, correct_count, total_questions, day=None, completed_at=None):
+    """Record a daily quiz for `day` (default today).
+
+    The unique daily index on user_progress makes this apply at most once
+    per user per day. Returns False, without writing anything, if the user
+    does not exist or already completed a daily quiz that day.
+
+    The streak only moves forward: a back-dated attempt older than the
+    user's last daily completion is recorded and counted but leaves the
+    streak alone.
+    """
+    day = day or date.today()
+    completed_at = completed_at or datetime.utcnow()
+    if not _insert_progress(user_id, topic_id, True, correct_count, total_questions, day, completed_at):
+        return False
+
+    advances = or_(users.c.last_daily_completion.is_(None), users.c.last_daily_completion < day)
+    new_streak = case(
+        (users.c.last_daily_completion == day - timedelta(days=1), users.c.daily_streak + 1),
+        else_=1
+    )
+    db.session.execute(
+        update(users)
+        .where(users.c.id == user_id)
+        .values(
+            daily_streak=case((advances, new_streak), else_=users.c.daily_streak),
+            best_daily_streak=case(
+                (and_(advances, new_streak > users.c.best_daily_streak), new_streak),
+                else_=users.c.best_daily_streak
+            ),
+            last_daily_completion=case((advances, day), else_=users.c.last_daily_completion),
+            total_quizzes=users.c.total_quizzes + 1,
+            correct_answers=users.c.correct_answers + correct_count,
+            updated_at=datetime.utcnow()
+        )
+    )
+    record_activity(user_id, day, True)
+    record_topic_stats(user_id, topic_id, correct_count, total_questions, completed_at)
+    record_review(user_id, topic_id, correct_count, total_questions, day, completed_at)
+    _record_completion(user_id, topic_id, completed_at)
+    mark_user_changed(user_id)
+    mark_leaderboard_changed(user_id)
+    return True
+
+
+def apply_practice_submission(user_id, topic_id, correct_count, total_questions, day=None, completed_at=None):
+    """Record a practice quiz. Returns False if the user does not exist."""
+    day = day or date.today()
+    completed_at = completed_at or datetime.utcnow()
+    new_streak = users.c.practice_streak + 1
+    result = db.session.execute(
+        update(users)
+        .where(users.c.id == user_id)
+        .values(
+            practice_streak=new_streak,
+            best_practice_streak=case(
+                (new_streak > users.c.best_practice_streak, new_streak),
+                else_=users.c.best_practice_streak
+            ),
+            last_practice_completion=case(
+                (or_(users.c.last_practice_completion.is_(None), users.c.last_practice_completion < day), day),
+                else_=users.c.last_practice_completion
+            ),
+            total_quizzes=users.c.total_quizzes + 1,
+            correct_answers=users.c.correct_answers + correct_count,
+            updated_at=datetime.utcnow()
+        )
+    )
+    if result.rowcount != 1:
+        return False
+
+    _insert_progress(user_id, topic_id, False, correct_count, total_questions, day, completed_at)
+    record_activity(user_id, day, False)
+    record_topic_stats(user_id, topic_id, correct_count, total_questions, completed_at)
+    record_review(user_id, topic_id, correct_count, total_questions, day, completed_at)
+    _record_completion(user_id, topic_id, completed_at)
+    mark_user_changed(user_id)
+    mark_leaderboard_changed(user_id)
+    return True
+
+
+def next_daily_streak(streak, last_completion, day):
+    """Python mirror of the streak rule applied by apply_daily_submission()"""
+    if last_completion is not None and last_completion >= day:
+        return streak
+    if last_completion == day - timedelta(days=1):
+        return streak + 1
+    return 1
+
+
+def claim_receipt(user_id, idempotency_key):
+    """Record that a client submission key has been seen.
+
+    Returns False if the key was already claimed, meaning the submission
+    is a replay and must not be applied again.
+    """
+    stmt = insert_ignore(SubmissionReceipt.__table__, db.session.get_bind().dialect.name).values(
+        user_id=user_id,
+        idempotency_key=idempotency_key,
+        created_at=datetime.utcnow()
+    )
+    return db.session.execute(stmt).rowcount == 1
+
+
+def _record_completion(user_id, topic_id, completed_at):
+    # topics_completed only moves on the first completion of a topic
+    if record_completion(user_id, topic_id, completed_at):
+        db.session.execute(
+            update(users)
+            .where(users.c.id == user_id)
+            .values(topics_completed=users.c.topics_completed + 1)
+        )
+
+
+def _insert_progress(user_id, topic_id, is_daily, correct_count, total_questions, day, completed_at):
+    """Insert a UserProgress row if the user exists.
+
+    Returns False when the user is missing or the unique daily index
+    rejects the row.
+    """
+    progress = UserProgress.__table__
+    row = select(
+        literal(user_id),
+        literal(topic_id),
+        literal(is_daily),
+        literal(correct_count),
+        literal(total_questions),
+        literal(completed_at),
+        literal(day)
+    ).where(exists().where(users.c.id == user_id))
+
+    stmt = insert_ignore(progress, db.session.get_bind().dialect.name).from_select(
+        ['user_id', 'topic_id', 'is_daily', 'correct_count', 'total_questions', 'completed_at', 'completion_day'],
+        row
+    )
+    return db.session.execute(stmt).rowcount == 1
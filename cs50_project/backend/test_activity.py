@@ -0,0 +1,65 @@
+"""
+Tests for the per-user activity calendar and GET /api/users/activity.
+"""
+from datetime import date, datetime, timedelta
+try:
+    from backend.activity import DEFAULT_CALENDAR_DAYS, activity_calendar
+    from backend.migrations import backfill_activity_days
+    from backend.models import db, UserActivityDay, UserProgress
+except ModuleNotFoundError:
+    from activity import DEFAULT_CALENDAR_DAYS, activity_calendar
+    from migrations import backfill_activity_days
+    from models import db, UserActivityDay, UserProgress
+
+
+def test_submits_fill_the_calendar(client, auth_headers):
+    client.post('/api/quizzes/daily/submit', headers=auth_headers, json={'correctCount': 1, 'totalQuestions': 1})
+    for topic_id in ('1', '2'):
+        client.post('/api/quizzes/practice/submit', headers=auth_headers,
+                    json={'topicId': topic_id, 'correctCount': 1, 'totalQuestions': 1})
+
+    response = client.get('/api/users/activity', headers=auth_headers)
+    assert response.status_code == 200
+    activity = response.get_json()['activity']
+    today = date.today()
+    assert activity['to'] == today.isoformat()
+    assert activity['from'] == (today - timedelta(days=DEFAULT_CALENDAR_DAYS - 1)).isoformat()
+    assert len(activity['quizzes']) == len(activity['daily']) == DEFAULT_CALENDAR_DAYS
+    assert activity['quizzes'][-1] == 3 and activity['daily'][-1] == 1
+    assert sum(activity['quizzes']) == 3 and activity['activeDays'] == 1
+
+
+def test_calendar_range_is_dense_and_inclusive(app):
+    start = date(2024, 3, 1)
+    with app.app_context():
+        db.session.add_all([
+            UserActivityDay(user_id='user-1', day=date(2024, 2, 29), quizzes=9, daily_quizzes=1),
+            UserActivityDay(user_id='user-1', day=date(2024, 3, 1), quizzes=2, daily_quizzes=1),
+            UserActivityDay(user_id='user-1', day=date(2024, 3, 4), quizzes=1, daily_quizzes=0),
+        ])
+        db.session.commit()
+        calendar = activity_calendar('user-1', start, date(2024, 3, 4))
+    assert calendar['quizzes'] == [2, 0, 0, 1] and calendar['daily'] == [1, 0, 0, 0]
+    assert calendar['activeDays'] == 2
+
+
+def test_invalid_ranges_are_rejected(client, auth_headers):
+    for query, message in [('from=2024-13-01', 'from must be a date'),
+                           ('from=2024-03-02&to=2024-03-01', 'from must not be after to'),
+                           ('from=2020-01-01&to=2024-01-01', 'at most 731 days')]:
+        response = client.get(f'/api/users/activity?{query}', headers=auth_headers)
+        assert response.status_code == 400 and message in response.get_json()['error']
+
+
+def test_backfill_from_existing_history(app):
+    day = date(2024, 5, 1)
+    with app.app_context():
+        for is_daily in (True, False, False):
+            db.session.add(UserProgress(user_id='user-1', topic_id='1', is_daily=is_daily, correct_count=1,
+                                        total_questions=1, completed_at=datetime(2024, 5, 1, 9),
+                                        completion_day=day))
+        db.session.commit()
+        backfill_activity_days()
+        db.session.commit()
+        row = db.session.get(UserActivityDay, ('user-1', day))
+        assert (row.quizzes, row.daily_quizzes) == (3, 1)
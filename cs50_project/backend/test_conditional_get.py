@@ -0,0 +1,81 @@
+"""
+Tests for ETag / If-None-Match handling and precompressed bodies on the
+topics API.
+"""
+import gzip
+from flask_jwt_extended import create_access_token
+try:
+    from backend.models import db, Topic, User
+except ModuleNotFoundError:
+    from models import db, Topic, User
+
+
+def revalidate(client, url, headers):
+    first = client.get(url, headers=headers)
+    assert first.status_code == 200
+    assert first.headers['Cache-Control'] == 'private, no-cache'
+    etag = first.headers['ETag']
+    second = client.get(url, headers={**headers, 'If-None-Match': etag})
+    return etag, second
+
+
+def test_unchanged_resources_return_304(client, auth_headers):
+    for url in ('/api/topics/', '/api/topics/2', '/api/topics/daily'):
+        etag, response = revalidate(client, url, auth_headers)
+        assert response.status_code == 304, url
+        assert response.data == b''
+        assert response.headers['ETag'] == etag
+
+
+def test_completion_and_content_changes_change_the_etag(app, client, auth_headers):
+    list_etag, _ = revalidate(client, '/api/topics/', auth_headers)
+    daily_etag, _ = revalidate(client, '/api/topics/daily', auth_headers)
+    topic_etag, _ = revalidate(client, '/api/topics/2', auth_headers)
+
+    client.post('/api/quizzes/daily/submit', json={'correctCount': 1, 'totalQuestions': 1}, headers=auth_headers)
+
+    response = client.get('/api/topics/', headers={**auth_headers, 'If-None-Match': list_etag})
+    assert response.status_code == 200
+    assert any(topic['isCompleted'] for topic in response.get_json()['topics'])
+    response = client.get('/api/topics/daily', headers={**auth_headers, 'If-None-Match': daily_etag})
+    assert response.status_code == 200
+    assert response.get_json()['topic']['hasCompleted'] is True
+
+    with app.app_context():
+        db.session.get(Topic, '2').content = '# Rewritten'
+        db.session.commit()
+    response = client.get('/api/topics/2', headers={**auth_headers, 'If-None-Match': topic_etag})
+    assert response.status_code == 200
+    assert response.get_json()['topic']['content'] == '# Rewritten'
+
+
+def test_etags_are_per_user(app, client, auth_headers):
+    with app.app_context():
+        other = User(id='user-2', email='other@example.com', username='Other')
+        other.set_password('other123')
+        db.session.add(other)
+        db.session.commit()
+        other_headers = {'Authorization': f"Bearer {create_access_token(identity='user-2')}"}
+
+    etag, _ = revalidate(client, '/api/topics/', auth_headers)
+    response = client.get('/api/topics/', headers={**other_headers, 'If-None-Match': etag})
+    assert response.status_code == 200
+
+
+def test_topic_bodies_are_served_precompressed(client, auth_headers):
+    plain = client.get('/api/topics/2', headers=auth_headers)
+    assert 'Content-Encoding' not in plain.headers
+
+    response = client.get('/api/topics/2', headers={**auth_headers, 'Accept-Encoding': 'gzip, deflate'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert gzip.decompress(response.data) == plain.data
+    assert response.headers['ETag'] != plain.headers['ETag']
+
+    again = client.get('/api/topics/2', headers={
+        **auth_headers, 'Accept-Encoding': 'gzip', 'If-None-Match': response.headers['ETag']
+    })
+    assert again.status_code == 304
+
+    refused = client.get('/api/topics/2', headers={**auth_headers, 'Accept-Encoding': 'gzip;q=0'})
+    assert refused.data == plain.data
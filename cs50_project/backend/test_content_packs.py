@@ -0,0 +1,132 @@
+"""
+Tests for content pack loading and the shared catalog version.
+"""
+import copy
+import json
+import pytest
+from sqlalchemy import update
+try:
+    from backend.catalog import TopicCatalog, read_catalog_version
+    from backend.content_packs import DEFAULT_PACK_DIR, ContentPackError, apply_packs, yaml
+    from backend.models import db, CatalogVersion, Question, Topic, UserProgress
+except ModuleNotFoundError:
+    from catalog import TopicCatalog, read_catalog_version
+    from content_packs import DEFAULT_PACK_DIR, ContentPackError, apply_packs, yaml
+    from models import db, CatalogVersion, Question, Topic, UserProgress
+
+
+def topic(topic_id, questions=1, **fields):
+    return {
+        'id': topic_id, 'title': f'Topic {topic_id}', 'description': 'About it', 'content': f'# Topic {topic_id}',
+        'imageUrl': None, 'category': 'Scalability', 'difficulty': 'Beginner', 'estimatedTime': 10,
+        'createdAt': f'2024-01-0{topic_id}',
+        'questions': [
+            {'id': f'q{topic_id}-{j}', 'question': 'Which?', 'options': ['A', 'B'], 'correctIndex': 0,
+             'explanation': 'A.'}
+            for j in range(1, questions + 1)
+        ],
+        **fields,
+    }
+
+
+def write_pack(path, topics):
+    path.write_text(json.dumps({'pack': 'test', 'topics': topics}))
+    return str(path)
+
+
+def test_core_pack_applies_once(app, query_budget):
+    with app.app_context():
+        # The fixture's topics 1-3 share ids with the core pack but have no hash yet
+        report = apply_packs([DEFAULT_PACK_DIR])
+        assert report.topics == {'added': ['4', '5'], 'updated': ['1', '2', '3'], 'deleted': []}
+        assert Topic.query.count() == 5 and Question.query.count() == 16
+        assert report.catalog_version == read_catalog_version() == 2
+
+        # Unchanged packs only read the stored hashes
+        with query_budget(2):
+            report = apply_packs([DEFAULT_PACK_DIR])
+        assert not report.changed
+        assert read_catalog_version() == 2
+
+
+def test_only_changes_are_written(app, client, auth_headers, tmp_path):
+    topics = [topic('1', questions=2), topic('2'), topic('3')]
+    path = write_pack(tmp_path / 'pack.json', topics)
+    with app.app_context():
+        apply_packs([path])
+        assert len(client.get('/api/topics/', headers=auth_headers).get_json()['topics']) == 3
+
+        edited = copy.deepcopy(topics)
+        edited[0]['questions'][0]['question'] = 'Which one?'
+        del edited[0]['questions'][1]
+        edited[1]['title'] = 'Renamed'
+        edited.append(topic('4'))
+        report = apply_packs([write_pack(tmp_path / 'pack.json', edited)])
+
+    assert report.topics == {'added': ['4'], 'updated': ['2'], 'deleted': []}
+    assert report.questions == {'added': ['q4-1'], 'updated': ['q1-1'], 'deleted': ['q1-2']}
+    # The commit dropped this process's cached catalog
+    listed = client.get('/api/topics/', headers=auth_headers).get_json()['topics']
+    assert [item['title'] for item in listed] == ['Topic 1', 'Renamed', 'Topic 3', 'Topic 4']
+
+
+def test_dry_run_and_prune(app, tmp_path):
+    path = write_pack(tmp_path / 'pack.json', [topic('1'), topic('2')])
+    with app.app_context():
+        apply_packs([path])
+        report = apply_packs([path], prune=True, dry_run=True)
+        assert report.topics['deleted'] == ['3'] and report.questions['deleted'] == ['q3-1']
+        assert db.session.get(Topic, '3') is not None
+
+        apply_packs([path], prune=True)
+        assert db.session.get(Topic, '3') is None and db.session.get(Question, 'q3-1') is None
+
+
+def test_prune_refuses_topics_with_history(app, tmp_path):
+    with app.app_context():
+        db.session.add(UserProgress(user_id='user-1', topic_id='3', correct_count=1, total_questions=1))
+        db.session.commit()
+        version = read_catalog_version()
+        with pytest.raises(ContentPackError, match='quiz history: 3'):
+            apply_packs([write_pack(tmp_path / 'pack.json', [topic('1'), topic('2', title='New')])], prune=True)
+        assert db.session.get(Topic, '2').title == 'Topic 2'
+        assert read_catalog_version() == version
+
+
+@pytest.mark.parametrize('topics, message', [
+    ([topic('1', difficulty='Expert')], 'difficulty must be one of'),
+    ([topic('1', estimatedTime='10')], '"estimatedTime" is required and must be an integer'),
+    ([topic('1', createdAt='soon')], 'createdAt must be an ISO date'),
+    ([topic('1'), topic('1')], 'topic 1 is already defined'),
+])
+def test_invalid_packs_are_rejected(app, tmp_path, topics, message):
+    with app.app_context():
+        with pytest.raises(ContentPackError, match=message):
+            apply_packs([write_pack(tmp_path / 'pack.json', topics)])
+
+
+@pytest.mark.skipif(yaml is None, reason='PyYAML not installed')
+def test_yaml_packs(app, tmp_path):
+    path = tmp_path / 'pack.yaml'
+    path.write_text(yaml.safe_dump({'topics': [topic('1'), topic('6', createdAt='2024-02-01')]}))
+    with app.app_context():
+        report = apply_packs([str(path)])
+    assert report.topics['added'] == ['6']
+
+
+def test_catalog_reloads_after_writes_from_other_processes(app):
+    now = [0.0]
+    catalog = TopicCatalog(check_interval=5, clock=lambda: now[0])
+    with app.app_context():
+        first = catalog.snapshot()
+        # Another process renamed a topic and bumped the version directly
+        with db.engine.begin() as conn:
+            conn.execute(update(Topic).where(Topic.id == '1').values(title='Elsewhere'))
+            conn.execute(update(CatalogVersion).values(version=7))
+
+        now[0] = 4.0
+        assert catalog.snapshot() is first
+        now[0] = 5.0
+        second = catalog.snapshot()
+        assert second is not first and second.content_version == 7
+        assert second.summaries[0]['title'] == 'Elsewhere'
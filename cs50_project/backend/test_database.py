@@ -0,0 +1,71 @@
+"""
+Tests for engine configuration and read-replica routing.
+"""
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import select, text, update
+try:
+    from backend.app import create_app
+    from backend.database import REPLICA_BIND, use_primary
+    from backend.dbutils import QueryCounter
+    from backend.models import db, Topic, User
+except ModuleNotFoundError:
+    from app import create_app
+    from database import REPLICA_BIND, use_primary
+    from dbutils import QueryCounter
+    from models import db, Topic, User
+
+
+@pytest.fixture
+def replica_app(app, database_url):
+    # The "replica" is a second engine on the same file, so routing can be
+    # observed per engine without running a second database
+    replica_app = create_app({'TESTING': True, 'DATABASE_READ_URL': database_url})
+    yield replica_app
+    with replica_app.app_context():
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+def test_sqlite_connections_use_wal_and_pool_settings(app):
+    with app.app_context():
+        assert db.session.execute(text('PRAGMA journal_mode')).scalar() == 'wal'
+        assert db.session.execute(text('PRAGMA synchronous')).scalar() == 1    # NORMAL
+        assert db.session.execute(text('PRAGMA busy_timeout')).scalar() == app.config['SQLITE_BUSY_TIMEOUT']
+        assert db.engine.pool.size() == app.config['DB_POOL_SIZE']
+        assert REPLICA_BIND not in db.engines
+
+
+def test_get_requests_read_from_replica(replica_app):
+    client = replica_app.test_client()
+    with replica_app.app_context():
+        headers = {'Authorization': f"Bearer {create_access_token(identity='user-1')}"}
+        primary, replica = db.engine, db.engines[REPLICA_BIND]
+
+    with QueryCounter(primary) as on_primary, QueryCounter(replica) as on_replica:
+        assert client.get('/api/topics/', headers=headers).status_code == 200
+    # Only the identity lookup, which is cached, reads the primary
+    assert on_primary.count == 1 and on_replica.count > 0
+
+    with QueryCounter(primary) as on_primary, QueryCounter(replica) as on_replica:
+        response = client.post('/api/quizzes/practice/submit', headers=headers,
+                               json={'topicId': '1', 'correctCount': 1, 'totalQuestions': 1})
+        assert response.status_code == 200
+    assert on_primary.count > 0 and on_replica.count == 0
+
+
+def test_session_reads_its_own_writes_on_primary(replica_app):
+    with replica_app.test_request_context('/', method='GET'):
+        replica = db.engines[REPLICA_BIND]
+        query = select(Topic.title)
+        assert db.session.get_bind(clause=query) is replica
+        with use_primary():
+            assert db.session.get_bind(clause=query) is db.engine
+
+        db.session.execute(update(User).where(User.id == 'user-1').values(username='Renamed'))
+        assert db.session.get_bind(clause=query) is db.engine
+        db.session.rollback()
+
+    with replica_app.test_request_context('/', method='POST'):
+        assert db.session.get_bind(clause=select(Topic.title)) is db.engine
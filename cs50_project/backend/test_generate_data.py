@@ -0,0 +1,79 @@
+"""
+Tests for the synthetic data generator.
+"""
+from collections import Counter
+from datetime import date
+import pytest
+from sqlalchemy import func, inspect, select
+try:
+    from backend.generate_data import generate
+    from backend.models import db, ReviewItem, User, UserActivityDay, UserProgress, UserTopicCompletion, UserTopicStats
+    from backend.submissions import next_daily_streak
+except ModuleNotFoundError:
+    from generate_data import generate
+    from models import db, ReviewItem, User, UserActivityDay, UserProgress, UserTopicCompletion, UserTopicStats
+    from submissions import next_daily_streak
+
+TODAY = date(2024, 6, 30)
+
+
+def test_generated_history_matches_user_counters(app):
+    with app.app_context():
+        counts = generate(topics=20, questions=4, users=40, progress=3000, days=60,
+                          user_chunk=15, batch_size=500, today=TODAY, log=lambda message: None)
+        assert counts['users'] == 40 and counts['topics'] == 20 and counts['questions'] == 80
+        assert abs(counts['progress'] - 3000) < 100
+        assert db.session.scalar(select(func.count()).select_from(UserProgress)) == counts['progress']
+
+        for user in User.query.filter(User.id.like('gen-%')):
+            rows = UserProgress.query.filter_by(user_id=user.id).order_by(UserProgress.completed_at).all()
+            assert user.total_quizzes == len(rows)
+            assert user.correct_answers == sum(row.correct_count for row in rows)
+            assert all(0 <= row.correct_count <= row.total_questions for row in rows)
+            assert all(row.completed_at.date() == row.completion_day <= TODAY for row in rows)
+
+            # Replaying the daily attempts through the submit rule gives the stored streaks
+            streak, best, last = 0, 0, None
+            for day in sorted(row.completion_day for row in rows if row.is_daily):
+                streak = next_daily_streak(streak, last, day)
+                best, last = max(best, streak), day
+            assert (user.daily_streak, user.best_daily_streak, user.last_daily_completion) == (streak, best, last)
+
+            topics = {row.topic_id for row in rows}
+            completed = {c.topic_id for c in UserTopicCompletion.query.filter_by(user_id=user.id)}
+            assert user.topics_completed == len(topics) and completed == topics
+
+            activity = UserActivityDay.query.filter_by(user_id=user.id).all()
+            assert {a.day: a.quizzes for a in activity} == Counter(row.completion_day for row in rows)
+            assert sum(a.daily_quizzes for a in activity) == sum(row.is_daily for row in rows)
+
+            stats = {s.topic_id: s for s in UserTopicStats.query.filter_by(user_id=user.id)}
+            assert set(stats) == topics
+            assert sum(s.attempts for s in stats.values()) == len(rows)
+            assert sum(s.questions_answered for s in stats.values()) == sum(row.total_questions for row in rows)
+            assert sum(s.correct_answers for s in stats.values()) == user.correct_answers
+
+            reviews = ReviewItem.query.filter_by(user_id=user.id).all()
+            assert {r.topic_id for r in reviews} == topics
+            assert all(r.due_day > r.last_reviewed_at.date() for r in reviews)
+
+
+def test_generate_refuses_existing_prefix(app):
+    with app.app_context():
+        generate(topics=1, users=2, progress=10, today=TODAY, log=lambda message: None)
+        with pytest.raises(ValueError):
+            generate(topics=1, users=2, progress=10, today=TODAY, log=lambda message: None)
+
+
+def test_unique_index_stays_in_place_during_the_load(app):
+    with app.app_context():
+        seen = []
+
+        def log(message):
+            if message.startswith('Users '):
+                seen.append({index['name']: index['unique'] for index in inspect(db.engine).get_indexes('user_progress')})
+
+        generate(topics=5, users=20, progress=200, days=30, user_chunk=10, today=TODAY, log=log)
+        assert seen and all(indexes == {'uq_user_progress_daily_per_day': 1} for indexes in seen)
+        after = {index['name'] for index in inspect(db.engine).get_indexes('user_progress')}
+        assert after == {index.name for index in UserProgress.__table__.indexes}
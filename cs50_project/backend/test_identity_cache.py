@@ -0,0 +1,65 @@
+"""
+Tests for the authenticated-user cache behind the JWT user loader.
+"""
+try:
+    from backend.identity import IdentityCache
+    from backend.models import db, User
+except ModuleNotFoundError:
+    from identity import IdentityCache
+    from models import db, User
+
+
+def test_hot_user_is_served_from_cache_and_submits_invalidate(app, client, auth_headers):
+    cache = app.extensions['identity_cache']
+
+    assert client.get('/api/auth/me', headers=auth_headers).get_json()['user']['totalQuizzes'] == 0
+    assert client.get('/api/users/profile', headers=auth_headers).status_code == 200
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    response = client.post('/api/quizzes/practice/submit',
+                           json={'topicId': '1', 'correctCount': 4, 'totalQuestions': 5},
+                           headers=auth_headers)
+    assert response.get_json()['user']['totalQuizzes'] == 1
+
+    profile = client.get('/api/users/profile', headers=auth_headers).get_json()['user']
+    assert profile['totalQuizzes'] == 1
+    assert profile['correctAnswers'] == 4
+    # The shared payload is not polluted by the profile's extra field
+    assert 'accuracy' not in client.get('/api/auth/me', headers=auth_headers).get_json()['user']
+
+
+def test_deleted_user_is_not_found(app, client, auth_headers):
+    assert client.get('/api/auth/me', headers=auth_headers).status_code == 200
+    with app.app_context():
+        db.session.delete(db.session.get(User, 'user-1'))
+        db.session.commit()
+
+    response = client.get('/api/users/profile', headers=auth_headers)
+    assert response.status_code == 404
+    assert response.get_json() == {'error': 'User not found'}
+
+
+def test_lru_eviction_and_ttl():
+    now = [0.0]
+    cache = IdentityCache(maxsize=2, ttl=10, clock=lambda: now[0])
+    loads = []
+
+    def load(user_id):
+        loads.append(user_id)
+        return {'id': user_id}
+
+    cache.get('a', load)
+    cache.get('b', load)
+    cache.get('a', load)          # hit, 'b' is now least recently used
+    cache.get('c', load)          # evicts 'b'
+    cache.get('a', load)
+    assert loads == ['a', 'b', 'c']
+    assert cache.stats()['evictions'] == 1
+
+    cache.get('b', load)
+    assert loads[-1] == 'b'
+
+    now[0] = 11
+    cache.get('a', load)
+    assert loads[-1] == 'a'
+    assert (cache.hits, cache.misses) == (2, 5)
@@ -0,0 +1,97 @@
+"""
+Tests for the in-memory leaderboard and GET /api/users/leaderboard.
+"""
+from datetime import datetime
+from sqlalchemy import update
+try:
+    from backend.app import create_app
+    from backend.leaderboard import Leaderboard, get_leaderboard
+    from backend.models import db, User
+except ModuleNotFoundError:
+    from app import create_app
+    from leaderboard import Leaderboard, get_leaderboard
+    from models import db, User
+
+
+def row(user_id, daily=0, best=0, correct=0, quizzes=0):
+    return (user_id, f'name-{user_id}', daily, best, correct, quizzes)
+
+
+def test_ranks_share_ties_and_follow_updates():
+    board = Leaderboard([row('a', daily=3), row('b', daily=5), row('c', daily=3), row('d', daily=1)])
+    assert [(e['rank'], e['userId'], e['value']) for e in board.top('dailyStreak', 4)] == [
+        (1, 'b', 5), (2, 'a', 3), (2, 'c', 3), (4, 'd', 1)
+    ]
+    assert board.rank('dailyStreak', 'c') == 2
+
+    me, neighbours = board.around('dailyStreak', 'c', 1)
+    assert me == {'rank': 2, 'value': 3}
+    assert [e['userId'] for e in neighbours] == ['a', 'c', 'd']
+    # A window that starts mid-tie still reports the shared rank
+    assert [e['rank'] for e in board.around('dailyStreak', 'd', 1)[1]] == [2, 4]
+
+    board.update([row('d', daily=9), row('e', daily=4)])
+    board.remove(['b'])
+    assert [e['userId'] for e in board.top('dailyStreak', 10)] == ['d', 'e', 'a', 'c']
+    assert board.rank('dailyStreak', 'b') is None and len(board) == 4
+    # The freed slot is reused
+    board.update([row('f', correct=2)])
+    assert board.top('correctAnswers', 1)[0]['userId'] == 'f'
+
+
+def test_submits_and_signups_update_the_leaderboard(app, client, auth_headers):
+    response = client.post('/api/quizzes/practice/submit', headers=auth_headers,
+                           json={'topicId': '1', 'correctCount': 4, 'totalQuestions': 5})
+    assert response.status_code == 200
+    with app.app_context():
+        other = User(id='user-2', email='other@example.com', username='Other', password_hash='x', correct_answers=9)
+        db.session.add(other)
+        db.session.commit()
+
+    data = client.get('/api/users/leaderboard?metric=correctAnswers&neighbors=1', headers=auth_headers).get_json()
+    board = data['leaderboards']['correctAnswers']
+    assert [(e['rank'], e['username'], e['value']) for e in board['top']] == [(1, 'Other', 9), (2, 'TestUser', 4)]
+    assert board['me'] == {'rank': 2, 'value': 4}
+    assert data['totalUsers'] == 2 and list(data['leaderboards']) == ['correctAnswers']
+
+    with app.app_context():
+        db.session.delete(db.session.get(User, 'user-2'))
+        db.session.commit()
+        assert len(get_leaderboard()) == 1
+
+
+def test_rolled_back_writes_are_not_applied(app):
+    with app.app_context():
+        user = db.session.get(User, 'user-1')
+        user.daily_streak = 50
+        db.session.flush()
+        db.session.rollback()
+        assert get_leaderboard().top('dailyStreak', 1)[0]['value'] == 0
+
+
+def test_writes_from_other_processes_are_synced(app, client, auth_headers):
+    now = [0.0]
+    app.extensions['leaderboard'] = Leaderboard(sync_interval=30, clock=lambda: now[0])
+
+    def streak():
+        data = client.get('/api/users/leaderboard?metric=dailyStreak', headers=auth_headers).get_json()
+        return data['leaderboards']['dailyStreak']['me']['value']
+
+    assert streak() == 0
+    with app.app_context():
+        # Another process bumped the streak without going through this app
+        with db.engine.begin() as conn:
+            conn.execute(update(User).where(User.id == 'user-1').values(daily_streak=7, updated_at=datetime.utcnow()))
+    assert streak() == 0
+    now[0] = 30.0
+    assert streak() == 7
+
+
+def test_invalid_parameters_and_disabled(client, auth_headers, database_url):
+    for query, message in [('metric=speed', 'metric must be one of'), ('limit=0', 'limit must be between'),
+                           ('neighbors=11', 'neighbors must be between')]:
+        response = client.get(f'/api/users/leaderboard?{query}', headers=auth_headers)
+        assert response.status_code == 400 and message in response.get_json()['error']
+
+    disabled = create_app({'TESTING': True, 'LEADERBOARD_ENABLED': False})
+    assert disabled.test_client().get('/api/users/leaderboard', headers=auth_headers).status_code == 404
@@ -0,0 +1,32 @@
+"""
+Smoke test for the load-testing harness in benchmarks/load.py.
+"""
+import argparse
+import pytest
+from flask_jwt_extended import create_access_token
+try:
+    from backend.benchmarks.load import DEFAULT_MIX, parse_mix, run
+except ModuleNotFoundError:
+    from benchmarks.load import DEFAULT_MIX, parse_mix, run
+
+
+def test_mixed_traffic_reports_every_route(app):
+    with app.app_context():
+        tokens = [create_access_token(identity='user-1')]
+
+    results = run(app, tokens, ['1', '2', '3'], DEFAULT_MIX, concurrency=2, duration=0.5, warmup=0)
+
+    assert set(results['routes']) <= set(DEFAULT_MIX)
+    assert results['overall']['requests'] == sum(route['requests'] for route in results['routes'].values())
+    assert results['overall']['errors'] == 0
+    for route in results['routes'].values():
+        assert route['p50_ms'] <= route['p95_ms'] <= route['p99_ms']
+        assert route['queries_max'] >= route['queries_mean'] >= 0
+
+
+def test_parse_mix():
+    assert parse_mix('browse=3, topic=1') == {'browse': 3, 'topic': 1}
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_mix('checkout=1')
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_mix('browse=0')
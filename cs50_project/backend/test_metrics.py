@@ -0,0 +1,73 @@
+"""
+Tests for the request and SQL metrics served at /metrics.
+"""
+import logging
+import re
+try:
+    from backend.app import create_app
+    from backend.metrics import Metrics, get_metrics
+except ModuleNotFoundError:
+    from app import create_app
+    from metrics import Metrics, get_metrics
+
+
+def sample(text, name, **labels):
+    """The value of one sample in Prometheus text output, or None"""
+    for line in text.splitlines():
+        match = re.match(r'([a-z_]+)(?:\{(.*)\})? (\S+)$', line)
+        if match and match.group(1) == name:
+            found = dict(re.findall(r'(\w+)="((?:[^"\\]|\\.)*)"', match.group(2) or ''))
+            if all(found.get(key) == str(value) for key, value in labels.items()):
+                return float(match.group(3))
+    return None
+
+
+def test_requests_are_counted_per_endpoint(client, auth_headers):
+    for _ in range(2):
+        assert client.get('/api/topics/', headers=auth_headers).status_code == 200
+    assert client.get('/api/topics/404', headers=auth_headers).status_code == 404
+    assert client.get('/missing').status_code == 404
+
+    response = client.get('/metrics')
+    assert response.status_code == 200 and response.mimetype == 'text/plain'
+    text = response.get_data(as_text=True)
+
+    labels = {'blueprint': 'topics', 'endpoint': 'topics.get_all_topics', 'method': 'GET'}
+    assert sample(text, 'http_requests_total', status=200, **labels) == 2
+    assert sample(text, 'http_request_duration_seconds_count', **labels) == 2
+    assert sample(text, 'http_request_duration_seconds_bucket', le='+Inf', **labels) == 2
+    assert sample(text, 'http_request_sql_queries_total', **labels) >= 2
+    assert sample(text, 'http_requests_total', endpoint='topics.get_topic_by_id', status=404) == 1
+    assert sample(text, 'http_requests_total', endpoint='unmatched', status=404) == 1
+    # The /metrics request itself is still being handled
+    assert sample(text, 'http_requests_in_flight') == 1
+    assert sample(text, 'identity_cache_misses_total') == 1
+
+
+def test_histogram_buckets_are_cumulative():
+    metrics = Metrics(buckets=(0.1, 1.0))
+    for seconds in (0.05, 0.5, 0.5, 3.0):
+        metrics.observe('topics', 'topics.get_all_topics', 'GET', 200, seconds, 1, 0.001)
+    text = metrics.render()
+    buckets = [sample(text, 'http_request_duration_seconds_bucket', le=le) for le in ('0.1', '1.0', '+Inf')]
+    assert buckets == [1, 3, 4]
+    assert sample(text, 'http_request_duration_seconds_sum') == 4.05
+    assert sample(text, 'http_request_sql_queries_total') == 4
+
+
+def test_slow_requests_are_logged(app, client, auth_headers, caplog):
+    with caplog.at_level(logging.WARNING):
+        assert client.get('/api/topics/', headers=auth_headers).status_code == 200
+        app.config['SLOW_REQUEST_MS'] = 1e-6
+        assert client.get('/api/topics/', headers=auth_headers).status_code == 200
+    [record] = [r for r in caplog.records if r.getMessage().startswith('Slow request')]
+    assert re.match(r'Slow request: GET /api/topics/ -> 200 in [\d.]+ ms \(\d+ queries, [\d.]+ ms SQL\)',
+                    record.getMessage())
+
+
+def test_metrics_can_be_disabled(app, database_url):
+    with app.app_context():
+        assert isinstance(get_metrics(), Metrics)
+    disabled = create_app({'TESTING': True, 'METRICS_ENABLED': False})
+    assert 'metrics' not in disabled.extensions
+    assert disabled.test_client().get('/metrics').status_code == 404
@@ -0,0 +1,81 @@
+"""
+Tests for pooled password hashing and rehash-on-login.
+"""
+from werkzeug.security import generate_password_hash
+try:
+    from backend.app import create_app
+    from backend.conftest import seed_test_data
+    from backend.models import db, User
+except ModuleNotFoundError:
+    from app import create_app
+    from conftest import seed_test_data
+    from models import db, User
+
+
+def test_login_rehashes_outdated_hash(database_url):
+    app = create_app({'TESTING': True, 'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1000', 'PASSWORD_HASH_WORKERS': 1})
+    seed_test_data(app)
+    with app.app_context():
+        user = db.session.get(User, 'user-1')
+        user.password_hash = generate_password_hash('user123', 'pbkdf2:sha256:500')
+        db.session.commit()
+
+    client = app.test_client()
+    response = client.post('/api/auth/login', json={'email': 'user@example.com', 'password': 'user123'})
+    assert response.status_code == 200
+
+    with app.app_context():
+        stored = db.session.get(User, 'user-1').password_hash
+    assert stored.startswith('pbkdf2:sha256:1000$')
+
+    # The upgraded hash still verifies
+    response = client.post('/api/auth/login', json={'email': 'user@example.com', 'password': 'user123'})
+    assert response.status_code == 200
+    app.extensions['password_hasher'].shutdown()
+
+
+def test_saturated_hasher_sheds_load_with_503(database_url):
+    app = create_app({'TESTING': True, 'PASSWORD_HASH_WORKERS': 0, 'PASSWORD_HASH_QUEUE_DEPTH': 1})
+    seed_test_data(app)
+    hasher = app.extensions['password_hasher']
+
+    hasher._slots.acquire()
+    try:
+        response = app.test_client().post('/api/auth/login',
+                                          json={'email': 'user@example.com', 'password': 'user123'})
+    finally:
+        hasher._slots.release()
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+
+
+def test_login_succeeds_when_rehash_finds_the_pool_full(database_url):
+    app = create_app({'TESTING': True, 'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1000',
+                      'PASSWORD_HASH_WORKERS': 0, 'PASSWORD_HASH_QUEUE_DEPTH': 1})
+    seed_test_data(app)
+    outdated = generate_password_hash('user123', 'pbkdf2:sha256:500')
+    with app.app_context():
+        db.session.get(User, 'user-1').password_hash = outdated
+        db.session.commit()
+
+    hasher = app.extensions['password_hasher']
+    verify = hasher.verify
+
+    def verify_then_fill_pool(password_hash, password):
+        # Another request takes the last slot between the check and the rehash
+        result = verify(password_hash, password)
+        hasher._slots.acquire()
+        return result
+
+    hasher.verify = verify_then_fill_pool
+    try:
+        response = app.test_client().post('/api/auth/login',
+                                          json={'email': 'user@example.com', 'password': 'user123'})
+    finally:
+        hasher._slots.release()
+
+    assert response.status_code == 200
+    assert response.get_json()['token']
+    with app.app_context():
+        assert db.session.get(User, 'user-1').password_hash == outdated
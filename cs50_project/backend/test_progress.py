@@ -0,0 +1,83 @@
+"""
+Tests for GET /api/users/progress: keyset pagination, filters and NDJSON streaming.
+"""
+import json
+from datetime import datetime, timedelta
+try:
+    from backend.models import db, UserProgress
+except ModuleNotFoundError:
+    from models import db, UserProgress
+
+BASE = datetime(2024, 4, 10, 12)
+
+
+def add_history(app):
+    """Nine rows over 2024-04-08..10, three pairs sharing a completed_at; returns their ids newest first"""
+    times = [BASE, BASE, BASE - timedelta(hours=1), BASE - timedelta(days=1), BASE - timedelta(days=1),
+             BASE - timedelta(days=1, hours=3), BASE - timedelta(days=2), BASE - timedelta(days=2),
+             BASE - timedelta(days=2, hours=5)]
+    with app.app_context():
+        rows = [
+            UserProgress(user_id='user-1', topic_id='1', completed_at=completed_at,
+                         completion_day=completed_at.date(), is_daily=i in (2, 5, 8),
+                         correct_count=1, total_questions=1)
+            for i, completed_at in enumerate(times)
+        ]
+        db.session.add_all(rows)
+        db.session.commit()
+        return [row.id for row in sorted(rows, key=lambda row: (row.completed_at, row.id), reverse=True)]
+
+
+def test_pages_walk_the_history_exactly_once(app, client, auth_headers):
+    expected = add_history(app)
+    seen, cursor, pages = [], None, 0
+    while True:
+        url = '/api/users/progress?limit=2' + (f'&cursor={cursor}' if cursor else '')
+        body = client.get(url, headers=auth_headers).get_json()
+        seen += [row['id'] for row in body['progress']]
+        pages += 1
+        cursor = body['nextCursor']
+        if cursor is None:
+            break
+    assert seen == expected
+    assert pages == 5
+
+
+def test_date_bounds_are_inclusive_and_is_daily_filters(app, client, auth_headers):
+    add_history(app)
+
+    def fetch(query):
+        return client.get(f'/api/users/progress?{query}', headers=auth_headers).get_json()['progress']
+
+    assert len(fetch('from=2024-04-09&to=2024-04-09')) == 3
+    assert len(fetch('from=2024-04-09')) == 6
+    assert len(fetch('to=2024-04-08')) == 3
+    daily = fetch('isDaily=true')
+    assert len(daily) == 3 and all(row['isDaily'] for row in daily)
+    assert len(fetch('isDaily=false&from=2024-04-10')) == 2
+
+
+def test_invalid_arguments_are_rejected(client, auth_headers):
+    for query, message in [('cursor=not-a-cursor', 'Invalid cursor'),
+                           ('limit=0', 'limit must be between 1 and 1000'),
+                           ('limit=1001', 'limit must be between 1 and 1000'),
+                           ('isDaily=yes', 'isDaily must be true or false'),
+                           ('from=bad', 'from and to must be YYYY-MM-DD'),
+                           ('to=2024-02-30', 'from and to must be YYYY-MM-DD')]:
+        response = client.get(f'/api/users/progress?{query}', headers=auth_headers)
+        assert response.status_code == 400, query
+        assert response.get_json()['error'] == message
+
+
+def test_ndjson_streams_one_row_per_line(app, client, auth_headers):
+    expected = add_history(app)
+    for url, headers in [('/api/users/progress?format=ndjson', auth_headers),
+                         ('/api/users/progress', {**auth_headers, 'Accept': 'application/x-ndjson'})]:
+        response = client.get(url, headers=headers)
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        lines = response.get_data(as_text=True).splitlines()
+        assert [json.loads(line)['id'] for line in lines] == expected
+
+    limited = client.get('/api/users/progress?format=ndjson&limit=4', headers=auth_headers)
+    assert len(limited.get_data(as_text=True).splitlines()) == 4
@@ -0,0 +1,61 @@
+"""
+Query budgets for every route in the topics, quizzes and users blueprints.
+
+Each test starts from a fresh app, so the budget covers a cold request
+(identity cache, catalog and daily schedule empty) followed by a warm
+repeat. Budgets are today's exact counts: raise one only with a reason,
+never to absorb an N+1.
+"""
+import pytest
+from datetime import datetime, timedelta, timezone
+try:
+    from backend.models import Topic
+except ModuleNotFoundError:
+    from models import Topic
+
+PRACTICE = {'topicId': '2', 'correctCount': 1, 'totalQuestions': 1}
+DAILY = {'correctCount': 1, 'totalQuestions': 1}
+BATCH = {'attempts': [
+    {'type': 'practice', 'topicId': str(i), 'correctCount': 1, 'totalQuestions': 1,
+     'completedAt': (datetime.now(timezone.utc) - timedelta(hours=4 - i)).isoformat(), 'idempotencyKey': f'k{i}'}
+    for i in (1, 2, 3)
+]}
+
+# (method, url, body, cold budget, warm budget). The batch is 8 writes per
+# new attempt; its warm repeat only claims (and finds) the three receipts.
+# Cold requests that load the catalog also read the shared catalog version.
+# Committed submits read the changed user row back for the leaderboard, and
+# every applied attempt adds to the user's activity calendar and topic
+# statistics and reschedules the topic's review. The profile reads its
+# accuracy from the topic statistics.
+ROUTES = [
+    ('get', '/api/topics/', None, 4, 1),
+    ('get', '/api/topics/2', None, 4, 0),
+    ('get', '/api/topics/daily', None, 9, 2),
+    ('get', '/api/topics/2/completed', None, 2, 1),
+    ('post', '/api/quizzes/daily/submit', DAILY, 14, 2),
+    ('post', '/api/quizzes/practice/submit', PRACTICE, 12, 8),
+    ('post', '/api/quizzes/submit-batch', BATCH, 29, 3),
+    ('get', '/api/users/profile', None, 2, 1),
+    ('get', '/api/users/progress', None, 2, 1),
+    ('get', '/api/users/progress?format=ndjson', None, 2, 1),
+    ('get', '/api/users/leaderboard', None, 1, 0),
+    ('get', '/api/users/activity', None, 2, 1),
+    ('get', '/api/users/stats', None, 2, 1),
+    ('get', '/api/quizzes/review-queue', None, 2, 1),
+]
+
+
+@pytest.mark.parametrize('method, url, body, cold, warm', ROUTES, ids=[route[1] for route in ROUTES])
+def test_route_query_budget(client, auth_headers, query_budget, method, url, body, cold, warm):
+    for budget in (cold, warm):
+        with query_budget(budget):
+            response = getattr(client, method)(url, json=body, headers=auth_headers)
+            response.get_data()
+        assert response.status_code == 200, response.get_json()
+
+
+def test_many_topics_load_questions_in_one_query(app, query_budget):
+    with app.app_context(), query_budget(2):
+        payloads = [topic.to_dict() for topic in Topic.query.all()]
+    assert all(len(payload['questions']) == 1 for payload in payloads)
@@ -0,0 +1,83 @@
+"""
+Query plan checks for the hot lookups.
+
+The SQLite checks always run. The PostgreSQL checks run when
+TEST_POSTGRES_URL points at a scratch database.
+"""
+import os
+import pytest
+from datetime import date
+try:
+    from backend.app import create_app
+    from backend.activity import calendar_query
+    from backend.models import db
+    from backend.completions import daily_completion_query
+    from backend.reviews import review_queue_query
+    from backend.topic_stats import topic_stats_query
+except ModuleNotFoundError:
+    from app import create_app
+    from activity import calendar_query
+    from models import db
+    from completions import daily_completion_query
+    from reviews import review_queue_query
+    from topic_stats import topic_stats_query
+
+POSTGRES_URL = os.environ.get('TEST_POSTGRES_URL')
+
+
+def explain(stmt):
+    """Return the plan text for a statement on the app's engine"""
+    connection = db.session.connection()
+    compiled = stmt.compile(dialect=connection.dialect)
+    if connection.dialect.name == 'sqlite':
+        params = tuple(compiled.params[name] for name in compiled.positiontup)
+        rows = connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {compiled}', params).all()
+        return '\n'.join(row[-1] for row in rows)
+    rows = connection.exec_driver_sql(f'EXPLAIN {compiled}', compiled.params).all()
+    return '\n'.join(row[0] for row in rows)
+
+
+def test_daily_completion_lookup_uses_index_on_sqlite(app):
+    with app.app_context():
+        plan = explain(daily_completion_query('user-1', date.today()))
+
+    assert 'ix_user_progress_daily_lookup' in plan
+    assert 'SCAN' not in plan
+
+
+def test_activity_calendar_reads_a_primary_key_range_on_sqlite(app):
+    with app.app_context():
+        plan = explain(calendar_query('user-1', date(2024, 1, 1), date(2024, 12, 31)))
+
+    assert 'sqlite_autoindex_user_activity_days_1' in plan
+    assert 'SCAN' not in plan
+
+
+def test_topic_stats_read_a_primary_key_range_on_sqlite(app):
+    with app.app_context():
+        plan = explain(topic_stats_query('user-1'))
+
+    assert 'sqlite_autoindex_user_topic_stats_1' in plan
+    assert 'SCAN' not in plan
+
+
+def test_review_queue_reads_the_due_index_in_order_on_sqlite(app):
+    with app.app_context():
+        plan = explain(review_queue_query('user-1', date(2024, 6, 1), 10))
+
+    assert 'ix_review_items_user_due' in plan
+    assert 'SCAN' not in plan and 'TEMP B-TREE' not in plan
+
+
+@pytest.mark.skipif(not POSTGRES_URL, reason='TEST_POSTGRES_URL not set')
+def test_daily_completion_lookup_uses_index_on_postgresql(monkeypatch):
+    monkeypatch.setenv('DATABASE_URL', POSTGRES_URL)
+    app = create_app()
+
+    with app.app_context():
+        # Tiny test tables would otherwise always be sequentially scanned
+        db.session.execute(db.text('SET enable_seqscan = off'))
+        plan = explain(daily_completion_query('user-1', date.today()))
+        db.session.rollback()
+
+    assert 'ix_user_progress_daily_lookup' in plan or 'uq_user_progress_daily_per_day' in plan
@@ -0,0 +1,52 @@
+"""
+Tests for the materialized daily topic schedule.
+"""
+from datetime import date, datetime, timedelta
+try:
+    from backend.models import db, DailySchedule, Topic, UserProgress
+    from backend.schedule import SCHEDULE_HORIZON_DAYS, get_daily_topic_id, topic_index_for_day
+except ModuleNotFoundError:
+    from models import db, DailySchedule, Topic, UserProgress
+    from schedule import SCHEDULE_HORIZON_DAYS, get_daily_topic_id, topic_index_for_day
+
+
+def ordered_topic_ids():
+    return db.session.execute(db.select(Topic.id).order_by(Topic.created_at, Topic.id)).scalars().all()
+
+
+def test_topics_and_quizzes_agree_on_the_daily_topic(app, client, auth_headers):
+    shown = client.get('/api/topics/daily', headers=auth_headers).get_json()['topic']['id']
+    response = client.post('/api/quizzes/daily/submit', headers=auth_headers,
+                           json={'correctCount': 1, 'totalQuestions': 1})
+    assert response.get_json()['streakIncreased'] is True
+
+    with app.app_context():
+        progress = UserProgress.query.filter_by(user_id='user-1', is_daily=True).one()
+        assert progress.topic_id == shown
+        topic_ids = ordered_topic_ids()
+        assert shown == topic_ids[topic_index_for_day(date.today(), len(topic_ids))]
+
+
+def test_new_earlier_topic_rebuilds_the_upcoming_schedule(app):
+    today = date.today()
+    yesterday = today - timedelta(days=1)
+    with app.app_context():
+        get_daily_topic_id(yesterday)
+        kept = db.session.get(DailySchedule, yesterday).topic_id
+        assert db.session.query(DailySchedule).filter(DailySchedule.day >= today).count() > 0
+
+        # Sorts first, shifting every day's topic
+        db.session.add(Topic(id='0', title='Topic 0', description='Description 0', content='# Topic 0',
+                             category='Scalability', difficulty='Beginner', estimated_time=10,
+                             created_at=datetime(2023, 12, 31)))
+        db.session.commit()
+        assert db.session.query(DailySchedule).filter(DailySchedule.day >= today).count() == 0
+
+        get_daily_topic_id(today)
+        topic_ids = ordered_topic_ids()
+        upcoming = db.session.query(DailySchedule).filter(DailySchedule.day >= today).all()
+        assert len(upcoming) == SCHEDULE_HORIZON_DAYS
+        for entry in upcoming:
+            assert entry.topic_id == topic_ids[topic_index_for_day(entry.day, len(topic_ids))]
+        # Past days keep the topic that was served
+        assert db.session.get(DailySchedule, yesterday).topic_id == kept
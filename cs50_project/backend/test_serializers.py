@@ -0,0 +1,44 @@
+"""
+Tests for the row serializers and the JSON providers.
+"""
+from datetime import date, datetime
+from flask import Flask
+try:
+    from backend.json_provider import OrjsonProvider, init_json_provider, orjson
+    from backend.models import db, UserProgress
+    from backend.routes.users import PROGRESS_ROW
+except ModuleNotFoundError:
+    from json_provider import OrjsonProvider, init_json_provider, orjson
+    from models import db, UserProgress
+    from routes.users import PROGRESS_ROW
+
+
+def test_row_serializer_matches_to_dict(app):
+    with app.app_context():
+        db.session.add(UserProgress(user_id='user-1', topic_id='1', completed_at=datetime(2024, 3, 1, 9, 30, 0, 250),
+                                    is_daily=True, correct_count=3, total_questions=5))
+        db.session.commit()
+        progress = UserProgress.query.one()
+        row = db.session.execute(db.select(*PROGRESS_ROW.columns)).one()
+        assert PROGRESS_ROW(row) == progress.to_dict()
+
+
+def test_orjson_provider_matches_stdlib_output():
+    if orjson is None:
+        return
+    payload = {'b': [1, 2.5, None], 'a': {'z': 'x', 'y': True}, 'when': date(2024, 1, 1).isoformat()}
+
+    stdlib_app = Flask(__name__)
+    orjson_app = Flask(__name__)
+    orjson_app.config['JSON_PROVIDER'] = 'auto'
+    init_json_provider(orjson_app)
+    assert isinstance(orjson_app.json, OrjsonProvider)
+
+    with stdlib_app.app_context():
+        expected = stdlib_app.json.response(payload).get_data()
+    with orjson_app.app_context():
+        actual = orjson_app.json.response(payload).get_data()
+        assert orjson_app.json.loads(actual) == payload
+        # Non-ASCII text is written as UTF-8 instead of \u escapes
+        assert orjson_app.json.loads(orjson_app.json.dumps({'z': 'é'})) == {'z': 'é'}
+    assert actual == expected
@@ -0,0 +1,74 @@
+"""
+Tests for the nightly streak-expiry job.
+"""
+from datetime import date, timedelta
+try:
+    from backend.models import db, JobCheckpoint, User
+    from backend.streak_expiry import JOB_NAME, expire_daily_streaks
+except ModuleNotFoundError:
+    from models import db, JobCheckpoint, User
+    from streak_expiry import JOB_NAME, expire_daily_streaks
+
+TODAY = date(2024, 6, 10)
+
+
+def add_users(app):
+    # id -> (daily_streak, last_daily_completion)
+    users = {
+        'a-today': (4, TODAY),
+        'b-yesterday': (3, TODAY - timedelta(days=1)),
+        'c-two-days': (5, TODAY - timedelta(days=2)),
+        'd-long-ago': (9, TODAY - timedelta(days=40)),
+        'e-never': (2, None),
+        'f-already-zero': (0, TODAY - timedelta(days=40)),
+    }
+    with app.app_context():
+        for user_id, (streak, last) in users.items():
+            db.session.add(User(id=user_id, email=f'{user_id}@example.com', username=user_id,
+                                password_hash='unused', daily_streak=streak, best_daily_streak=streak,
+                                last_daily_completion=last))
+        db.session.commit()
+
+
+def streaks(app):
+    with app.app_context():
+        return dict(db.session.execute(db.select(User.id, User.daily_streak)).all())
+
+
+def test_expires_only_broken_streaks(app):
+    add_users(app)
+    with app.app_context():
+        report = expire_daily_streaks(day=TODAY, chunk_size=2, log=lambda message: None)
+    assert report['expired'] == report['total_expired'] == 3
+    assert report['chunks'] == 4    # 7 users in chunks of 2
+    current = streaks(app)
+    assert (current['a-today'], current['b-yesterday']) == (4, 3)
+    assert current['c-two-days'] == current['d-long-ago'] == current['e-never'] == 0
+    assert current['user-1'] == 0
+
+
+def test_second_run_is_a_no_op(app):
+    add_users(app)
+    with app.app_context():
+        expire_daily_streaks(day=TODAY, log=lambda message: None)
+        again = expire_daily_streaks(day=TODAY, log=lambda message: None)
+        assert again['already_finished'] and again['expired'] == 0 and again['total_expired'] == 3
+        restarted = expire_daily_streaks(day=TODAY, restart=True, log=lambda message: None)
+        assert restarted['expired'] == 0
+
+
+def test_interrupted_run_resumes_after_last_chunk(app):
+    add_users(app)
+    with app.app_context():
+        # A run that committed its first chunk (a-today, b-yesterday) and died
+        db.session.add(JobCheckpoint(name=JOB_NAME, run_day=TODAY, cursor='b-yesterday', rows_touched=0))
+        db.session.commit()
+        db.session.get(User, 'a-today').daily_streak = 7
+        db.session.get(User, 'a-today').last_daily_completion = TODAY - timedelta(days=5)
+        db.session.commit()
+
+        report = expire_daily_streaks(day=TODAY, chunk_size=2, log=lambda message: None)
+        assert report['resumed'] and report['expired'] == 3
+        assert db.session.get(JobCheckpoint, JOB_NAME).finished_at is not None
+    # Rows before the cursor are left to the next night's run
+    assert streaks(app)['a-today'] == 7
@@ -0,0 +1,147 @@
+"""
+Concurrency tests for the quiz submission path.
+"""
+import threading
+from datetime import date, datetime, timedelta
+try:
+    from backend.models import db, User, UserProgress
+except ModuleNotFoundError:
+    from models import db, User, UserProgress
+
+
+def _run_concurrently(app, headers, requests_per_thread, threads, make_request):
+    barrier = threading.Barrier(threads)
+    statuses = []
+    lock = threading.Lock()
+
+    def worker():
+        client = app.test_client()
+        barrier.wait()
+        for i in range(requests_per_thread):
+            response = make_request(client, i)
+            with lock:
+                statuses.append(response.status_code)
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return statuses
+
+
+def test_concurrent_daily_submits_apply_once(app, auth_headers):
+    statuses = _run_concurrently(
+        app, auth_headers, requests_per_thread=2, threads=8,
+        make_request=lambda client, i: client.post(
+            '/api/quizzes/daily/submit',
+            json={'correctCount': 3, 'totalQuestions': 5},
+            headers=auth_headers
+        )
+    )
+    assert statuses == [200] * 16
+
+    with app.app_context():
+        user = db.session.get(User, 'user-1')
+        assert user.daily_streak == 1
+        assert user.best_daily_streak == 1
+        assert user.total_quizzes == 1
+        assert user.correct_answers == 3
+        assert user.topics_completed == 1
+        assert UserProgress.query.filter_by(user_id='user-1', is_daily=True).count() == 1
+
+
+def test_concurrent_practice_submits_are_counted_exactly(app, auth_headers):
+    threads, per_thread = 6, 5
+    statuses = _run_concurrently(
+        app, auth_headers, requests_per_thread=per_thread, threads=threads,
+        make_request=lambda client, i: client.post(
+            '/api/quizzes/practice/submit',
+            json={'topicId': str(i % 3 + 1), 'correctCount': 2, 'totalQuestions': 4},
+            headers=auth_headers
+        )
+    )
+    total = threads * per_thread
+    assert statuses == [200] * total
+
+    with app.app_context():
+        user = db.session.get(User, 'user-1')
+        assert user.practice_streak == total
+        assert user.best_practice_streak == total
+        assert user.total_quizzes == total
+        assert user.correct_answers == 2 * total
+        assert user.topics_completed == 3
+        assert UserProgress.query.filter_by(user_id='user-1').count() == total
+
+
+def test_daily_streak_continues_from_yesterday(app, client, auth_headers):
+    with app.app_context():
+        user = db.session.get(User, 'user-1')
+        user.daily_streak = 4
+        user.best_daily_streak = 4
+        user.last_daily_completion = date.today() - timedelta(days=1)
+        db.session.commit()
+
+    response = client.post('/api/quizzes/daily/submit',
+                           json={'correctCount': 5, 'totalQuestions': 5}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.get_json()['newStreak'] == 5
+    assert response.get_json()['user']['bestDailyStreak'] == 5
+
+
+def test_broken_daily_streak_restarts(app, client, auth_headers):
+    with app.app_context():
+        user = db.session.get(User, 'user-1')
+        user.daily_streak = 4
+        user.best_daily_streak = 4
+        user.last_daily_completion = date.today() - timedelta(days=3)
+        db.session.commit()
+
+    response = client.post('/api/quizzes/daily/submit',
+                           json={'correctCount': 5, 'totalQuestions': 5}, headers=auth_headers)
+    assert response.get_json()['newStreak'] == 1
+    assert response.get_json()['user']['bestDailyStreak'] == 4
+
+
+def _attempt(kind, key, days_ago, **fields):
+    completed_at = datetime.now() - timedelta(days=days_ago)
+    return {'type': kind, 'idempotencyKey': key, 'completedAt': completed_at.astimezone().isoformat(),
+            'correctCount': 1, 'totalQuestions': 2, **fields}
+
+
+def test_batch_applies_attempts_in_time_order_and_ignores_replays(app, client, auth_headers):
+    batch = {'attempts': [
+        _attempt('daily', 'd0', 0),
+        _attempt('daily', 'd2', 2),
+        _attempt('practice', 'p1', 1, topicId='1'),
+        _attempt('daily', 'd1', 1),
+        _attempt('daily', 'd1-again', 1),
+    ]}
+
+    response = client.post('/api/quizzes/submit-batch', json=batch, headers=auth_headers)
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [r['status'] for r in body['results']] == [
+        'applied', 'applied', 'applied', 'applied', 'already_completed'
+    ]
+    assert body['user']['dailyStreak'] == 3
+    assert body['user']['practiceStreak'] == 1
+    assert body['user']['totalQuizzes'] == 4
+    assert body['user']['correctAnswers'] == 4
+
+    replay = client.post('/api/quizzes/submit-batch', json=batch, headers=auth_headers).get_json()
+    assert {r['status'] for r in replay['results']} == {'duplicate'}
+    assert replay['user'] == body['user']
+
+
+def test_batch_rejects_invalid_attempts_individually(client, auth_headers):
+    batch = {'attempts': [
+        _attempt('daily', 'future', -2),
+        _attempt('practice', 'missing-topic', 0, topicId='nope'),
+        {'type': 'practice'},
+        _attempt('practice', 'ok', 0, topicId='2'),
+    ]}
+
+    body = client.post('/api/quizzes/submit-batch', json=batch, headers=auth_headers).get_json()
+    assert [r['status'] for r in body['results']] == ['rejected', 'rejected', 'rejected', 'applied']
+    assert body['user']['totalQuizzes'] == 1
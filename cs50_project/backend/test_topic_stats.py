@@ -0,0 +1,66 @@
+"""
+Tests for per-topic statistics and GET /api/users/stats.
+"""
+from datetime import date, datetime
+import pytest
+try:
+    from backend.migrations import backfill_topic_stats
+    from backend.models import db, UserProgress, UserTopicStats
+    from backend.topic_stats import ROLLING_WEIGHT
+except ModuleNotFoundError:
+    from migrations import backfill_topic_stats
+    from models import db, UserProgress, UserTopicStats
+    from topic_stats import ROLLING_WEIGHT
+
+
+def practice(client, auth_headers, topic_id, correct, total):
+    response = client.post('/api/quizzes/practice/submit', headers=auth_headers,
+                           json={'topicId': topic_id, 'correctCount': correct, 'totalQuestions': total})
+    assert response.status_code == 200
+
+
+def test_submits_fold_into_topic_stats(client, auth_headers):
+    practice(client, auth_headers, '2', 2, 4)
+    practice(client, auth_headers, '2', 4, 4)
+    practice(client, auth_headers, '3', 1, 5)
+
+    response = client.get('/api/users/stats', headers=auth_headers)
+    assert response.status_code == 200
+    body = response.get_json()
+    topics = {topic['topicId']: topic for topic in body['topics']}
+    assert body['topics'][0]['topicId'] == '3'    # most recent first
+
+    two = topics['2']
+    assert (two['attempts'], two['questionsAnswered'], two['correctAnswers']) == (2, 8, 6)
+    assert two['accuracy'] == 75 and two['bestScore'] == 100
+    assert two['rollingScore'] == round((0.5 + ROLLING_WEIGHT * 0.5) * 100)
+    assert body['totals'] == {'topics': 2, 'attempts': 3, 'questionsAnswered': 13, 'correctAnswers': 7,
+                              'accuracy': 54}
+
+
+def test_profile_accuracy_counts_real_questions(client, auth_headers):
+    practice(client, auth_headers, '1', 3, 3)
+    practice(client, auth_headers, '2', 0, 1)
+
+    profile = client.get('/api/users/profile', headers=auth_headers).get_json()['user']
+    assert profile['questionsAnswered'] == 4 and profile['accuracy'] == 75
+
+
+def test_new_user_has_no_stats(client, auth_headers):
+    body = client.get('/api/users/stats', headers=auth_headers).get_json()
+    assert body['topics'] == [] and body['totals']['accuracy'] == 0
+
+
+def test_backfill_aggregates_history(app):
+    with app.app_context():
+        for correct, total, hour in [(1, 4, 9), (3, 4, 10), (0, 0, 11)]:
+            db.session.add(UserProgress(user_id='user-1', topic_id='1', is_daily=False, correct_count=correct,
+                                        total_questions=total, completed_at=datetime(2024, 5, 1, hour),
+                                        completion_day=date(2024, 5, 1)))
+        db.session.commit()
+        backfill_topic_stats()
+        db.session.commit()
+        row = db.session.get(UserTopicStats, ('user-1', '1'))
+        assert (row.attempts, row.questions_answered, row.correct_answers) == (3, 8, 4)
+        assert row.best_score == 0.75 and row.last_attempt_at == datetime(2024, 5, 1, 11)
+        assert row.rolling_score == pytest.approx((0.25 + 0.75 + 0) / 3)
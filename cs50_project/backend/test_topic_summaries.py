@@ -0,0 +1,48 @@
+"""
+Tests for the topic summary projection and ?fields= sparse fieldsets.
+"""
+from sqlalchemy import event
+try:
+    from backend.models import db
+except ModuleNotFoundError:
+    from models import db
+
+
+def test_listing_never_selects_content(app, client, auth_headers):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', capture)
+    try:
+        response = client.get('/api/topics/', headers=auth_headers)
+    finally:
+        event.remove(engine, 'before_cursor_execute', capture)
+
+    topics = response.get_json()['topics']
+    assert [topic['id'] for topic in topics] == ['1', '2', '3']
+    assert all('content' not in topic and topic['questionCount'] == 1 for topic in topics)
+    assert statements and not any('topics.content' in statement for statement in statements)
+
+    # Full topics are still complete
+    topic = client.get('/api/topics/2', headers=auth_headers).get_json()['topic']
+    assert topic['content'] == '# Topic 2'
+    assert len(topic['questions']) == 1
+
+
+def test_sparse_fieldsets(client, auth_headers):
+    topics = client.get('/api/topics/?fields=id,isCompleted', headers=auth_headers).get_json()['topics']
+    assert topics[0] == {'id': '1', 'isCompleted': False}
+
+    topic = client.get('/api/topics/2?fields=title,questions', headers=auth_headers).get_json()['topic']
+    assert set(topic) == {'title', 'questions'}
+
+    daily = client.get('/api/topics/daily?fields=id,hasCompleted', headers=auth_headers).get_json()['topic']
+    assert set(daily) == {'id', 'hasCompleted'}
+
+    response = client.get('/api/topics/?fields=id,content', headers=auth_headers)
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Unknown fields: content'}
@@ -0,0 +1,189 @@
+"""
+Tests for the write-behind submission mode.
+"""
+import sqlite3
+import threading
+import pytest
+from datetime import date, datetime
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+try:
+    from backend.app import create_app
+    from backend.conftest import seed_test_data
+    from backend.models import db, User, UserProgress
+    from backend.writebehind import JournalInUse, ProgressJournal, _apply_event
+except ModuleNotFoundError:
+    from app import create_app
+    from conftest import seed_test_data
+    from models import db, User, UserProgress
+    from writebehind import JournalInUse, ProgressJournal, _apply_event
+
+
+def make_write_behind_app(tmp_path, **config):
+    return create_app({
+        'TESTING': True,
+        'PROGRESS_WRITE_BEHIND': True,
+        'PROGRESS_JOURNAL_PATH': str(tmp_path / 'journal.db'),
+        'PROGRESS_FLUSH_INTERVAL': 0.05,
+        'PROGRESS_FLUSH_BATCH_SIZE': 16,
+        **config
+    })
+
+
+def headers_for(app, user_id='user-1'):
+    with app.app_context():
+        return {'Authorization': f'Bearer {create_access_token(identity=user_id)}'}
+
+
+def test_responses_project_pending_writes_and_flush_is_exact(database_url, tmp_path):
+    app = make_write_behind_app(tmp_path)
+    seed_test_data(app)
+    headers = headers_for(app)
+    queue = app.extensions['progress_write_behind']
+
+    daily = app.test_client().post('/api/quizzes/daily/submit',
+                                   json={'correctCount': 4, 'totalQuestions': 5}, headers=headers)
+    assert daily.get_json()['newStreak'] == 1
+    again = app.test_client().post('/api/quizzes/daily/submit',
+                                   json={'correctCount': 4, 'totalQuestions': 5}, headers=headers)
+    assert again.get_json()['message'] == 'Already completed today'
+
+    statuses = []
+
+    def worker(n):
+        client = app.test_client()
+        for i in range(10):
+            response = client.post('/api/quizzes/practice/submit',
+                                   json={'topicId': str((n + i) % 3 + 1), 'correctCount': 1, 'totalQuestions': 2},
+                                   headers=headers)
+            statuses.append(response.status_code)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert statuses == [200] * 40
+
+    queue.stop()
+    assert len(ProgressJournal(str(tmp_path / 'journal.db'))) == 0
+
+    with app.app_context():
+        user = db.session.get(User, 'user-1')
+        assert user.daily_streak == 1
+        assert user.practice_streak == 40
+        assert user.total_quizzes == 41
+        assert user.correct_answers == 44
+        assert user.topics_completed == 3
+        assert UserProgress.query.count() == 41
+
+
+def test_daily_check_sees_a_flush_racing_the_submit(database_url, tmp_path):
+    app = make_write_behind_app(tmp_path, PROGRESS_FLUSH_INTERVAL=60)
+    seed_test_data(app)
+    headers = headers_for(app)
+    queue = app.extensions['progress_write_behind']
+    client = app.test_client()
+
+    first = client.post('/api/quizzes/daily/submit', json={'correctCount': 4, 'totalQuestions': 5}, headers=headers)
+    assert first.get_json()['streakIncreased'] is True
+
+    # The worker commits and forgets the pending daily while the second
+    # submit is checking the committed row
+    flushed = []
+
+    def flush_during_check(state):
+        columns = getattr(state.statement, 'selected_columns', ())
+        if not flushed and len(columns) == 1 and columns[0].key == 'last_daily_completion':
+            thread = threading.Thread(target=lambda: flushed.append(queue.flush()))
+            thread.start()
+            thread.join()
+
+    event.listen(Session, 'do_orm_execute', flush_during_check)
+    try:
+        second = client.post('/api/quizzes/daily/submit', json={'correctCount': 4, 'totalQuestions': 5},
+                             headers=headers)
+    finally:
+        event.remove(Session, 'do_orm_execute', flush_during_check)
+    assert flushed == [1]
+    assert second.get_json()['streakIncreased'] is False
+    assert second.get_json()['newStreak'] == 1
+
+    queue.stop()
+    assert len(ProgressJournal(str(tmp_path / 'journal.db'))) == 0
+    with app.app_context():
+        user = db.session.get(User, 'user-1')
+        assert (user.daily_streak, user.total_quizzes, user.correct_answers) == (1, 1, 4)
+        assert UserProgress.query.count() == 1
+
+
+def test_journal_is_replayed_exactly_once_after_a_crash(database_url, tmp_path):
+    app = create_app({'TESTING': True})
+    seed_test_data(app)
+
+    journal = ProgressJournal(str(tmp_path / 'journal.db'))
+    for n in range(3):
+        journal.append({
+            'key': f'wb-crash-{n}',
+            'user_id': 'user-1',
+            'type': 'practice',
+            'topic_id': '1',
+            'correct_count': 2,
+            'total_questions': 2,
+            'day': date.today().isoformat(),
+            'completed_at': datetime.utcnow().isoformat()
+        })
+    journal.close()
+
+    # The first event committed before the crash but was never removed from the journal
+    journal = ProgressJournal(str(tmp_path / 'journal.db'))
+    with app.app_context():
+        _apply_event(journal.read(1)[0][1])
+        db.session.commit()
+    journal.close()
+
+    restarted = make_write_behind_app(tmp_path)
+    restarted.extensions['progress_write_behind'].stop()
+
+    with restarted.app_context():
+        user = db.session.get(User, 'user-1')
+        assert user.practice_streak == 3
+        assert user.total_quizzes == 3
+        assert UserProgress.query.count() == 3
+
+
+def test_failed_journal_append_is_not_projected(database_url, tmp_path, monkeypatch):
+    app = make_write_behind_app(tmp_path, PROGRESS_FLUSH_INTERVAL=60)
+    seed_test_data(app)
+    headers = headers_for(app)
+    queue = app.extensions['progress_write_behind']
+    client = app.test_client()
+
+    def disk_full(event):
+        raise sqlite3.OperationalError('database or disk is full')
+
+    monkeypatch.setattr(queue.journal, 'append', disk_full)
+    failed = client.post('/api/quizzes/daily/submit', json={'correctCount': 4, 'totalQuestions': 5}, headers=headers)
+    assert failed.status_code == 500
+    with app.test_request_context():
+        projected = queue.project_user('user-1')
+    assert (projected['totalQuizzes'], projected['dailyStreak']) == (0, 0)
+    monkeypatch.undo()
+
+    # The day's daily is still accepted once the journal works again
+    retried = client.post('/api/quizzes/daily/submit', json={'correctCount': 4, 'totalQuestions': 5}, headers=headers)
+    assert retried.get_json()['streakIncreased'] is True
+    assert retried.get_json()['user']['totalQuizzes'] == 1
+    queue.stop()
+
+
+def test_journal_cannot_be_shared_between_processes(database_url, tmp_path):
+    app = make_write_behind_app(tmp_path)
+    with pytest.raises(JournalInUse):
+        ProgressJournal(str(tmp_path / 'journal.db'))
+    with pytest.raises(JournalInUse):
+        make_write_behind_app(tmp_path)
+
+    app.extensions['progress_write_behind'].stop()
+    ProgressJournal(str(tmp_path / 'journal.db')).close()
@@ -0,0 +1,121 @@
+"""
+Per-user per-topic quiz statistics.
+
+user_topic_stats holds one row per (user, topic) the user has attempted:
+attempts, questions answered and answered correctly, best score, time of
+the last attempt and a rolling score. Every quiz submit upserts its row
+in the submit's transaction with one statement that folds the attempt
+into the stored values, so concurrent submits cannot lose an attempt.
+Reading a user's statistics is one primary-key range scan; the
+UserProgress history is never aggregated on a request.
+
+Scores are the fraction of questions answered correctly. The rolling
+score is an exponentially weighted average over the attempts in the
+order they were applied, each new attempt counting ROLLING_WEIGHT.
+"""
+from sqlalchemy import case
+try:
+    from backend.models import UserTopicStats, db
+    from backend.dbutils import upsert
+    from backend.serializers import isoformat
+except ModuleNotFoundError:
+    from models import UserTopicStats, db
+    from dbutils import upsert
+    from serializers import isoformat
+
+ROLLING_WEIGHT = 0.3
+
+stats = UserTopicStats.__table__
+
+
+def attempt_score(correct_count, total_questions):
+    return correct_count / total_questions if total_questions else 0.0
+
+
+def next_rolling_score(rolling_score, score):
+    """Python mirror of the rolling score update applied by record_topic_stats()"""
+    if rolling_score is None:
+        return score
+    return rolling_score + ROLLING_WEIGHT * (score - rolling_score)
+
+
+def record_topic_stats(user_id, topic_id, correct_count, total_questions, completed_at):
+    """Fold one quiz attempt into the user's topic statistics in the current transaction"""
+    score = attempt_score(correct_count, total_questions)
+    stmt = upsert(
+        stats,
+        db.session.get_bind().dialect.name,
+        {
+            'user_id': user_id,
+            'topic_id': topic_id,
+            'attempts': 1,
+            'questions_answered': total_questions,
+            'correct_answers': correct_count,
+            'best_score': score,
+            'rolling_score': score,
+            'last_attempt_at': completed_at,
+        },
+        lambda new: {
+            'attempts': stats.c.attempts + new.attempts,
+            'questions_answered': stats.c.questions_answered + new.questions_answered,
+            'correct_answers': stats.c.correct_answers + new.correct_answers,
+            'best_score': case((new.best_score > stats.c.best_score, new.best_score), else_=stats.c.best_score),
+            'rolling_score': stats.c.rolling_score + ROLLING_WEIGHT * (new.rolling_score - stats.c.rolling_score),
+            # Queued attempts can arrive out of order
+            'last_attempt_at': case(
+                (new.last_attempt_at > stats.c.last_attempt_at, new.last_attempt_at),
+                else_=stats.c.last_attempt_at
+            ),
+        }
+    )
+    db.session.execute(stmt)
+
+
+def topic_stats_query(user_id):
+    """SELECT for all of a user's topic statistics, served by the primary key"""
+    return db.select(stats).where(stats.c.user_id == user_id)
+
+
+def question_totals(user_id):
+    """(questions answered, answered correctly) over all of the user's topics"""
+    questions, correct = db.session.execute(
+        db.select(db.func.sum(stats.c.questions_answered), db.func.sum(stats.c.correct_answers))
+        .where(stats.c.user_id == user_id)
+    ).one()
+    return questions or 0, correct or 0
+
+
+def accuracy(correct, questions):
+    """Percentage of questions answered correctly, rounded to a whole number"""
+    return round(correct / questions * 100) if questions else 0
+
+
+def user_topic_stats(user_id):
+    """The user's statistics per topic, most recently attempted first, and their totals"""
+    rows = db.session.execute(topic_stats_query(user_id)).all()
+    rows.sort(key=lambda row: row.last_attempt_at, reverse=True)
+    topics = [
+        {
+            'topicId': row.topic_id,
+            'attempts': row.attempts,
+            'questionsAnswered': row.questions_answered,
+            'correctAnswers': row.correct_answers,
+            'accuracy': accuracy(row.correct_answers, row.questions_answered),
+            'bestScore': round(row.best_score * 100),
+            'rollingScore': round(row.rolling_score * 100),
+            'lastAttemptAt': isoformat(row.last_attempt_at),
+        }
+        for row in rows
+    ]
+    questions = sum(row.questions_answered for row in rows)
+    correct = sum(row.correct_answers for row in rows)
+    return {
+        'topics': topics,
+        'totals': {
+            'topics': len(rows),
+            'attempts': sum(row.attempts for row in rows),
+            'questionsAnswered': questions,
+            'correctAnswers': correct,
+            'accuracy': accuracy(correct, questions),
+        },
+    }
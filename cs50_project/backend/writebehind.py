@@ -0,0 +1,330 @@
+"""
+Optional write-behind mode for quiz submissions.
+
+When PROGRESS_WRITE_BEHIND is enabled, the submit routes append each
+submission to a local SQLite journal and answer straight away with the
+streak projected from the user's row plus their still-pending
+submissions. A background worker drains the journal into the main
+database in batches, one transaction per batch.
+
+Every journaled submission carries an idempotency key that is claimed in
+submission_receipts in the same transaction that applies it. Replaying
+the journal after a crash, including a batch that committed just before
+the process died, therefore applies each submission exactly once.
+"""
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import threading
+import uuid
+from datetime import date, datetime
+from flask import current_app
+from sqlalchemy import select
+try:
+    from backend.models import User, db
+    from backend.completions import completed_topic_ids
+    from backend.submissions import (
+        apply_daily_submission, apply_practice_submission, claim_receipt, next_daily_streak
+    )
+except ModuleNotFoundError:
+    from models import User, db
+    from completions import completed_topic_ids
+    from submissions import (
+        apply_daily_submission, apply_practice_submission, claim_receipt, next_daily_streak
+    )
+
+logger = logging.getLogger(__name__)
+
+
+class JournalInUse(RuntimeError):
+    """Raised when another process already has the journal file open"""
+
+
+class ProgressJournal:
+    """Durable append-only queue of submissions, stored in a local SQLite file.
+
+    The file is locked exclusively for as long as the journal is open. Each
+    process projects only the submissions it journaled itself, so a journal
+    shared by several processes would count every submission another
+    process flushed twice.
+    """
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=0)
+        # Exclusive locking mode keeps the write lock taken below until close
+        self._conn.execute('PRAGMA locking_mode=EXCLUSIVE')
+        try:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('BEGIN IMMEDIATE')
+            self._conn.execute('COMMIT')
+        except sqlite3.OperationalError as e:
+            self._conn.close()
+            raise JournalInUse(
+                f'Progress journal {path} is in use by another process; '
+                'give each worker process its own PROGRESS_JOURNAL_PATH'
+            ) from e
+        # WAL with synchronous=NORMAL survives a process crash, which is what
+        # replay protects against, without an fsync on every append
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS journal (seq INTEGER PRIMARY KEY AUTOINCREMENT, event TEXT NOT NULL)'
+        )
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS dead_letter (seq INTEGER PRIMARY KEY, event TEXT NOT NULL, error TEXT)'
+        )
+
+    def append(self, event):
+        with self._lock:
+            cursor = self._conn.execute('INSERT INTO journal (event) VALUES (?)', (json.dumps(event),))
+            return cursor.lastrowid
+
+    def read(self, limit):
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT seq, event FROM journal ORDER BY seq LIMIT ?', (limit,)
+            ).fetchall()
+        return [(seq, json.loads(event)) for seq, event in rows]
+
+    def remove(self, seqs):
+        with self._lock:
+            self._conn.executemany('DELETE FROM journal WHERE seq = ?', [(seq,) for seq in seqs])
+
+    def bury(self, seq, event, error):
+        """Move an event that cannot be applied out of the way"""
+        with self._lock:
+            self._conn.execute('BEGIN')
+            self._conn.execute(
+                'INSERT OR REPLACE INTO dead_letter (seq, event, error) VALUES (?, ?, ?)',
+                (seq, json.dumps(event), error)
+            )
+            self._conn.execute('DELETE FROM journal WHERE seq = ?', (seq,))
+            self._conn.execute('COMMIT')
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM journal').fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class WriteBehindQueue:
+    """Journal plus the background worker that flushes it"""
+
+    def __init__(self, app, journal, flush_interval, batch_size):
+        self.app = app
+        self.journal = journal
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+        self._lock = threading.Lock()
+        # user id -> journaled events not yet committed to the main database
+        self._pending = {}
+        # Bumped after every commit, so readers can detect a flush racing them
+        self._generation = 0
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+
+        # Events journaled before a crash or restart are flushed first
+        for _, event in journal.read(-1):
+            self._pending.setdefault(event['user_id'], []).append(event)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='progress-write-behind', daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        """Stop the worker after draining everything journaled so far"""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._wakeup.set()
+        self._thread.join()
+        self._thread = None
+        self.journal.close()
+
+    def submit(self, user_id, kind, topic_id, correct_count, total_questions, day=None):
+        """Journal a submission and return the projected user state.
+
+        Returns None, without journaling, for a daily submission when the
+        user does not exist or already has a daily quiz for the same day,
+        pending or committed. Callers check the user exists before a
+        practice submission.
+        """
+        event = {
+            'key': f'wb-{uuid.uuid4().hex}',
+            'user_id': user_id,
+            'type': kind,
+            'topic_id': topic_id,
+            'correct_count': correct_count,
+            'total_questions': total_questions,
+            'day': (day or date.today()).isoformat(),
+            'completed_at': datetime.utcnow().isoformat()
+        }
+        while True:
+            if kind == 'daily':
+                with self._lock:
+                    generation = self._generation
+                # Read outside the lock; a flush committing in between bumps
+                # the generation and the check is redone
+                db.session.expire_all()
+                committed = db.session.execute(
+                    select(User.last_daily_completion).where(User.id == user_id)
+                ).first()
+            with self._lock:
+                if kind == 'daily':
+                    if generation != self._generation:
+                        continue
+                    if committed is None or committed.last_daily_completion == date.fromisoformat(event['day']):
+                        return None
+                pending = self._pending.get(user_id, [])
+                if kind == 'daily' and any(
+                    queued['type'] == 'daily' and queued['day'] == event['day'] for queued in pending
+                ):
+                    return None
+                # Journal first: an event that failed to append is never projected
+                self.journal.append(event)
+                self._pending.setdefault(user_id, []).append(event)
+                backlog = sum(len(events) for events in self._pending.values())
+                break
+        if backlog >= self.batch_size:
+            self._wakeup.set()
+        return self.project_user(user_id)
+
+    def project_user(self, user_id):
+        """user.to_dict() with the user's pending submissions applied on top"""
+        while True:
+            with self._lock:
+                generation = self._generation
+                events = list(self._pending.get(user_id, ()))
+            db.session.expire_all()
+            user = db.session.get(User, user_id)
+            data = user.to_dict() if user else None
+            topic_ids = {event['topic_id'] for event in events}
+            newly_completed = len(topic_ids - completed_topic_ids(user_id, topic_ids)) if topic_ids else 0
+            with self._lock:
+                if generation == self._generation:
+                    break
+        if data is None:
+            return None
+
+        data['topicsCompleted'] += newly_completed
+        last_daily = data['lastDailyCompletion'] and date.fromisoformat(data['lastDailyCompletion'])
+        for event in events:
+            day = date.fromisoformat(event['day'])
+            data['totalQuizzes'] += 1
+            data['correctAnswers'] += event['correct_count']
+            if event['type'] == 'daily':
+                data['dailyStreak'] = next_daily_streak(data['dailyStreak'], last_daily, day)
+                data['bestDailyStreak'] = max(data['bestDailyStreak'], data['dailyStreak'])
+                last_daily = max(last_daily, day) if last_daily else day
+            else:
+                data['practiceStreak'] += 1
+                data['bestPracticeStreak'] = max(data['bestPracticeStreak'], data['practiceStreak'])
+                data['lastPracticeCompletion'] = max(data['lastPracticeCompletion'] or '', event['day'])
+        data['lastDailyCompletion'] = last_daily.isoformat() if last_daily else None
+        return data
+
+    def flush(self):
+        """Apply one batch from the journal. Returns the number of events handled."""
+        batch = self.journal.read(self.batch_size)
+        if not batch:
+            return 0
+        with self.app.app_context():
+            try:
+                for _, event in batch:
+                    _apply_event(event)
+                self._commit([seq for seq, _ in batch], [event for _, event in batch])
+            except Exception:
+                db.session.rollback()
+                logger.exception('Write-behind batch failed, retrying events one at a time')
+                self._flush_individually(batch)
+            finally:
+                db.session.remove()
+        return len(batch)
+
+    def _flush_individually(self, batch):
+        for seq, event in batch:
+            try:
+                _apply_event(event)
+                self._commit([seq], [event])
+            except Exception as e:
+                db.session.rollback()
+                logger.exception('Dropping write-behind event %s to dead_letter', event['key'])
+                self.journal.bury(seq, event, str(e))
+                self._forget([event])
+
+    def _commit(self, seqs, events):
+        # Commit and drop the events from the projection under one lock, so a
+        # concurrent project_user() sees either both or neither
+        with self._lock:
+            db.session.commit()
+            self._generation += 1
+            self._forget_locked(events)
+        self.journal.remove(seqs)
+
+    def _forget(self, events):
+        with self._lock:
+            self._generation += 1
+            self._forget_locked(events)
+
+    def _forget_locked(self, events):
+        for event in events:
+            pending = self._pending.get(event['user_id'])
+            if pending and event in pending:
+                pending.remove(event)
+                if not pending:
+                    del self._pending[event['user_id']]
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            while self.flush() == self.batch_size and not self._stopping.is_set():
+                pass
+        while self.flush():
+            pass
+
+
+def _apply_event(event):
+    # The receipt makes replays after a crash a no-op
+    if not claim_receipt(event['user_id'], event['key']):
+        return
+    apply = apply_daily_submission if event['type'] == 'daily' else apply_practice_submission
+    apply(
+        event['user_id'],
+        event['topic_id'],
+        event['correct_count'],
+        event['total_questions'],
+        date.fromisoformat(event['day']),
+        datetime.fromisoformat(event['completed_at'])
+    )
+
+
+def init_write_behind(app):
+    """Start the write-behind worker if PROGRESS_WRITE_BEHIND is enabled"""
+    if not app.config.get('PROGRESS_WRITE_BEHIND'):
+        app.extensions['progress_write_behind'] = None
+        return
+
+    path = app.config.get('PROGRESS_JOURNAL_PATH') or os.path.join(app.instance_path, 'progress_journal.db')
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    queue = WriteBehindQueue(
+        app,
+        ProgressJournal(path),
+        flush_interval=app.config['PROGRESS_FLUSH_INTERVAL'],
+        batch_size=app.config['PROGRESS_FLUSH_BATCH_SIZE']
+    )
+    app.extensions['progress_write_behind'] = queue
+    queue.start()
+
+
+def get_write_behind():
+    """Return the app's write-behind queue, or None when writes are synchronous"""
+    return current_app.extensions.get('progress_write_behind')
@@ -1,6 +1,7 @@
-import { useMemo } from 'react';
+import { useEffect, useMemo, useState } from 'react';
 import { motion } from 'framer-motion';
 import { Tooltip, TooltipContent, TooltipProvider, TooltipTrigger } from '@/components/ui/tooltip';
+import { usersAPI, type ActivityCalendar } from '@/lib/api';
 
 interface StreakGraphProps {
   user: {
@@ -9,8 +10,38 @@ interface StreakGraphProps {
   };
 }
 
+const DAYS = 371; // 53 weeks * 7 days
+
+// Local calendar date as YYYY-MM-DD (toISOString would shift it to UTC)
+const toDayString = (date: Date): string => {
+  const month = String(date.getMonth() + 1).padStart(2, '0');
+  const day = String(date.getDate()).padStart(2, '0');
+  return `${date.getFullYear()}-${month}-${day}`;
+};
+
 // GitHub-style contribution graph component
 const StreakGraph = ({ user }: StreakGraphProps) => {
+  const [activity, setActivity] = useState<ActivityCalendar | null>(null);
+
+  // Per-day counts for the graph's range, refetched when a quiz changes the streak
+  useEffect(() => {
+    let cancelled = false;
+    const today = new Date();
+    const start = new Date(today);
+    start.setDate(start.getDate() - (DAYS - 1));
+    usersAPI
+      .getActivity(toDayString(start), toDayString(today))
+      .then((calendar) => {
+        if (!cancelled) setActivity(calendar);
+      })
+      .catch(() => {
+        // Keep the estimate from the streak below
+      });
+    return () => {
+      cancelled = true;
+    };
+  }, [user.dailyStreak, user.lastDailyCompletion]);
+
   // Generate last 371 days (53 weeks * 7 days) of data
   const contributions = useMemo(() => {
     const days: Array<{ date: Date; count: number; level: number }> = [];
@@ -23,13 +54,18 @@ const StreakGraph = ({ user }: StreakGraphProps) => {
       : null;
 
     // Generate array of last 371 days
-    for (let i = 370; i >= 0; i--) {
+    for (let i = DAYS - 1; i >= 0; i--) {
       const date = new Date(today);
       date.setDate(date.getDate() - i);
       date.setHours(0, 0, 0, 0);
 
       // Determine if this day had activity
       let count = 0;
+      if (activity) {
+        count = activity.quizzes[DAYS - 1 - i] ?? 0;
+        days.push({ date, count, level: Math.min(4, count) });
+        continue;
+      }
       if (lastCompletion) {
         const completionDate = new Date(lastCompletion);
         completionDate.setHours(0, 0, 0, 0);
@@ -52,7 +88,9 @@ const StreakGraph = ({ user }: StreakGraphProps) => {
     }
 
     return days;
-  }, [user.dailyStreak, user.lastDailyCompletion]);
+  }, [activity, user.dailyStreak, user.lastDailyCompletion]);
+
+  const activeDays = activity ? activity.activeDays : user.dailyStreak;
 
   // Group days by week
   const weeks = useMemo(() => {
@@ -108,7 +146,7 @@ const StreakGraph = ({ user }: StreakGraphProps) => {
         <div className="flex-1">
           <h3 className="text-sm font-semibold mb-1">Daily Contribution Graph</h3>
           <p className="text-xs text-muted-foreground">
-            {user.dailyStreak} {user.dailyStreak === 1 ? 'day' : 'days'} in the last year
+            {activeDays} {activeDays === 1 ? 'day' : 'days'} in the last year
           </p>
         </div>
         <div className="flex items-center gap-2 text-xs text-muted-foreground">
@@ -169,7 +207,7 @@ const StreakGraph = ({ user }: StreakGraphProps) => {
                           </div>
                         </TooltipTrigger>
                         <TooltipContent side="top" className="text-xs">
-                          <p className="font-semibold">{day.count > 0 ? `${day.count} contribution` : 'No contributions'}</p>
+                          <p className="font-semibold">{day.count > 0 ? `${day.count} ${day.count === 1 ? 'contribution' : 'contributions'}` : 'No contributions'}</p>
                           <p className="text-muted-foreground">{formatDate(day.date)}</p>
                         </TooltipContent>
                       </Tooltip>
@@ -1,10 +1,10 @@
 import { motion } from 'framer-motion';
 import { Clock, CheckCircle2, Lock, ChevronRight } from 'lucide-react';
-import { Topic } from '@/lib/api';
+import { TopicSummary } from '@/lib/api';
 import { Badge } from '@/components/ui/badge';
 
 interface TopicCardProps {
-  topic: Topic;
+  topic: TopicSummary;
   isCompleted?: boolean;
   isLocked?: boolean;
   onClick?: () => void;
@@ -56,11 +56,86 @@ export interface Topic {
   isCompleted?: boolean;
 }
 
+// Card fields returned by the topics listing; no content or questions
+export type TopicSummary = Pick<
+  Topic,
+  'id' | 'title' | 'description' | 'imageUrl' | 'category' | 'difficulty' | 'estimatedTime' | 'createdAt' | 'isCompleted'
+> & {
+  questionCount: number;
+};
+
+export interface QueuedQuizAttempt {
+  type: 'daily' | 'practice';
+  topicId?: string;
+  correctCount: number;
+  totalQuestions: number;
+  completedAt: string;
+  idempotencyKey: string;
+}
+
+export interface QueuedQuizResult {
+  idempotencyKey: string | null;
+  status: 'applied' | 'duplicate' | 'already_completed' | 'rejected';
+  error?: string;
+}
+
+// Dense per-day counts from `from` to `to` (inclusive), one entry per day
+export interface ActivityCalendar {
+  from: string;
+  to: string;
+  quizzes: number[];
+  daily: number[];
+  activeDays: number;
+}
+
+// Percentages are whole numbers; rollingScore weights recent attempts most
+export interface TopicStats {
+  topicId: string;
+  attempts: number;
+  questionsAnswered: number;
+  correctAnswers: number;
+  accuracy: number;
+  bestScore: number;
+  rollingScore: number;
+  lastAttemptAt: string;
+}
+
+export interface UserStats {
+  topics: TopicStats[];
+  totals: {
+    topics: number;
+    attempts: number;
+    questionsAnswered: number;
+    correctAnswers: number;
+    accuracy: number;
+  };
+}
+
+export interface ReviewItem {
+  topicId: string;
+  dueDay: string;
+  intervalDays: number;
+  repetitions: number;
+  ease: number;
+  lastReviewedAt: string;
+}
+
 interface AuthResponse {
   user: User;
   token: string;
 }
 
+// Last response body for GET endpoints that sent an ETag, keyed by token
+// and endpoint. Repeat requests revalidate with If-None-Match and reuse the
+// body on 304 instead of downloading it again.
+interface ConditionalEntry {
+  etag: string;
+  body: string;
+  contentType: string;
+}
+
+const conditionalCache = new Map<string, ConditionalEntry>();
+
 // Helper function to get auth token
 const getToken = (): string | null => {
   return localStorage.getItem('auth_token');
@@ -74,6 +149,7 @@ const setToken = (token: string): void => {
 // Helper function to remove auth token
 const removeToken = (): void => {
   localStorage.removeItem('auth_token');
+  conditionalCache.clear();
 };
 
 // Fetch wrapper with auth
@@ -88,10 +164,19 @@ const apiFetch = async (endpoint: string, options: RequestInit = {}): Promise<Re
     headers['Authorization'] = `Bearer ${token}`;
   }
 
+  const method = (options.method || 'GET').toUpperCase();
+  const cacheKey = method === 'GET' ? `${token ?? ''} ${endpoint}` : null;
+  const cached = cacheKey ? conditionalCache.get(cacheKey) : undefined;
+  if (cached) {
+    headers['If-None-Match'] = cached.etag;
+  }
+
   try {
     const response = await fetch(`${API_BASE_URL}${endpoint}`, {
       ...options,
       headers,
+      // Revalidation is handled here, so keep the browser cache out of it
+      ...(cacheKey ? { cache: 'no-store' as RequestCache } : {}),
     });
 
     if (response.status === 401) {
@@ -103,11 +188,27 @@ const apiFetch = async (endpoint: string, options: RequestInit = {}): Promise<Re
       throw new Error('Unauthorized');
     }
 
+    if (response.status === 304 && cached) {
+      return new Response(cached.body, {
+        status: 200,
+        headers: { 'Content-Type': cached.contentType, ETag: cached.etag },
+      });
+    }
+
     if (!response.ok) {
       const error = await response.json().catch(() => ({ error: 'An error occurred' }));
       throw new Error(error.error || `HTTP error! status: ${response.status}`);
     }
 
+    const etag = response.headers.get('ETag');
+    if (cacheKey && etag) {
+      conditionalCache.set(cacheKey, {
+        etag,
+        body: await response.clone().text(),
+        contentType: response.headers.get('Content-Type') || 'application/json',
+      });
+    }
+
     return response;
   } catch (error) {
     // Handle network errors
@@ -197,10 +298,13 @@ export const topicsAPI = {
     return data.topic;
   },
 
-  getAllTopics: async (): Promise<Topic[]> => {
+  getAllTopics: async (): Promise<TopicSummary[]> => {
     if (USE_MOCK) {
       await ensureMocksLoaded();
-      return mockTopicService.getAllTopics();
+      return mockTopicService.getAllTopics().map((topic: Topic) => ({
+        ...topic,
+        questionCount: topic.questions.length,
+      }));
     }
     const response = await apiFetch('/topics');
     const data = await response.json();
@@ -265,6 +369,45 @@ export const quizzesAPI = {
     const data = await response.json();
     return data;
   },
+
+  // Topics due for review, earliest first; daysAhead includes upcoming ones
+  getReviewQueue: async (limit = 10, daysAhead = 0): Promise<ReviewItem[]> => {
+    if (USE_MOCK) return [];
+    const response = await apiFetch(`/quizzes/review-queue?limit=${limit}&daysAhead=${daysAhead}`);
+    const data = await response.json();
+    return data.reviews;
+  },
+
+  // Replay attempts queued while offline; keys make retries safe
+  submitBatch: async (attempts: QueuedQuizAttempt[]): Promise<{ results: QueuedQuizResult[]; user: User }> => {
+    const response = await apiFetch('/quizzes/submit-batch', {
+      method: 'POST',
+      body: JSON.stringify({ attempts }),
+    });
+    const data = await response.json();
+    return data;
+  },
+};
+
+// Users API
+export const usersAPI = {
+  // Dates are YYYY-MM-DD; the server defaults to the 371 days ending today
+  getActivity: async (from?: string, to?: string): Promise<ActivityCalendar | null> => {
+    if (USE_MOCK) return null;
+    const params = new URLSearchParams();
+    if (from) params.set('from', from);
+    if (to) params.set('to', to);
+    const query = params.toString();
+    const response = await apiFetch(`/users/activity${query ? `?${query}` : ''}`);
+    const data = await response.json();
+    return data.activity;
+  },
+
+  getStats: async (): Promise<UserStats | null> => {
+    if (USE_MOCK) return null;
+    const response = await apiFetch('/users/stats');
+    return response.json();
+  },
 };
 
 // Export token management for use in contexts
@@ -1,7 +1,7 @@
 import { useState, useEffect } from "react";
 import { motion } from "framer-motion";
 import { useNavigate } from "react-router-dom";
-import { topicsAPI, Topic } from "@/lib/api";
+import { topicsAPI, TopicSummary } from "@/lib/api";
 import { useAuth } from "@/contexts/AuthContext";
 import Navbar from "@/components/Navbar";
 import Footer from "@/components/Footer";
@@ -17,7 +17,7 @@ const LibraryPage = () => {
   const navigate = useNavigate();
   const { user } = useAuth();
   const { toast } = useToast();
-  const [topics, setTopics] = useState<Topic[]>([]);
+  const [topics, setTopics] = useState<TopicSummary[]>([]);
   const [isLoading, setIsLoading] = useState(true);
   const [hoveredTopic, setHoveredTopic] = useState<string | null>(null);
 
@@ -41,7 +41,7 @@ const LibraryPage = () => {
     fetchTopics();
   }, [toast]);
 
-  const getTopicStatus = (topic: Topic) => {
+  const getTopicStatus = (topic: TopicSummary) => {
     if (!user) return "locked";
     if (topic.isCompleted) return "completed";
     return "available";
@@ -211,7 +211,7 @@ const LibraryPage = () => {
                               <Clock className="w-3.5 h-3.5" />
                               {topic.estimatedTime} min
                             </span>
-                            <span>{topic.questions.length} questions</span>
+                            <span>{topic.questionCount} questions</span>
                           </div>
 
                           {/* Hover indicator */}
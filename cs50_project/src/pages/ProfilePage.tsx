@@ -1,17 +1,38 @@
+import { useEffect, useState } from 'react';
 import { motion } from 'framer-motion';
 import { Flame, Zap, Trophy, BookOpen, Target, User } from 'lucide-react';
 import Navbar from '@/components/Navbar';
 import Footer from '@/components/Footer';
 import StreakGraph from '@/components/StreakGraph';
 import { useAuth } from '@/contexts/AuthContext';
+import { usersAPI } from '@/lib/api';
 
 const ProfilePage = () => {
   const { user } = useAuth();
+  const [statsAccuracy, setStatsAccuracy] = useState<number | null>(null);
+
+  // Real accuracy from the per-topic stats, refetched when a quiz changes the counters
+  useEffect(() => {
+    let cancelled = false;
+    usersAPI
+      .getStats()
+      .then((stats) => {
+        if (!cancelled && stats) setStatsAccuracy(stats.totals.accuracy);
+      })
+      .catch(() => {
+        // Keep the estimate below
+      });
+    return () => {
+      cancelled = true;
+    };
+  }, [user?.totalQuizzes]);
+
   if (!user) return null;
 
-  const accuracy = user.totalQuizzes > 0 
+  // Estimate assuming 5 questions per quiz until the stats arrive (or in mock mode)
+  const accuracy = statsAccuracy ?? (user.totalQuizzes > 0 
     ? Math.round((user.correctAnswers / (user.totalQuizzes * 5)) * 100) 
-    : 0;
+    : 0);
 
   const stats = [
     { 